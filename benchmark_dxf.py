@@ -0,0 +1,38 @@
+"""
+Benchmark de escritura DXF: compara formato ASCII y binario (y el tamaño estimado antes de convertir)
+Uso: python benchmark_dxf.py archivo.svg [repeticiones]
+"""
+
+import sys
+import time
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+
+# Backends a comparar (documento ezdxf con splines y streaming R12 aplanado)
+BACKENDS = {
+    'documento': {'use_splines': True, 'streaming': False},
+    'streaming': {'use_splines': False, 'streaming': True}
+}
+
+svg_input = sys.argv[1] if len(sys.argv) > 1 else "vectorizado.svg"
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+print(f"Benchmark DXF: {svg_input} ({repeats} repeticiones, se reporta la mejor)")
+print(f"{'backend':<12}{'formato':<10}{'tiempo (s)':>12}{'tamaño (KB)':>14}{'estimado (KB)':>16}")
+
+for backend, config in BACKENDS.items():
+    sizes = {}
+    for dxf_format in ('asc', 'bin'):
+        converter = DXFConverterV2(dxf_format=dxf_format, **config)
+        _, estimate = converter.estimate(svg_input)
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            success, content, message = converter.convert_bytes(svg_input)
+            best = min(best, time.perf_counter() - start)
+            if not success:
+                print(f"ERROR: {message}")
+                sys.exit(1)
+        sizes[dxf_format] = len(content)
+        print(f"{backend:<12}{dxf_format:<10}{best:>12.3f}{len(content) / 1024:>14.1f}{estimate['size'] / 1024:>16.1f}")
+    print(f"{'':<12}binario: -{1 - sizes['bin'] / sizes['asc']:.0%} de tamaño")
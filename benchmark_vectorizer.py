@@ -0,0 +1,47 @@
+"""
+Benchmark de vectorización: compara VTracer con los contornos de OpenCV en velocidad y fidelidad
+Uso: python benchmark_vectorizer.py imagen.png [repeticiones]
+"""
+
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.core.autotune import raster_fidelity
+from src.core.vectorizer import ImageVectorizer
+
+# Motores a comparar (imagen binaria, mismo filtro de manchas)
+BACKENDS = {
+    'vtracer': {'backend': 'vtracer'},
+    'opencv': {'backend': 'opencv'}
+}
+
+image_input = sys.argv[1] if len(sys.argv) > 1 else "imagen.png"
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+image = Image.open(image_input).convert('RGB')
+# Referencia: la misma umbralización que usan ambos motores (canal rojo < 128)
+binary = np.where(np.asarray(image)[..., 0] < 128, 0, 255).astype(np.uint8)
+reference = np.repeat(binary[..., None], 3, axis=2)
+
+print(f"Benchmark de vectorización: {image_input} ({repeats} repeticiones, se reporta la mejor)")
+print(f"{'motor':<10}{'curvas':<10}{'tiempo (s)':>12}{'segmentos':>12}{'paths':>10}{'fidelidad':>12}")
+
+for mode in ('polygon', 'spline'):
+    times = {}
+    for backend, config in BACKENDS.items():
+        vectorizer = ImageVectorizer(color_mode='binary', mode=mode, **config)
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            success, geometry = vectorizer.trace(image)
+            best = min(best, time.perf_counter() - start)
+            if not success:
+                print(f"ERROR: {geometry}")
+                sys.exit(1)
+        times[backend] = best
+        fidelity = raster_fidelity(geometry, reference)
+        print(f"{backend:<10}{mode:<10}{best:>12.3f}{geometry.num_segments:>12}{geometry.num_paths:>10}{fidelity:>12.4f}")
+    print(f"{'':<10}opencv: {times['vtracer'] / times['opencv']:.1f}x más rápido")
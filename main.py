@@ -96,7 +96,11 @@ def main():
             use_preprocessing=config['use_preprocessing'],
             preprocessor_config=config['preprocessor'],
             vectorizer_config=config['vectorizer'],
-            dxf_config=config['dxf']
+            dxf_config=config['dxf'],
+            use_svg_optimization=config['use_svg_optimization'],
+            svg_optimizer_config=config['svg_optimizer'],
+            autotune_config=config['autotune'],
+            gcode_config=config['gcode']
         )
 
         # Mostrar spinner
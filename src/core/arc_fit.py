@@ -0,0 +1,384 @@
+"""
+Módulo de ajuste de arcos
+Detecta tramos de polilínea que siguen un círculo y los reemplaza por segmentos con bulge
+"""
+
+import numpy as np
+
+
+# Vértices máximos de cada tramo de polilínea que se ajusta por separado
+_SECTION_VERTICES = 2048
+
+# Fases de la búsqueda del final de cada arco (ver _greedy_arcs)
+_NEXT, _FIRST, _GALLOP, _BISECT = range(4)
+
+
+def fit_circles(polylines, tolerance):
+    """
+    Verifica qué contornos cerrados son círculos dentro de la tolerancia
+
+    Args:
+        polylines: Lista de arrays (K, 2) con los vértices de cada contorno (sin repetir el primero)
+        tolerance: Distancia máxima permitida entre el contorno y el círculo
+
+    Returns:
+        Lista con (centro (2,), radio) por contorno, o None si no es circular
+    """
+    circles = [None] * len(polylines)
+    candidates = [index for index, points in enumerate(polylines) if len(points) >= 8]
+    if not candidates:
+        return circles
+
+    points, offsets = _concatenate([polylines[index] for index in candidates], closed=True)
+    starts = offsets[:-1]
+    counts = np.diff(offsets) - 1
+    through = (starts, starts + counts // 3, starts + 2 * counts // 3)
+    valid, turns, centers, radii = _arcs_through(points, starts, starts + counts, tolerance, through)
+
+    # El contorno debe dar exactamente una vuelta
+    valid &= np.abs(np.abs(turns) - 2 * np.pi) <= 1e-6 * 2 * np.pi + 1e-9
+    for index in np.flatnonzero(valid):
+        circles[candidates[index]] = (centers[index], float(radii[index]))
+    return circles
+
+
+def fit_arcs(polylines, tolerance, closed, min_points=4):
+    """
+    Reemplaza los tramos circulares de varias polilíneas por segmentos con bulge
+
+    Primero se evalúan en bloque todas las ventanas de min_points vértices
+    consecutivos; solo desde las ventanas circulares se extiende el arco
+    (duplicando el largo y luego con búsqueda binaria) hasta el último
+    vértice que sigue dentro de la tolerancia. Todas las polilíneas avanzan
+    a la vez (ver _greedy_arcs): cada ronda verifica un largo por polilínea
+    en una sola evaluación vectorizada.
+
+    Args:
+        polylines: Lista de arrays (K, 2) de vértices
+        tolerance: Distancia máxima permitida entre cada polilínea y sus arcos
+        closed: Secuencia de bool, si cada polilínea es cerrada (el cierre se trata como un tramo más)
+        min_points: Vértices mínimos de un tramo para reemplazarlo por un arco
+
+    Returns:
+        Lista de (vértices (M, 2), bulges (M,)) por polilínea. El bulge de cada
+        vértice describe el segmento que sale de él (0 = recto); en polilíneas
+        cerradas el último describe el segmento de cierre
+    """
+    if not len(polylines):
+        return []
+    closed = np.asarray(closed, dtype=bool)
+    points, offsets = _concatenate(polylines, closed)
+
+    # Las polilíneas largas se dividen en tramos que avanzan en paralelo (un
+    # arco no cruza el límite entre tramos: a lo sumo un vértice más por límite)
+    sections = np.maximum(1, -(-(np.diff(offsets) - 1) // _SECTION_VERTICES))
+    firsts = np.repeat(offsets[:-1], sections) + _SECTION_VERTICES * (
+        np.arange(sections.sum()) - np.repeat(np.cumsum(sections) - sections, sections)
+    )
+    lasts = np.minimum(firsts + _SECTION_VERTICES, np.repeat(offsets[1:] - 1, sections))
+
+    # Ventanas circulares completas dentro de un mismo tramo
+    starts = _circular_windows(points, tolerance, min_points)
+    owners = np.searchsorted(firsts, starts, side='right') - 1
+    starts = starts[starts + min_points - 1 <= lasts[owners]]
+
+    # Cada racha de ventanas circulares consecutivas acota el largo de un arco
+    run_ends = np.flatnonzero(np.diff(starts) != 1)
+    run_ends = starts[np.append(run_ends, len(starts) - 1)] + min_points - 1 if len(starts) else run_ends
+
+    arc_starts, arc_ends, arc_bulges = _greedy_arcs(points, firsts, lasts, starts, run_ends, tolerance, min_points - 1)
+
+    # Los vértices interiores de cada arco desaparecen y el bulge queda en su inicio
+    interior = np.zeros(len(points) + 1, dtype=np.int64)
+    np.add.at(interior, arc_starts + 1, 1)
+    np.add.at(interior, arc_ends, -1)
+    keep = np.cumsum(interior[:-1]) == 0
+    bulges = np.zeros(len(points))
+    bulges[arc_starts] = arc_bulges
+
+    fitted = []
+    for index in range(len(polylines)):
+        span = slice(offsets[index], offsets[index + 1])
+        vertices, vertex_bulges = points[span][keep[span]], bulges[span][keep[span]]
+        if closed[index]:
+            # El último vértice repite el primero
+            vertices, vertex_bulges = vertices[:-1], vertex_bulges[:-1]
+        fitted.append((vertices, vertex_bulges))
+    return fitted
+
+
+def _concatenate(polylines, closed):
+    """
+    Une las polilíneas en un solo array de vértices
+
+    Args:
+        polylines: Lista de arrays (K, 2)
+        closed: bool o secuencia de bool; las cerradas repiten el primer vértice al final
+
+    Returns:
+        tuple: (vértices (N, 2) float64, offsets (P + 1,) del primer vértice de cada polilínea)
+    """
+    closed = np.broadcast_to(np.asarray(closed, dtype=bool), (len(polylines),))
+    parts = [
+        np.vstack([points, points[:1]]) if is_closed else points
+        for points, is_closed in zip(polylines, closed)
+    ]
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([len(part) for part in parts], out=offsets[1:])
+    return np.concatenate(parts).astype(np.float64, copy=False), offsets
+
+
+def _circular_windows(points, tolerance, min_points):
+    """
+    Índices iniciales de las ventanas de min_points vértices que forman un arco
+
+    Args:
+        points: Array (K, 2) de vértices
+        tolerance: Distancia máxima permitida
+        min_points: Largo de la ventana
+
+    Returns:
+        Array int64 ordenado de posiciones iniciales
+    """
+    count = len(points) - min_points + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    window = np.arange(count)[:, None] + np.arange(min_points)
+    first = points[window[:, 0]]
+    middle = points[window[:, (min_points - 1) // 2]]
+    last = points[window[:, -1]]
+    centers, radii = _circumcircles(first, middle, last)
+
+    samples = points[window]
+    midpoints = (samples[:, 1:] + samples[:, :-1]) / 2
+    with np.errstate(invalid='ignore'):
+        vertex_error = np.abs(np.hypot(*(samples - centers[:, None]).transpose(2, 0, 1)) - radii[:, None])
+        chord_error = np.abs(np.hypot(*(midpoints - centers[:, None]).transpose(2, 0, 1)) - radii[:, None])
+        ok = (vertex_error.max(axis=1) <= tolerance) & (chord_error.max(axis=1) <= tolerance)
+
+    # Los vértices deben avanzar siempre en el mismo sentido alrededor del centro
+    edges = np.diff(samples, axis=1)
+    turns = edges[:, :-1, 0] * edges[:, 1:, 1] - edges[:, :-1, 1] * edges[:, 1:, 0]
+    same_direction = (turns > 0).all(axis=1) | (turns < 0).all(axis=1)
+
+    return np.flatnonzero(ok & same_direction & np.isfinite(radii))
+
+
+def _greedy_arcs(points, firsts, lasts, starts, run_ends, tolerance, length):
+    """
+    Búsqueda voraz de arcos, todos los tramos a la vez
+
+    Cada tramo avanza desde su primer vértice: toma la próxima ventana
+    circular, prueba el final de su racha (el caso habitual en arcos
+    reales), duplica el largo mientras el arco siga siendo válido y resuelve
+    el último tramo con búsqueda binaria. Cada ronda verifica un largo por
+    tramo activo (dos en la primera prueba de un arco).
+
+    Args:
+        points: Array (N, 2) con los vértices de todas las polilíneas
+        firsts: Array (S,) con el primer vértice de cada tramo
+        lasts: Array (S,) con el último vértice de cada tramo
+        starts: Inicios ordenados de las ventanas circulares
+        run_ends: Último vértice de cada racha de ventanas circulares
+        tolerance: Distancia máxima permitida
+        length: Segmentos de una ventana
+
+    Returns:
+        tuple: (inicios, finales, bulges) de los arcos encontrados; los tramos
+        que no se apartan de su cuerda más que la tolerancia no se incluyen
+    """
+    count = len(lasts)
+    position = firsts.copy()
+    phase = np.full(count, _NEXT)
+    active = np.ones(count, dtype=bool)
+    start = np.zeros(count, dtype=np.int64)
+    limit = np.zeros(count, dtype=np.int64)
+    good = np.zeros(count, dtype=np.int64)
+    bad = np.zeros(count, dtype=np.int64)
+    step = np.zeros(count, dtype=np.int64)
+    turns = np.zeros(count)
+    found = ([], [], [])
+
+    while True:
+        # Próxima ventana circular desde la posición actual de cada polilínea
+        seeking = np.flatnonzero(active & (phase == _NEXT))
+        candidate = np.searchsorted(starts, position[seeking])
+        candidate_start = starts[np.minimum(candidate, len(starts) - 1)] if len(starts) else candidate
+        has_window = (candidate < len(starts)) & (candidate_start + length <= lasts[seeking])
+        active[seeking[~has_window]] = False
+        seeking = seeking[has_window]
+        start[seeking] = candidate_start[has_window]
+        limit[seeking] = run_ends[np.searchsorted(run_ends, start[seeking] + length)]
+        phase[seeking] = _FIRST
+
+        busy = np.flatnonzero(active)
+        if not len(busy):
+            break
+
+        # Largos a verificar en esta ronda: ventana y racha completa, o el
+        # siguiente largo de la duplicación o de la búsqueda binaria
+        first = busy[phase[busy] == _FIRST]
+        gallop = busy[phase[busy] == _GALLOP]
+        bisect = busy[phase[busy] == _BISECT]
+        owners = np.concatenate([first, first, gallop, bisect])
+        ends = np.concatenate([
+            start[first] + length,
+            limit[first],
+            np.minimum(good[gallop] + step[gallop], lasts[gallop]),
+            (good[bisect] + bad[bisect]) // 2
+        ])
+        valid, probe_turns = _arcs_through(points, start[owners], ends, tolerance)[:2]
+        parts = np.cumsum([len(first), len(first), len(gallop)])
+        window_ok, limit_ok = valid[:parts[0]], valid[parts[0]:parts[1]]
+
+        # Primera prueba: si la ventana no pasa la verificación exacta el tramo es recto
+        straight = first[~window_ok]
+        position[straight] = start[straight] + 1
+        phase[straight] = _NEXT
+        whole = window_ok & (limit_ok | (limit[first] == start[first] + length))
+        grown = first[whole]
+        good[grown] = limit[grown]
+        turns[grown] = probe_turns[parts[0]:parts[1]][whole]
+        step[grown] = limit[grown] - start[grown]
+        phase[grown] = _GALLOP
+        partial = window_ok & ~whole
+        cut = first[partial]
+        good[cut] = start[cut] + length
+        turns[cut] = probe_turns[:parts[0]][partial]
+        bad[cut] = limit[cut]
+        phase[cut] = _BISECT
+
+        # Duplicación del largo mientras el arco siga siendo válido
+        gallop_ok = valid[parts[1]:parts[2]]
+        longer = gallop[gallop_ok]
+        good[longer] = ends[parts[1]:parts[2]][gallop_ok]
+        turns[longer] = probe_turns[parts[1]:parts[2]][gallop_ok]
+        step[longer] *= 2
+        failed = gallop[~gallop_ok]
+        bad[failed] = ends[parts[1]:parts[2]][~gallop_ok]
+        phase[failed] = _BISECT
+
+        # Búsqueda binaria entre el último largo válido y el primero inválido
+        bisect_ok = valid[parts[2]:]
+        closer = bisect[bisect_ok]
+        good[closer] = ends[parts[2]:][bisect_ok]
+        turns[closer] = probe_turns[parts[2]:][bisect_ok]
+        farther = bisect[~bisect_ok]
+        bad[farther] = ends[parts[2]:][~bisect_ok]
+
+        done = busy[
+            ((phase[busy] == _GALLOP) & (good[busy] >= lasts[busy]))
+            | ((phase[busy] == _BISECT) & (bad[busy] - good[busy] <= 1))
+        ]
+        if len(done):
+            # Un tramo que no se aparta de su cuerda más que la tolerancia ya es recto
+            distance = _chord_distance(points[start[done]], points[(start[done] + good[done]) // 2], points[good[done]])
+            arcs = done[distance > tolerance]
+            found[0].append(start[arcs])
+            found[1].append(good[arcs])
+            found[2].append(np.tan(turns[arcs] / 4))
+            position[done] = good[done]
+            phase[done] = _NEXT
+
+    if not found[0]:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return tuple(np.concatenate(values) for values in found)
+
+
+def _arcs_through(points, starts, ends, tolerance, through=None):
+    """
+    Verifica si los vértices start..end de cada tramo siguen el círculo que pasa por tres de ellos
+
+    Todos los tramos se evalúan juntos sobre un único array de vértices.
+
+    Args:
+        points: Array (N, 2) de vértices
+        starts: Array (T,) con el primer vértice de cada tramo
+        ends: Array (T,) con el último vértice de cada tramo (mayor que el primero)
+        tolerance: Distancia máxima permitida
+        through: Tupla de tres arrays (T,) con los vértices que definen cada
+            círculo (por defecto inicio, medio y fin del tramo)
+
+    Returns:
+        tuple: (válido (T,) bool, ángulo recorrido con signo (T,): + antihorario,
+        centros (T, 2), radios (T,))
+    """
+    if through is None:
+        through = (starts, (starts + ends) // 2, ends)
+    centers, radii = _circumcircles(*(points[index] for index in through))
+
+    # Índices de los vértices de todos los tramos, uno detrás de otro
+    sizes = ends - starts + 1
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    owners = np.repeat(np.arange(len(sizes)), sizes)
+    relative = points[np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], sizes)] - centers[owners]
+
+    # Segmentos: cada vértice con el siguiente del mismo tramo
+    heads = np.ones(offsets[-1], dtype=bool)
+    heads[offsets[1:] - 1] = False
+    head = relative[heads]
+    tail = relative[1:][heads[:-1]]
+    segment_offsets = offsets[:-1] - np.arange(len(sizes))
+
+    # Los tramos colineales tienen centro infinito: sus errores quedan en NaN y no son válidos
+    with np.errstate(invalid='ignore'):
+        # Vértices y puntos medios de cada segmento deben quedar sobre el círculo
+        vertex_error = np.abs(np.hypot(relative[:, 0], relative[:, 1]) - radii[owners])
+        middle = (head + tail) / 2
+        chord_error = np.abs(np.hypot(middle[:, 0], middle[:, 1]) - radii[owners[heads]])
+        error = np.maximum(
+            np.maximum.reduceat(vertex_error, offsets[:-1]),
+            np.maximum.reduceat(chord_error, segment_offsets)
+        )
+
+        # Ángulo recorrido: suma de los pasos, todos en el mismo sentido
+        cross = head[:, 0] * tail[:, 1] - head[:, 1] * tail[:, 0]
+        dot = (head * tail).sum(axis=1)
+        turns = np.add.reduceat(np.arctan2(cross, dot), segment_offsets)
+        same_direction = (
+            (np.minimum.reduceat(cross, segment_offsets) > 0)
+            | (np.maximum.reduceat(cross, segment_offsets) < 0)
+        )
+
+        valid = (
+            np.isfinite(radii) & (error <= tolerance) & same_direction
+            & (np.abs(turns) <= 2 * np.pi * (1 + 1e-9))
+        )
+    return valid, turns, centers, radii
+
+
+def _circumcircles(first, middle, last):
+    """
+    Círculos que pasan por tres puntos (vectorizado)
+
+    Args:
+        first, middle, last: Arrays (N, 2)
+
+    Returns:
+        tuple: (centros (N, 2), radios (N,)); radio infinito si los puntos son colineales
+    """
+    b = middle - first
+    c = last - first
+    d = 2 * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0])
+    b_sq = (b * b).sum(axis=1)
+    c_sq = (c * c).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ux = (c[:, 1] * b_sq - b[:, 1] * c_sq) / d
+        uy = (b[:, 0] * c_sq - c[:, 0] * b_sq) / d
+    centers = first + np.column_stack([ux, uy])
+    radii = np.hypot(ux, uy)
+    radii[~np.isfinite(radii)] = np.inf
+    return centers, radii
+
+
+def _chord_distance(first, middle, last):
+    """Distancia de cada punto medio a la cuerda first-last (o a first si la cuerda es nula)"""
+    chord = last - first
+    offsets = middle - first
+    length = np.hypot(chord[:, 0], chord[:, 1])
+    cross = np.abs(chord[:, 0] * offsets[:, 1] - chord[:, 1] * offsets[:, 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distance = cross / length
+    return np.where(length > 0, distance, np.hypot(offsets[:, 0], offsets[:, 1]))
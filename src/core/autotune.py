@@ -0,0 +1,376 @@
+"""
+Módulo de ajuste automático de parámetros
+Busca la configuración de VTracer que cumple un presupuesto de tamaño o fidelidad
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .vectorizer import ImageVectorizer
+from .svg_parser import SVGPathParser, arc_center_parameters, arc_points, cubic_basis
+
+
+# Extremos de la búsqueda: de máximo detalle a máxima simplificación
+DETAILED_PARAMS = {
+    'filter_speckle': 1,
+    'corner_threshold': 30,
+    'length_threshold': 3.5,
+    'path_precision': 8
+}
+SIMPLE_PARAMS = {
+    'filter_speckle': 10,
+    'corner_threshold': 150,
+    'length_threshold': 10.0,
+    'path_precision': 2
+}
+
+# Máximo de evaluaciones en caché (compartida por todos los ajustadores)
+_EVALUATION_CACHE_MAX = 512
+
+# (hash de la imagen reducida, configuración) → métricas, las usadas más recientemente al final
+_evaluation_cache = OrderedDict()
+_evaluation_cache_lock = threading.Lock()
+
+
+class VectorizerAutoTuner:
+    """Ajusta automáticamente los parámetros de VTracer sobre una imagen reducida"""
+
+    def __init__(
+        self,
+        max_nodes=None,
+        max_entities=None,
+        min_fidelity=None,
+        proxy_size=512,
+        levels=12,
+        workers=None,
+        base_config=None
+    ):
+        """
+        Inicializa el ajustador automático
+
+        Args:
+            max_nodes: Máximo de segmentos (nodos) en el SVG a resolución completa
+            max_entities: Máximo de entidades DXF estimadas
+            min_fidelity: Fidelidad raster mínima (0-1) frente a la imagen de entrada
+            proxy_size: Lado mayor (px) de la imagen reducida usada en la búsqueda
+            levels: Número de niveles de detalle a explorar
+            workers: Procesos paralelos de evaluación (None = automático, 1 = sin pool)
+            base_config: Configuración del vectorizador a conservar (color_mode, mode, ...)
+        """
+        self.max_nodes = max_nodes
+        self.max_entities = max_entities
+        self.min_fidelity = min_fidelity
+        self.proxy_size = proxy_size
+        self.levels = max(2, levels)
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.base_config = dict(base_config or {})
+
+    def tune(self, image):
+        """
+        Busca la configuración que cumple los objetivos
+
+        Los niveles se evalúan en lotes paralelos (en un mismo pool de
+        procesos para toda la búsqueda) y la búsqueda se detiene en el
+        primer nivel que cumple todos los objetivos. Con fidelidad mínima
+        se recorre de simple a detallado (la configuración más simple que
+        alcanza la fidelidad); si solo hay presupuestos, de detallado a simple.
+
+        Args:
+            image: Imagen PIL (ya preprocesada si corresponde)
+
+        Returns:
+            tuple: (configuración del vectorizador: dict, reporte: dict)
+        """
+        proxy, scale = self._make_proxy(image)
+        buffer = io.BytesIO()
+        proxy.save(buffer, format='PNG')
+        png_bytes = buffer.getvalue()
+        reference = self._reference_image(proxy)
+        digest = hashlib.sha1(png_bytes).hexdigest()
+
+        candidates = [self._candidate(level) for level in range(self.levels)]
+        if self.min_fidelity is None:
+            candidates.reverse()
+
+        evaluated = []
+        chosen = None
+        batch_size = max(1, self.workers)
+
+        # Los procesos se crean al enviar la primera evaluación, así que una
+        # búsqueda resuelta desde el caché no los llega a iniciar
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for batch_start in range(0, len(candidates), batch_size):
+                batch = candidates[batch_start:batch_start + batch_size]
+                metrics = self._evaluate_batch(batch, png_bytes, reference, digest, scale, executor)
+
+                for config, result in zip(batch, metrics):
+                    evaluated.append((config, result))
+                    if chosen is None and result['success'] and self._meets_targets(result):
+                        chosen = (config, result)
+                if chosen is not None:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        target_met = chosen is not None
+        if chosen is None:
+            chosen = self._closest(evaluated)
+
+        config, result = chosen
+        report = {
+            'target_met': target_met,
+            'evaluations': len(evaluated),
+            'proxy_scale': scale,
+            'metrics': result,
+            'history': evaluated
+        }
+        return config, report
+
+    def _make_proxy(self, image):
+        """
+        Reduce la imagen para que su lado mayor sea proxy_size
+
+        Args:
+            image: Imagen PIL original
+
+        Returns:
+            tuple: (imagen reducida, factor de escala aplicado)
+        """
+        image = image.convert('RGB')
+        scale = min(1.0, self.proxy_size / max(image.size))
+        if scale < 1.0:
+            size = (max(1, round(image.size[0] * scale)), max(1, round(image.size[1] * scale)))
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        return image, scale
+
+    def _reference_image(self, proxy):
+        """
+        Imagen de referencia para medir la fidelidad
+
+        En modo binario VTracer umbraliza el canal rojo en 128, así que la
+        referencia es esa misma imagen umbralizada; en modo color es la imagen RGB.
+
+        Args:
+            proxy: Imagen PIL reducida
+
+        Returns:
+            Array uint8 (H, W, 3)
+        """
+        reference = np.array(proxy)
+        if self.base_config.get('color_mode', 'binary') == 'binary':
+            binary = np.where(reference[..., 0] < 128, 0, 255).astype(np.uint8)
+            reference = np.repeat(binary[..., None], 3, axis=2)
+        return reference
+
+    def _candidate(self, level):
+        """
+        Configuración del vectorizador para un nivel de detalle
+
+        Args:
+            level: 0 = más simple, levels - 1 = más detallado
+
+        Returns:
+            dict: Configuración completa del vectorizador
+        """
+        weight = level / (self.levels - 1)
+        config = dict(self.base_config)
+        for key, simple in SIMPLE_PARAMS.items():
+            value = simple + (DETAILED_PARAMS[key] - simple) * weight
+            config[key] = round(value, 1) if key == 'length_threshold' else int(round(value))
+        return config
+
+    def _evaluate_batch(self, batch, png_bytes, reference, digest, scale, executor=None):
+        """
+        Evalúa un lote de configuraciones usando el caché y un pool de procesos
+
+        El caché es del módulo: al volver a ajustar la misma imagen (ej: al
+        reconvertir) las configuraciones ya evaluadas no se vectorizan de nuevo.
+
+        Args:
+            batch: Lista de configuraciones
+            png_bytes: Imagen reducida codificada en PNG
+            reference: Imagen de referencia para la fidelidad
+            digest: Hash de la imagen reducida (clave de caché)
+            scale: Factor de escala de la imagen reducida
+            executor: Pool de procesos de la búsqueda (ver tune) o None para
+                evaluar en este proceso
+
+        Returns:
+            Lista de métricas en el mismo orden que el lote
+        """
+        keys = [(digest, tuple(sorted(config.items()))) for config in batch]
+        cached = {}
+        with _evaluation_cache_lock:
+            for key in keys:
+                if key in _evaluation_cache:
+                    _evaluation_cache.move_to_end(key)
+                    cached[key] = _evaluation_cache[key]
+        pending = [(key, config) for key, config in zip(keys, batch) if key not in cached]
+
+        if pending:
+            args = [(png_bytes, reference, config) for _, config in pending]
+            if executor is not None and len(pending) > 1:
+                results = list(executor.map(_evaluate_candidate, *zip(*args)))
+            else:
+                results = [_evaluate_candidate(*arg) for arg in args]
+
+            with _evaluation_cache_lock:
+                for (key, _), result in zip(pending, results):
+                    cached[key] = _evaluation_cache[key] = result
+                while len(_evaluation_cache) > _EVALUATION_CACHE_MAX:
+                    _evaluation_cache.popitem(last=False)
+
+        metrics = []
+        for key in keys:
+            result = dict(cached[key])
+            if result['success']:
+                # Los nodos escalan con el perímetro: extrapolar a resolución completa
+                result['nodes'] = int(round(result['proxy_nodes'] / scale))
+            metrics.append(result)
+        return metrics
+
+    def _meets_targets(self, result):
+        """Verifica si las métricas cumplen todos los objetivos configurados"""
+        if self.max_nodes is not None and result['nodes'] > self.max_nodes:
+            return False
+        if self.max_entities is not None and result['entities'] > self.max_entities:
+            return False
+        if self.min_fidelity is not None and result['fidelity'] < self.min_fidelity:
+            return False
+        return True
+
+    def _closest(self, evaluated):
+        """
+        Elige la configuración más cercana a cumplir los objetivos
+
+        Args:
+            evaluated: Lista de (configuración, métricas)
+
+        Returns:
+            tuple: (configuración, métricas)
+        """
+        def violation(item):
+            result = item[1]
+            if not result['success']:
+                return float('inf')
+            total = 0.0
+            if self.max_nodes is not None:
+                total += max(0.0, result['nodes'] / self.max_nodes - 1)
+            if self.max_entities is not None:
+                total += max(0.0, result['entities'] / self.max_entities - 1)
+            if self.min_fidelity is not None:
+                total += max(0.0, self.min_fidelity - result['fidelity'])
+            return total
+
+        return min(evaluated, key=violation)
+
+
+def _evaluate_candidate(png_bytes, reference, config):
+    """
+    Vectoriza la imagen reducida con una configuración y mide el resultado
+
+    Función de módulo para poder ejecutarse en un pool de procesos.
+
+    Args:
+        png_bytes: Imagen reducida codificada en PNG
+        reference: Imagen de referencia (H, W, 3)
+        config: Configuración del vectorizador
+
+    Returns:
+        dict: Métricas (proxy_nodes, paths, entities, svg_size, fidelity)
+    """
+    success, svg = ImageVectorizer(**config).convert_bytes(png_bytes)
+    if not success:
+        return {'success': False, 'message': svg}
+
+    geometry = SVGPathParser().parse(io.StringIO(svg))
+    fidelity = raster_fidelity(geometry, reference)
+
+    # Un path cerrado con más de un segmento se emite como una sola polilínea
+    lengths = np.diff(geometry.path_offsets)
+    polylines = (lengths > 1) & geometry.closed
+    entities = int(polylines.sum() + lengths[~polylines].sum())
+
+    return {
+        'success': True,
+        'proxy_nodes': geometry.num_segments,
+        'paths': geometry.num_paths,
+        'entities': entities,
+        'svg_size': len(svg.encode('utf-8')),
+        'fidelity': fidelity
+    }
+
+
+def raster_fidelity(geometry, reference):
+    """
+    Fidelidad raster de una geometría frente a una imagen de referencia
+
+    Args:
+        geometry: SVGGeometry a evaluar
+        reference: Imagen de referencia (H, W, 3) uint8
+
+    Returns:
+        float: 1 - diferencia media por canal (0-1, 1 = idéntica)
+    """
+    rendered = _rasterize(geometry, reference.shape[:2])
+    return float(1.0 - np.abs(rendered.astype(np.int16) - reference).mean() / 255.0)
+
+
+def _rasterize(geometry, shape, samples=8):
+    """
+    Rasteriza la geometría sobre fondo blanco respetando el orden y el relleno
+
+    Args:
+        geometry: SVGGeometry a dibujar
+        shape: (alto, ancho) del lienzo
+        samples: Puntos por segmento curvo
+
+    Returns:
+        Array uint8 (H, W, 3)
+    """
+    canvas = np.full((shape[0], shape[1], 3), 255, dtype=np.uint8)
+    if geometry.num_segments == 0:
+        return canvas
+
+    # Aplanar todos los segmentos de una vez (sin el punto final de cada uno)
+    t = np.linspace(0, 1, samples, endpoint=False)
+    flat = np.einsum('kj,njd->nkd', cubic_basis(t), geometry.points)
+    if len(geometry.arc_index):
+        arcs = arc_center_parameters(
+            geometry.points[geometry.arc_index, 0],
+            geometry.points[geometry.arc_index, 3],
+            geometry.arc_params
+        )
+        flat[geometry.arc_index] = arc_points(*arcs, t)
+
+    polygons_by_element = {}
+    for index in range(geometry.num_paths):
+        start, end = geometry.path_range(index)
+        polygon = np.rint(flat[start:end].reshape(-1, 2)).astype(np.int32)
+        polygons_by_element.setdefault(int(geometry.path_element[index]), []).append(polygon)
+
+    for element, polygons in sorted(polygons_by_element.items()):
+        color = _parse_color(geometry.element_fills[element])
+        cv2.fillPoly(canvas, polygons, color)
+
+    return canvas
+
+
+def _parse_color(fill):
+    """Convierte un color de relleno SVG (#RGB o #RRGGBB) a tupla RGB"""
+    if not fill or not fill.startswith('#'):
+        return (0, 0, 0)
+    value = fill[1:]
+    if len(value) == 3:
+        value = ''.join(c * 2 for c in value)
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
@@ -0,0 +1,230 @@
+"""
+Módulo de vectorización por contornos
+Traza una máscara binaria con OpenCV (findContours + approxPolyDP) directamente a geometría en arrays, sin VTracer ni texto SVG
+"""
+
+import cv2
+import numpy as np
+
+from .svg_parser import SVGGeometry, SEG_LINE, SEG_CUBIC
+
+
+def trace_mask(mask, epsilon=1.0, min_area=0.0, curves=False, corner_threshold=60.0, fill='#000000'):
+    """
+    Vectoriza una máscara binaria
+
+    Los contornos se buscan con la jerarquía de dos niveles de OpenCV
+    (RETR_CCOMP): cada contorno exterior es un elemento y sus agujeros son
+    paths del mismo elemento, con el sentido opuesto (se rellena bien con
+    nonzero y con evenodd). Los contornos recorren los centros de los
+    píxeles del borde; el polígono simplificado se desplaza medio píxel
+    para que coincida con el borde real de los píxeles, como en VTracer
+    (el píxel (i, j) ocupa el cuadrado [i, i + 1] x [j, j + 1]).
+
+    OpenCV traza el borde de un agujero por los píxeles del dibujo que lo
+    rodean, con conectividad 8, y eso recorta sus esquinas; por eso cada
+    agujero se vuelve a trazar por sus propios píxeles de fondo.
+
+    Args:
+        mask: Array (H, W) con los píxeles del dibujo distintos de cero
+        epsilon: Desviación máxima (px) de approxPolyDP respecto del contorno
+        min_area: Área mínima (px²) de una mancha o agujero; los menores se descartan
+        curves: Si True, los vértices suaves se unen con Beziers cúbicas
+            (tangentes de Catmull-Rom) en lugar de segmentos rectos
+        corner_threshold: Giro mínimo (grados) de un vértice para
+            considerarlo esquina (solo con curves)
+        fill: Relleno de los elementos
+
+    Returns:
+        SVGGeometry con viewBox del tamaño de la máscara
+    """
+    height, width = mask.shape[:2]
+    mask = (np.asarray(mask) != 0).astype(np.uint8)
+    contours, hierarchy = cv2.findContours(mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE)
+    parents = hierarchy[0, :, 3] if len(contours) else np.zeros(0, dtype=np.int64)
+
+    # Fondo en componentes 4-conexas: cada agujero se traza por sus propios píxeles
+    if np.any(parents >= 0):
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(1 - mask, connectivity=4)
+
+    # Exteriores primero: un agujero solo se conserva si se conservó su contorno exterior
+    element_of = {}
+    polygons = []
+    for index in np.argsort(parents >= 0, kind='stable').tolist():
+        contour = contours[index]
+        parent = int(parents[index])
+        hole = parent >= 0
+        if hole:
+            if parent not in element_of:
+                continue
+            contour = _hole_outline(contour, labels, stats, min_area)
+            if contour is None:
+                continue
+        # Píxeles de la mancha: área del polígono de centros más el medio píxel del borde
+        elif abs(cv2.contourArea(contour)) + cv2.arcLength(contour, True) / 2 + 1 < min_area:
+            continue
+
+        polygon = cv2.approxPolyDP(contour, epsilon, True).reshape(-1, 2).astype(np.float64) + 0.5
+        outset = -0.5 if hole else 0.5
+        if len(polygon) < 3:
+            # Trazo de un píxel de ancho (o un píxel suelto): su rectángulo de píxeles
+            polygon = _stroke_outline(polygon)
+            outset = 0.0
+        if not hole:
+            element_of[index] = len(element_of)
+
+        # Exteriores con área positiva y agujeros con área negativa
+        if (_signed_area(polygon) < 0) != hole:
+            polygon = polygon[::-1]
+        polygons.append((element_of[parent if hole else index], polygon, outset))
+
+    polygons.sort(key=lambda item: item[0])
+    sizes = np.array([len(polygon) for _, polygon, _ in polygons], dtype=np.int64)
+    path_offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=path_offsets[1:])
+    vertices = np.concatenate([polygon for _, polygon, _ in polygons]) if polygons else np.zeros((0, 2))
+
+    # Vértice anterior y siguiente de cada vértice dentro de su polígono
+    following = np.arange(1, len(vertices) + 1)
+    following[path_offsets[1:] - 1] = path_offsets[:-1]
+    previous = np.arange(-1, len(vertices) - 1)
+    previous[path_offsets[:-1]] = path_offsets[1:] - 1
+
+    distances = np.repeat(np.array([item[2] for item in polygons], dtype=np.float64), sizes)
+    vertices = _offset_vertices(vertices, previous, following, distances)
+
+    ends = vertices[following]
+    seg_types = np.full(len(vertices), SEG_LINE, dtype=np.uint8)
+    points = np.stack([vertices, vertices, ends, ends], axis=1)
+    if curves and len(vertices):
+        seg_types, points = _fit_curves(vertices, previous, following, corner_threshold)
+
+    return SVGGeometry(
+        seg_types,
+        points,
+        path_offsets,
+        np.ones(len(polygons), dtype=bool),
+        np.array([item[0] for item in polygons], dtype=np.int32),
+        [fill] * len(element_of),
+        width=float(width),
+        height=float(height),
+        view_box=(0.0, 0.0, float(width), float(height))
+    )
+
+
+def _hole_outline(contour, labels, stats, min_area):
+    """
+    Contorno de un agujero trazado por sus píxeles de fondo
+
+    El primer punto del borde de un agujero es el píxel donde el barrido de
+    OpenCV encontró el agujero a su derecha (con CHAIN_APPROX_NONE no se
+    descarta), así que ese vecino identifica la componente de fondo.
+
+    Args:
+        contour: Borde del agujero retornado por findContours
+        labels: Etiquetas de las componentes 4-conexas del fondo
+        stats: Estadísticas de las componentes (caja y área)
+        min_area: Área mínima (px²) del agujero
+
+    Returns:
+        Array (K, 1, 2) con el contorno del agujero, o None si es menor que min_area
+    """
+    x, y = contour[0, 0]
+    label = labels[y, x + 1]
+    left, top, box_width, box_height, area = stats[label]
+    if area < min_area:
+        return None
+    region = (labels[top:top + box_height, left:left + box_width] == label).astype(np.uint8)
+    outlines, _ = cv2.findContours(region, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    return max(outlines, key=len) + np.array([left, top], dtype=np.int32)
+
+
+def _signed_area(polygon):
+    """Área con signo de un polígono (fórmula del área de Gauss)"""
+    x, y = polygon[:, 0], polygon[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _stroke_outline(polygon):
+    """
+    Rectángulo de los píxeles de un trazo recto de un píxel de ancho
+
+    Args:
+        polygon: Array (1 o 2, 2) con los centros de los píxeles extremos
+
+    Returns:
+        Array (4, 2) con las esquinas del rectángulo
+    """
+    start, end = polygon[0], polygon[-1]
+    length = np.hypot(*(end - start))
+    direction = (end - start) / length if length > 0 else np.array([1.0, 0.0])
+    along = 0.5 * direction
+    across = 0.5 * np.array([-direction[1], direction[0]])
+    return np.array([start - along - across, end + along - across, end + along + across, start - along + across])
+
+
+def _offset_vertices(vertices, previous, following, distances):
+    """
+    Desplaza cada vértice sobre la bisectriz de sus lados (inglete)
+
+    Con exteriores de área positiva y agujeros de área negativa, la normal
+    (dy, -dx) de cada lado apunta siempre hacia afuera del dibujo. El
+    inglete se limita al doble de la distancia en los vértices muy agudos.
+
+    Args:
+        vertices: Array (T, 2) de vértices de todos los polígonos
+        previous: Array (T,) con el vértice anterior de cada uno
+        following: Array (T,) con el vértice siguiente de cada uno
+        distances: Array (T,) con la distancia a desplazar cada vértice
+            (positiva hacia afuera del dibujo)
+
+    Returns:
+        Array (T, 2) de vértices desplazados
+    """
+    edges = vertices[following] - vertices
+    lengths = np.maximum(np.hypot(edges[:, 0], edges[:, 1]), 1e-12)
+    normals = np.column_stack([edges[:, 1], -edges[:, 0]]) / lengths[:, None]
+    incoming = normals[previous]
+    cosines = np.einsum('ij,ij->i', incoming, normals)
+    miter = (incoming + normals) / np.maximum(1.0 + cosines, 0.5)[:, None]
+    return vertices + miter * distances[:, None]
+
+
+def _fit_curves(vertices, previous, following, corner_threshold):
+    """
+    Une los vértices suaves de los polígonos con Beziers cúbicas
+
+    En un vértice suave la tangente es paralela a la cuerda entre sus
+    vecinos (Catmull-Rom) y cada control está a un tercio del lado; en una
+    esquina el control queda sobre el lado. Un lado entre dos esquinas
+    sigue siendo una línea.
+
+    Args:
+        vertices: Array (T, 2) de vértices de todos los polígonos
+        previous: Array (T,) con el vértice anterior de cada uno
+        following: Array (T,) con el vértice siguiente de cada uno
+        corner_threshold: Giro mínimo (grados) de una esquina
+
+    Returns:
+        tuple: (tipos de segmento (T,), puntos de control (T, 4, 2))
+    """
+    outgoing = vertices[following] - vertices
+    incoming = vertices - vertices[previous]
+    out_lengths = np.hypot(outgoing[:, 0], outgoing[:, 1])
+    in_lengths = np.hypot(incoming[:, 0], incoming[:, 1])
+    cosines = np.einsum('ij,ij->i', incoming, outgoing) / np.maximum(in_lengths * out_lengths, 1e-12)
+    corners = np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0))) > corner_threshold
+
+    chords = vertices[following] - vertices[previous]
+    tangents = chords / np.maximum(np.hypot(chords[:, 0], chords[:, 1]), 1e-12)[:, None]
+    reach = out_lengths[:, None] / 3
+    ends = vertices[following]
+    first = np.where(corners[:, None], vertices + outgoing / 3, vertices + tangents * reach)
+    second = np.where(corners[following][:, None], ends - outgoing / 3, ends - tangents[following] * reach)
+
+    lines = corners & corners[following]
+    seg_types = np.where(lines, SEG_LINE, SEG_CUBIC).astype(np.uint8)
+    points = np.stack([vertices, first, second, ends], axis=1)
+    points[lines, 1] = vertices[lines]
+    points[lines, 2] = ends[lines]
+    return seg_types, points
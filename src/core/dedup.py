@@ -0,0 +1,285 @@
+"""
+Módulo de eliminación de segmentos duplicados
+Quita bordes repetidos (formas adyacentes o apiladas) para no cortar dos veces el mismo trazo
+"""
+
+import numpy as np
+
+from .svg_parser import SVGGeometry, SEG_LINE, SEG_ARC
+
+
+# Ancho angular de las celdas del índice de líneas (radianes)
+_ANGLE_CELL = np.radians(1.0)
+
+
+def remove_duplicate_segments(geometry, tolerance):
+    """
+    Elimina segmentos duplicados y partes solapadas de líneas colineales
+
+    Siempre se conserva la primera aparición (el path dibujado antes). Los
+    paths que pierden segmentos se parten en tramos abiertos, que la unión
+    de paths del convertidor vuelve a encadenar.
+
+    Args:
+        geometry: SVGGeometry de origen
+        tolerance: Tamaño de la cuantización y distancia máxima entre trazos
+            considerados coincidentes (unidades SVG)
+
+    Returns:
+        tuple: (SVGGeometry sin duplicados, estadísticas: dict con duplicates
+                (segmentos repetidos eliminados) y overlaps (líneas recortadas
+                o eliminadas por solaparse con otra))
+    """
+    stats = {'duplicates': 0, 'overlaps': 0}
+    if geometry.num_segments == 0 or tolerance <= 0:
+        return geometry, stats
+
+    keep = _unique_segments(geometry, tolerance)
+    pieces = _trim_overlapping_lines(geometry, keep, tolerance)
+    stats['duplicates'] = int(geometry.num_segments - keep.sum())
+    stats['overlaps'] = len(pieces)
+
+    if not stats['duplicates'] and not pieces:
+        return geometry, stats
+    return _rebuild(geometry, keep, pieces), stats
+
+
+def _unique_segments(geometry, tolerance):
+    """
+    Marca la primera aparición de cada segmento, sin importar su sentido
+
+    Cada segmento se cuantiza a una grilla de lado tolerance y se normaliza
+    eligiendo el sentido lexicográficamente menor; los arcos agregan sus
+    parámetros (con el barrido invertido si se invirtió el sentido).
+
+    Args:
+        geometry: SVGGeometry de origen
+        tolerance: Lado de la grilla de cuantización
+
+    Returns:
+        Array bool (N,) con True en los segmentos a conservar
+    """
+    count = geometry.num_segments
+    forward = np.rint(geometry.points.reshape(count, 8) / tolerance).astype(np.int64)
+    backward = np.rint(geometry.points[:, ::-1].reshape(count, 8) / tolerance).astype(np.int64)
+
+    # Sentido canónico: el menor en orden lexicográfico
+    differs = forward != backward
+    first = differs.argmax(axis=1)
+    rows = np.arange(count)
+    flipped = differs.any(axis=1) & (backward[rows, first] < forward[rows, first])
+    keys = np.zeros((count, 13), dtype=np.int64)
+    keys[:, :8] = np.where(flipped[:, None], backward, forward)
+
+    if len(geometry.arc_index):
+        arcs = geometry.arc_index
+        params = geometry.arc_params
+        circular = np.abs(params[:, 0] - params[:, 1]) <= tolerance
+        keys[arcs, 8] = 1
+        keys[arcs, 9] = np.rint(params[:, 0] / tolerance)
+        keys[arcs, 10] = np.rint(params[:, 1] / tolerance)
+        # La rotación no importa en un arco circular
+        keys[arcs, 11] = np.where(circular, 0, np.rint(np.mod(params[:, 2], 180.0) * 1000))
+        keys[arcs, 12] = 2 * (params[:, 3] != 0) + ((params[:, 4] != 0) ^ flipped[arcs])
+
+    _, first_seen = np.unique(keys, axis=0, return_index=True)
+    keep = np.zeros(count, dtype=bool)
+    keep[first_seen] = True
+    return keep
+
+
+def _trim_overlapping_lines(geometry, keep, tolerance):
+    """
+    Recorta las líneas que se solapan con líneas colineales anteriores
+
+    Las líneas se indexan en una grilla por ángulo de dirección (sin sentido)
+    y distancia a un punto de referencia; los pares de celdas vecinas se
+    verifican con distancias exactas. A cada línea se le quitan los tramos
+    ya cubiertos por líneas colineales anteriores.
+
+    Args:
+        geometry: SVGGeometry de origen
+        keep: Segmentos conservados por _unique_segments
+        tolerance: Distancia máxima a la recta para considerar dos líneas colineales
+
+    Returns:
+        dict: segmento → lista de tramos (inicio, fin) que se conservan
+        (lista vacía si la línea queda cubierta por completo)
+    """
+    lines = np.flatnonzero(keep & (geometry.seg_types == SEG_LINE))
+    starts = geometry.points[lines, 0]
+    ends = geometry.points[lines, 3]
+    delta = ends - starts
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    valid = lengths > tolerance
+    lines, starts, ends, delta, lengths = lines[valid], starts[valid], ends[valid], delta[valid], lengths[valid]
+    if len(lines) < 2:
+        return {}
+
+    direction = delta / lengths[:, None]
+    normal = np.column_stack([-direction[:, 1], direction[:, 0]])
+
+    # Recta sin sentido: ángulo en (-pi/2, pi/2] y distancia con signo a un punto de referencia
+    flip = (direction[:, 0] < 0) | ((direction[:, 0] == 0) & (direction[:, 1] < 0))
+    undirected = np.where(flip[:, None], -direction, direction)
+    angle = np.arctan2(undirected[:, 1], undirected[:, 0])
+    reference = (starts.min(axis=0) + starts.max(axis=0)) / 2
+    offset = undirected[:, 0] * (starts[:, 1] - reference[1]) - undirected[:, 1] * (starts[:, 0] - reference[0])
+
+    angle_cells = np.floor(angle / _ANGLE_CELL).astype(np.int64)
+    offset_cells = np.floor(offset / tolerance).astype(np.int64)
+    # La misma recta con el ángulo del otro extremo del rango (+-pi) tiene la distancia negada
+    negated_cells = np.floor(-offset / tolerance).astype(np.int64)
+    period = int(round(np.pi / _ANGLE_CELL))
+    base = min(offset_cells.min(), negated_cells.min()) - 1
+    width = int(max(offset_cells.max(), negated_cells.max()) - base) + 2
+    codes = angle_cells * width + (offset_cells - base)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+
+    # Pares (línea, línea anterior) en celdas vecinas; cerca de +-pi/2 los
+    # vecinos también están al otro extremo del rango de ángulos
+    probes = (
+        codes,
+        (angle_cells + period) * width + (negated_cells - base),
+        (angle_cells - period) * width + (negated_cells - base)
+    )
+    owners, others = [], []
+    for probe in probes:
+        for angle_step in (-1, 0, 1):
+            for offset_step in (-1, 0, 1):
+                neighbours = probe + angle_step * width + offset_step
+                low = np.searchsorted(sorted_codes, neighbours, side='left')
+                high = np.searchsorted(sorted_codes, neighbours, side='right')
+                counts = high - low
+                owner = np.repeat(np.arange(len(lines)), counts)
+                position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                other = order[np.repeat(low, counts) + position]
+                earlier = other < owner
+                owners.append(owner[earlier])
+                others.append(other[earlier])
+    owner = np.concatenate(owners)
+    other = np.concatenate(others)
+
+    # Los extremos de la línea deben estar sobre la recta de la anterior
+    near_start = np.abs(np.einsum('ij,ij->i', normal[other], starts[owner] - starts[other])) <= tolerance
+    near_end = np.abs(np.einsum('ij,ij->i', normal[other], ends[owner] - starts[other])) <= tolerance
+    owner, other = owner[near_start & near_end], other[near_start & near_end]
+
+    # Intervalo de la anterior sobre la recta de la línea (0 = inicio, length = fin)
+    a = np.einsum('ij,ij->i', direction[owner], starts[other] - starts[owner])
+    b = np.einsum('ij,ij->i', direction[owner], ends[other] - starts[owner])
+    low, high = np.minimum(a, b), np.maximum(a, b)
+    overlapping = np.minimum(high, lengths[owner]) - np.maximum(low, 0.0) > tolerance
+    owner, other, a, b = owner[overlapping], other[overlapping], a[overlapping], b[overlapping]
+    if len(owner) == 0:
+        return {}
+
+    pieces = {}
+    sort = np.argsort(owner, kind='stable')
+    owner, other, a, b = owner[sort], other[sort], a[sort], b[sort]
+    bounds = np.append(np.flatnonzero(np.diff(owner, prepend=-1)), len(owner))
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        line = owner[first]
+        # Intervalos cubiertos, cada extremo con su punto exacto
+        covered = []
+        for k in range(first, last):
+            ends_k = [(a[k], starts[other[k]]), (b[k], ends[other[k]])]
+            ends_k.sort(key=lambda item: item[0])
+            covered.append(ends_k)
+        pieces[int(lines[line])] = _uncovered_pieces(starts[line], ends[line], lengths[line], covered, tolerance)
+    return pieces
+
+
+def _uncovered_pieces(start, end, length, covered, tolerance):
+    """
+    Tramos de una línea que no cubre ninguno de los intervalos dados
+
+    Args:
+        start, end: Extremos de la línea
+        length: Largo de la línea
+        covered: Lista de [(posición, punto), (posición, punto)] ordenados
+        tolerance: Largo mínimo de un tramo conservado
+
+    Returns:
+        Lista de (punto inicial, punto final) en el sentido de la línea
+    """
+    covered.sort(key=lambda interval: interval[0][0])
+    pieces = []
+    position, point = 0.0, start
+    for (low, low_point), (high, high_point) in covered:
+        if low > position:
+            if min(low, length) - position > tolerance:
+                pieces.append((point, low_point if low < length else end))
+        if high > position:
+            position, point = high, high_point
+        if position >= length:
+            break
+    if length - position > tolerance:
+        pieces.append((point, end))
+    return pieces
+
+
+def _rebuild(geometry, keep, pieces):
+    """
+    Arma la geometría con los segmentos conservados y las líneas recortadas
+
+    Los paths se parten donde se quitó un segmento o se recortó una línea;
+    solo un path sin cambios conserva su marca de cerrado.
+
+    Args:
+        geometry: SVGGeometry de origen
+        keep: Segmentos conservados enteros o recortados
+        pieces: Tramos de las líneas recortadas (ver _trim_overlapping_lines)
+
+    Returns:
+        SVGGeometry nueva
+    """
+    counts = keep.astype(np.int64)
+    for segment, segment_pieces in pieces.items():
+        counts[segment] = len(segment_pieces)
+    sources = np.repeat(np.arange(geometry.num_segments), counts)
+    points = geometry.points[sources]
+
+    first = np.cumsum(counts) - counts
+    for segment, segment_pieces in pieces.items():
+        for k, (start, end) in enumerate(segment_pieces):
+            points[first[segment] + k] = (start, start, end, end)
+
+    path_of = np.repeat(np.arange(geometry.num_paths), np.diff(geometry.path_offsets))[sources]
+    if len(sources):
+        # Un path nuevo empieza donde cambia el path de origen o se corta la continuidad
+        breaks = np.ones(len(sources), dtype=bool)
+        breaks[1:] = (path_of[1:] != path_of[:-1]) | np.any(points[1:, 0] != points[:-1, 3], axis=1)
+        run_starts = np.flatnonzero(breaks)
+    else:
+        run_starts = np.zeros(0, dtype=np.int64)
+    path_offsets = np.append(run_starts, len(sources)).astype(np.int64)
+    run_paths = path_of[run_starts]
+
+    # Un path sigue cerrado solo si quedó entero y sin cambios
+    original_lengths = np.diff(geometry.path_offsets)
+    unchanged = np.ones(geometry.num_paths, dtype=bool)
+    modified = ~keep
+    modified[list(pieces)] = True
+    np.logical_and.at(unchanged, np.repeat(np.arange(geometry.num_paths), original_lengths), ~modified)
+    run_lengths = np.diff(path_offsets)
+    closed = geometry.closed[run_paths] & unchanged[run_paths] & (run_lengths == original_lengths[run_paths])
+
+    seg_types = geometry.seg_types[sources]
+    arc_positions = np.flatnonzero(seg_types == SEG_ARC)
+    arc_params = geometry.arc_params[np.searchsorted(geometry.arc_index, sources[arc_positions])]
+
+    return SVGGeometry(
+        seg_types=seg_types,
+        points=points,
+        path_offsets=path_offsets,
+        closed=closed,
+        path_element=geometry.path_element[run_paths],
+        element_fills=geometry.element_fills,
+        arc_index=arc_positions.astype(np.int64),
+        arc_params=arc_params.reshape(-1, 5),
+        width=geometry.width,
+        height=geometry.height,
+        view_box=geometry.view_box
+    )
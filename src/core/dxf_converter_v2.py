@@ -3,20 +3,157 @@ Módulo mejorado de conversión SVG a DXF
 Versión 2: Optimización de paths, coordenadas corregidas y transformaciones aplicadas
 """
 
-import ezdxf
-from svgpathtools import svg2paths, Line, CubicBezier, QuadraticBezier, Arc, Path
+import io
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from functools import lru_cache
+
 import numpy as np
-import re
-from typing import List, Tuple, Optional
+
+from .dxf_writer import DXFDocumentWriter, EntityBuffer, StreamingDXFWriter
+from .arc_fit import fit_arcs, fit_circles
+from .dedup import remove_duplicate_segments
+from .nesting import contour_parents, nesting_depths
+from .repeats import repeated_shapes
+from .simplify import simplify_polyline, simplify_ring, simplify_with_bulges
+from .toolpath import ToolpathOptimizer
+from .svg_parser import (
+    PathGroup,
+    PathGroups,
+    SVGGeometry,
+    SEG_LINE,
+    SEG_QUADRATIC,
+    SEG_CUBIC,
+    SEG_ARC,
+    arc_center_parameters,
+    arc_points,
+    cubic_basis,
+    geometry_bounds,
+    parse_svg
+)
+
+
+# Segmentos mínimos para convertir en paralelo (con menos, el pool cuesta más de lo que ahorra)
+_PARALLEL_MIN_SEGMENTS = 20000
+
+# Partes por proceso: más partes que procesos equilibran las partes más lentas
+_CHUNKS_PER_WORKER = 4
+
+# Tamaño de las tandas de grupos que se aplanan y escriben juntas (ver
+# _batch_ranges): acota la memoria del aplanado y agrupa las polilíneas que
+# se ajustan a arcos juntas (ver _fit_pending_arcs)
+_BATCH_GROUPS = 4096
+_BATCH_SEGMENTS = 32768
+
+# Modelo de tamaño por (writer, formato): bytes fijos y bytes por entidad,
+# por vértice de polilínea y por punto de control de SPLINE (en ASCII, sin
+# contar el texto de las coordenadas). Ajustado con dibujos de VTracer.
+_SIZE_MODEL = {
+    ('documento', 'asc'): (15520, 22, 12, 29),
+    ('documento', 'bin'): (13350, 60, 20, 41),
+    ('streaming', 'asc'): (60, 34, 26, 0),
+    ('streaming', 'bin'): (54, 27, 32, 0)
+}
+
+# Modelo de tiempo por (writer, formato): segundos por entidad, por vértice
+# y por punto de control (conversión secuencial en una máquina de referencia)
+_TIME_MODEL = {
+    ('documento', 'asc'): (3.6e-5, 1.1e-5, 1.3e-5),
+    ('documento', 'bin'): (8.6e-5, 8.4e-6, 8.6e-6),
+    ('streaming', 'asc'): (1.3e-5, 3.0e-6, 0.0),
+    ('streaming', 'bin'): (6.4e-5, 1.9e-7, 0.0)
+}
+
+# Tolerancias de aplanado que prueba el presupuesto de tamaño (de menor a mayor)
+_BUDGET_TOLERANCES = (0.05, 0.1, 0.2, 0.5, 1.0)
+
+# Acciones cuando el DXF estimado supera el presupuesto
+BUDGET_ACTIONS = ('warn', 'reduce', 'refuse')
+
+# Precisiones en las que puede guardarse la geometría parseada
+GEOMETRY_DTYPES = ('float64', 'float32')
+
+# Unidades de salida: pulgadas por unidad y código $INSUNITS
+DXF_UNITS = {
+    'mm': (1 / 25.4, 4),
+    'in': (1.0, 1)
+}
+
+
+class _ConversionContext:
+    """
+    Estado de una conversión: límites para la inversión de Y y resultados de cada etapa
+
+    Cada llamada crea el suyo, así el convertidor no cambia al convertir y
+    una misma instancia puede usarse desde varios hilos a la vez.
+    """
+
+    __slots__ = (
+        'svg_height', 'y_min', 'vertex_counts', 'arc_counts', 'block_counts',
+        'pending_arcs', 'dedup_stats', 'nesting_depths', 'toolpath_report'
+    )
+
+    def __init__(self, svg_height=0.0, y_min=0.0):
+        """
+        Inicializa el contexto
+
+        Args:
+            svg_height: Alto del SVG para la inversión de Y
+            y_min: Y mínima del SVG para la inversión de Y
+        """
+        self.svg_height = svg_height
+        self.y_min = y_min
+        # Vértices antes/después de ajustar y simplificar, arcos/círculos ajustados
+        # y formas/inserciones escritas como bloques
+        self.vertex_counts = [0, 0]
+        self.arc_counts = [0, 0]
+        self.block_counts = [0, 0]
+        # Polilíneas escritas en un EntityBuffer que esperan el ajuste de arcos
+        self.pending_arcs = []
+        self.dedup_stats = None
+        self.nesting_depths = None
+        self.toolpath_report = None
 
 
 class DXFConverterV2:
     """
     Convertidor mejorado de SVG a DXF con optimización de paths
     y corrección de coordenadas
+
+    La configuración no cambia después de __init__ y el estado de cada
+    conversión vive en un _ConversionContext propio: una instancia puede
+    reutilizarse y compartirse entre hilos.
     """
 
-    def __init__(self, bezier_subdivisions=30, use_splines=True, tolerance=0.1):
+    def __init__(
+        self,
+        bezier_subdivisions=30,
+        use_splines=True,
+        tolerance=0.1,
+        flatten_tolerance=None,
+        max_curve_vertices=100,
+        streaming=False,
+        simplify_tolerance=None,
+        arc_tolerance=None,
+        order_toolpath=False,
+        toolpath_time=1.0,
+        inner_first=True,
+        loop_direction=None,
+        dxf_format='asc',
+        remove_duplicates=False,
+        workers=1,
+        nesting_layers=False,
+        max_output_mb=None,
+        over_budget='warn',
+        units=None,
+        dpi=96.0,
+        coordinate_grid=None,
+        repeat_blocks=False,
+        block_rotation=False,
+        geometry_dtype='float64'
+    ):
         """
         Inicializa el convertidor DXF v2
 
@@ -24,407 +161,1691 @@ class DXFConverterV2:
             bezier_subdivisions: Número de subdivisiones para curvas Bezier (más = más suave)
             use_splines: Si True, convierte Bezier a splines DXF nativos
             tolerance: Tolerancia para conectar paths cercanos (en unidades SVG)
+            flatten_tolerance: Desviación máxima de cuerda al aplanar curvas (en unidades
+                del DXF). Si es None se usan bezier_subdivisions fijas por curva
+            max_curve_vertices: Máximo de subdivisiones por curva en modo adaptativo
+            streaming: Si True, escribe un DXF R12 en streaming (memoria constante,
+                curvas aplanadas) en lugar de construir el documento ezdxf completo
+            simplify_tolerance: Desviación máxima al simplificar polilíneas con
+                Ramer–Douglas–Peucker (en unidades del DXF). Si es None no se simplifica
+            arc_tolerance: Desviación máxima al reemplazar tramos circulares de las
+                polilíneas por segmentos con bulge y contornos circulares por CIRCLE
+                (en unidades del DXF). Si es None no se ajustan arcos
+            order_toolpath: Si True, ordena las entidades para minimizar el
+                recorrido en vacío de la máquina (ver ToolpathOptimizer)
+            toolpath_time: Segundos máximos de mejora 2-opt del recorrido
+            inner_first: Si True, todo lo que está dentro de un contorno se corta
+                antes que el contorno
+            loop_direction: Sentido de los contornos cerrados al ordenar: 'ccw',
+                'cw' o None (sin cambios)
+            dxf_format: 'asc' para DXF ASCII o 'bin' para DXF binario (más chico
+                y más rápido de escribir y de leer en CAD/CAM)
+            remove_duplicates: Si True, elimina segmentos repetidos y partes
+                solapadas de líneas colineales (bordes compartidos entre formas),
+                usando `tolerance` como cuantización
+            workers: Procesos para aplanar, ajustar y simplificar los paths en
+                paralelo (None = uno por núcleo, 1 = sin pool). Solo se usa en
+                dibujos de al menos _PARALLEL_MIN_SEGMENTS segmentos
+            nesting_layers: Si True, calcula qué contornos están dentro de cuáles
+                y ubica cada entidad en la capa CONTORNO_<n> (contornos
+                cerrados) o ABIERTO_<n> (cadenas abiertas), con n el número de
+                contornos que la contienen: n par = pieza, n impar = agujero
+            max_output_mb: Tamaño máximo del DXF en MB, comparado con la
+                estimación previa (ver estimate_geometry). Si es None no hay límite
+            over_budget: Qué hacer si la estimación supera max_output_mb:
+                'warn' (convertir y avisar en el mensaje), 'reduce' (usar
+                formato binario y aplanado más grueso hasta entrar en el
+                límite) o 'refuse' (no convertir)
+            units: Unidades del DXF: 'mm' o 'in' escalan las coordenadas SVG
+                (píxeles) según dpi y se declaran en $INSUNITS; None deja las
+                coordenadas SVG sin escalar ni unidades
+            dpi: Píxeles SVG por pulgada (solo con units)
+            coordinate_grid: Paso de la grilla a la que se redondean las
+                coordenadas DXF (ej: 0.001); los vértices consecutivos que
+                quedan en el mismo punto se eliminan. Si es None no se redondea
+            repeat_blocks: Si True, los contornos cerrados congruentes (ej: la
+                misma letra repetida) se escriben una sola vez como BLOCK y
+                cada copia como INSERT, usando `tolerance` como cuantización
+                (solo en writers con bloques: no en G-code). La estimación de
+                tamaño no lo tiene en cuenta: queda como cota superior
+            block_rotation: Si True, también se agrupan copias rotadas (el
+                INSERT lleva la rotación)
+            geometry_dtype: Precisión con la que convert, convert_bytes y
+                estimate guardan la geometría parseada: 'float64' o 'float32'
+                (mitad de memoria para dibujos muy grandes). Los cálculos se
+                hacen en float64 en cualquier caso, tanda por tanda
         """
+        if over_budget not in BUDGET_ACTIONS:
+            raise ValueError(f"Acción de presupuesto desconocida: {over_budget}")
+        if units is not None and units not in DXF_UNITS:
+            raise ValueError(f"Unidades DXF desconocidas: {units}")
+        if geometry_dtype not in GEOMETRY_DTYPES:
+            raise ValueError(f"Precisión de geometría desconocida: {geometry_dtype}")
         self.bezier_subdivisions = bezier_subdivisions
         self.use_splines = use_splines
         self.tolerance = tolerance
-        self.svg_height = 0
-        self.y_min = 0
+        self.flatten_tolerance = flatten_tolerance
+        self.max_curve_vertices = max_curve_vertices
+        self.streaming = streaming
+        self.simplify_tolerance = simplify_tolerance
+        self.arc_tolerance = arc_tolerance
+        self.order_toolpath = order_toolpath
+        self.toolpath_time = toolpath_time
+        self.inner_first = inner_first
+        self.loop_direction = loop_direction
+        self.dxf_format = dxf_format
+        self.remove_duplicates = remove_duplicates
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.nesting_layers = nesting_layers
+        self.max_output_mb = max_output_mb
+        self.over_budget = over_budget
+        self.units = units
+        self.dpi = dpi
+        self.coordinate_grid = coordinate_grid
+        self.repeat_blocks = repeat_blocks
+        self.block_rotation = block_rotation
+        self.geometry_dtype = geometry_dtype
+        # Unidades DXF por unidad SVG y decimales del paso de la grilla
+        self.scale = 1.0 / (dpi * DXF_UNITS[units][0]) if units else 1.0
+        self.grid_decimals = _decimals(coordinate_grid) if coordinate_grid else None
+
+    def get_config(self):
+        """Retorna la configuración actual del convertidor"""
+        return {
+            'bezier_subdivisions': self.bezier_subdivisions,
+            'use_splines': self.use_splines,
+            'tolerance': self.tolerance,
+            'flatten_tolerance': self.flatten_tolerance,
+            'max_curve_vertices': self.max_curve_vertices,
+            'streaming': self.streaming,
+            'simplify_tolerance': self.simplify_tolerance,
+            'arc_tolerance': self.arc_tolerance,
+            'order_toolpath': self.order_toolpath,
+            'toolpath_time': self.toolpath_time,
+            'inner_first': self.inner_first,
+            'loop_direction': self.loop_direction,
+            'dxf_format': self.dxf_format,
+            'remove_duplicates': self.remove_duplicates,
+            'workers': self.workers,
+            'nesting_layers': self.nesting_layers,
+            'max_output_mb': self.max_output_mb,
+            'over_budget': self.over_budget,
+            'units': self.units,
+            'dpi': self.dpi,
+            'coordinate_grid': self.coordinate_grid,
+            'repeat_blocks': self.repeat_blocks,
+            'block_rotation': self.block_rotation,
+            'geometry_dtype': self.geometry_dtype
+        }
+
+    def set_subdivisions(self, subdivisions):
+        """
+        Actualiza el número de subdivisiones para curvas (obsoleto)
+
+        Cambia la configuración de esta instancia, así que no debe usarse
+        con un convertidor compartido entre hilos: conviene crear otro con
+        DXFConverterV2(bezier_subdivisions=...).
+
+        Args:
+            subdivisions: Nuevo número de subdivisiones (se limita a 10-100)
+        """
+        warnings.warn(
+            "set_subdivisions está obsoleto: crear un DXFConverterV2(bezier_subdivisions=...)",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        self.bezier_subdivisions = max(10, min(100, subdivisions))
+
+    def set_use_splines(self, use_splines):
+        """
+        Configura si usar splines DXF nativos (obsoleto)
+
+        Cambia la configuración de esta instancia, así que no debe usarse
+        con un convertidor compartido entre hilos: conviene crear otro con
+        DXFConverterV2(use_splines=...).
+
+        Args:
+            use_splines: bool
+        """
+        warnings.warn(
+            "set_use_splines está obsoleto: crear un DXFConverterV2(use_splines=...)",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        self.use_splines = use_splines
 
     def convert(self, svg_input, dxf_output):
         """
         Convierte SVG a DXF con optimizaciones
 
         Args:
-            svg_input: Ruta del archivo SVG de entrada
-            dxf_output: Ruta donde guardar el archivo DXF
+            svg_input: Ruta del archivo SVG, file-like object o contenido SVG
+                (str o bytes, ver parse_svg)
+            dxf_output: Ruta donde guardar el archivo DXF, stream de texto
+                (solo DXF ASCII) o stream binario (ej: io.BytesIO)
 
         Returns:
             tuple: (success: bool, message: str)
         """
         try:
-            # Leer los paths del SVG y atributos
-            paths, attributes = svg2paths(svg_input)
+            # Leer la geometría del SVG (las transformaciones ya vienen aplicadas)
+            geometry = parse_svg(svg_input, self.geometry_dtype)
+        except Exception as e:
+            return False, f"Error al leer el SVG: {str(e)}"
+        return self.convert_geometry(geometry, dxf_output)
 
-            if not paths:
-                return False, "No se encontraron paths en el SVG"
+    def convert_geometry(self, geometry, dxf_output=None):
+        """
+        Convierte una geometría ya parseada a DXF
+
+        Permite reutilizar la geometría de parse_svg (o construida por
+        otro módulo) sin volver a serializar ni parsear el SVG.
 
-            # Aplicar transformaciones translate del SVG
-            transformed_paths = self._apply_transforms(paths, attributes)
+        Args:
+            geometry: SVGGeometry de origen (no se modifica)
+            dxf_output: Ruta, stream de texto o stream binario de destino. Si es
+                None, el DXF se genera en memoria y se retorna como bytes
+
+        Returns:
+            tuple: (success: bool, message: str), o (success, contenido DXF:
+            bytes o None si falló, message: str) si dxf_output es None
+        """
+        if dxf_output is None:
+            buffer = io.BytesIO()
+            success, message = self.convert_geometry(geometry, buffer)
+            return success, buffer.getvalue() if success else None, message
+
+        if not self.max_output_mb or geometry.num_paths == 0:
+            return self._write_dxf(geometry, dxf_output)
+
+        # Presupuesto de tamaño: se decide con la estimación, antes de convertir
+        try:
+            estimate = self.estimate_geometry(geometry)
+        except Exception as e:
+            return False, f"Error al estimar el DXF: {str(e)}"
+        limit = self.max_output_mb * 2 ** 20
+        estimated = estimate['size']
+        summary = f"{_format_size(estimated)} y {estimate['entities']} entidades"
+        if estimated <= limit:
+            success, message = self._write_dxf(geometry, dxf_output)
+            if success:
+                message += f" (DXF estimado de {summary}, dentro del límite de {self.max_output_mb} MB)"
+            return success, message
+
+        if self.over_budget == 'refuse':
+            return False, f"El DXF estimado ({summary}) supera el límite de {self.max_output_mb} MB"
+        if self.over_budget == 'warn':
+            success, message = self._write_dxf(geometry, dxf_output)
+            if success:
+                message += f" (advertencia: DXF estimado de {summary}, supera el límite de {self.max_output_mb} MB)"
+            return success, message
+
+        settings, estimate = self._budget_settings(geometry, limit, estimate)
+        success, message = self._variant(settings)._write_dxf(geometry, dxf_output)
+        if success:
+            changes = ["formato binario"] if 'dxf_format' in settings else []
+            if 'flatten_tolerance' in settings:
+                changes.append(f"tolerancia de aplanado {settings['flatten_tolerance']}")
+            fits = "" if estimate['size'] <= limit else ", sigue superándolo"
+            message += (
+                f" (DXF estimado de {summary} sobre el límite de {self.max_output_mb} MB"
+                f": se usó {' y '.join(changes) or 'la configuración original'}"
+                f", {_format_size(estimate['size'])} estimados{fits})"
+            )
+        return success, message
+
+    def convert_to_writer(self, geometry, writer):
+        """
+        Convierte una geometría ya parseada con un writer propio en lugar de un DXF
+
+        El writer recibe las mismas llamadas que los writers DXF (set_layer,
+        add_line, add_polyline, add_arc, add_circle y, si supports_curves,
+        add_spline y add_ellipse) y se cierra con close() al terminar, así
+        otras salidas (ej: GCodeWriter) reutilizan la unión de paths, el
+        ordenamiento, el aplanado y el ajuste de arcos. El presupuesto de
+        tamaño no se aplica: su modelo es el del DXF.
+
+        Args:
+            geometry: SVGGeometry de origen (no se modifica)
+            writer: Writer de destino (con supports_curves, entity_count y label)
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        try:
+            return self._write_dxf(geometry, None, writer)
+        finally:
+            writer.close()
+
+    def _write_dxf(self, geometry, dxf_output, writer=None):
+        """
+        Convierte la geometría con la configuración actual (ver convert_geometry)
+
+        Args:
+            geometry: SVGGeometry de origen (no se modifica)
+            dxf_output: Ruta, stream de texto o stream binario de destino
+            writer: Writer propio en lugar de uno DXF (ver convert_to_writer);
+                no se cierra aquí
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        try:
+            if geometry.num_paths == 0:
+                return False, "No se encontraron paths en el SVG"
 
             # Calcular dimensiones del SVG para inversión de Y
-            self._calculate_svg_bounds(transformed_paths)
+            context = _ConversionContext(*self._svg_bounds(geometry))
 
-            # Crear documento DXF
-            doc = ezdxf.new('R2010')
-            msp = doc.modelspace()
+            # Quitar bordes repetidos antes de unir paths (se cortarían dos veces)
+            if self.remove_duplicates:
+                geometry, context.dedup_stats = remove_duplicate_segments(geometry, self.tolerance)
 
             # Procesar y convertir paths
-            optimized_paths = self._optimize_paths(transformed_paths)
+            optimized_paths = self._optimize_paths(geometry)
+            if self.order_toolpath or self.nesting_layers:
+                outlines = self._group_outlines(geometry, optimized_paths, context)
+                parents = None
+                if self.nesting_layers:
+                    # Árbol de contención de los contornos (también lo usa el ordenamiento)
+                    parents = contour_parents(
+                        [path['outline'] for path in outlines], [path['closed'] for path in outlines]
+                    )
+                    context.nesting_depths = nesting_depths(parents)
+                if self.order_toolpath:
+                    optimized_paths, order, context.toolpath_report = self._order_paths(
+                        optimized_paths, outlines, parents
+                    )
+                    if context.nesting_depths is not None:
+                        context.nesting_depths = context.nesting_depths[order]
+            depths = context.nesting_depths
+
+            if writer is not None:
+                self._write_entities(geometry, optimized_paths, writer, context, depths)
+            elif self.streaming:
+                # Las entidades se escriben a medida que se generan
+                writer = StreamingDXFWriter(dxf_output, fmt=self.dxf_format, units=self._insunits())
+                try:
+                    self._write_entities(geometry, optimized_paths, writer, context, depths)
+                finally:
+                    writer.close()
+            else:
+                writer = DXFDocumentWriter(fmt=self.dxf_format, units=self._insunits())
+                self._write_entities(geometry, optimized_paths, writer, context, depths)
+                writer.save(dxf_output)
+
+            message = f"{getattr(writer, 'label', 'DXF')} generado exitosamente con {writer.entity_count} entidades"
+            if (self.simplify_tolerance or self.arc_tolerance) and context.vertex_counts[0]:
+                before, after = context.vertex_counts
+                message += f" (vértices: {before} → {after}, -{1 - after / before:.0%})"
+            if self.arc_tolerance:
+                arcs, circles = context.arc_counts
+                message += f" ({arcs} arcos y {circles} círculos ajustados)"
+            if context.block_counts[0]:
+                blocks, inserts = context.block_counts
+                message += f" ({blocks} formas repetidas escritas como bloques, {inserts} inserciones)"
+            if self.remove_duplicates:
+                duplicates, overlaps = context.dedup_stats['duplicates'], context.dedup_stats['overlaps']
+                message += f" ({duplicates} segmentos duplicados eliminados, {overlaps} líneas solapadas recortadas)"
+            if self.nesting_layers and len(depths):
+                closed_depths = depths[optimized_paths.closed]
+                holes = int(np.count_nonzero(closed_depths % 2))
+                message += (
+                    f" (anidamiento: {len(closed_depths) - holes} piezas y {holes} agujeros"
+                    f", profundidad máxima {int(depths.max())})"
+                )
+            if self.order_toolpath:
+                before = context.toolpath_report['travel_before']
+                after = context.toolpath_report['travel_after']
+                message += f" (recorrido en vacío: {before:.1f} → {after:.1f}"
+                message += f", -{1 - after / before:.0%})" if before else ")"
+            return True, message
 
-            # Convertir paths optimizados a entidades DXF
-            for path_group in optimized_paths:
-                self._convert_path_group(path_group, msp)
+        except Exception as e:
+            return False, f"Error al generar {getattr(writer, 'label', 'DXF')}: {str(e)}"
 
-            # Guardar DXF
-            doc.saveas(dxf_output)
+    def convert_bytes(self, svg_input):
+        """
+        Convierte SVG a DXF en memoria, sin escribir en disco
 
-            num_entities = len(list(msp))
-            return True, f"DXF generado exitosamente con {num_entities} entidades"
+        Args:
+            svg_input: Contenido SVG (str o bytes), ruta o file-like object
 
+        Returns:
+            tuple: (success: bool, contenido DXF: bytes o None si falló,
+            message: str con el reporte de la conversión o el error)
+        """
+        try:
+            geometry = parse_svg(svg_input, self.geometry_dtype)
         except Exception as e:
-            return False, f"Error al generar DXF: {str(e)}"
+            return False, None, f"Error al leer el SVG: {str(e)}"
+        return self.convert_geometry(geometry)
 
-    def _apply_transforms(self, paths, attributes):
+    def estimate(self, svg_input):
         """
-        Aplica las transformaciones SVG (translate) a los paths
+        Estima el DXF que generaría la conversión de un SVG (ver estimate_geometry)
 
         Args:
-            paths: Lista de paths SVG
-            attributes: Lista de diccionarios con atributos de cada path
+            svg_input: Contenido SVG (str o bytes), ruta o file-like object
 
         Returns:
-            Lista de paths transformados
+            tuple: (success: bool, estimación: dict o mensaje de error: str)
         """
-        transformed_paths = []
+        try:
+            geometry = parse_svg(svg_input, self.geometry_dtype)
+        except Exception as e:
+            return False, f"Error al leer el SVG: {str(e)}"
+        return True, self.estimate_geometry(geometry)
 
-        for path, attr in zip(paths, attributes):
-            # Extraer transformación translate si existe
-            transform_str = attr.get('transform', '')
-            translate_x, translate_y = self._parse_translate(transform_str)
+    def estimate_geometry(self, geometry):
+        """
+        Estima el DXF que generaría la conversión, sin aplanar ni escribir nada
 
-            # Si hay transformación, aplicarla al path
-            if translate_x != 0 or translate_y != 0:
-                # Crear path transformado
-                transformed_path = Path()
+        Cuenta los segmentos por tipo y las subdivisiones que usaría _flatten
+        (o los tramos y puntos de control de las entidades nativas) y aplica
+        el modelo de tamaño y tiempo del writer y formato configurados. No
+        descuenta la unión de paths abiertos, los duplicados, la
+        simplificación ni el ajuste de arcos. Con salidas de VTracer (líneas
+        y Bezier), para las que está calibrado, el tamaño queda dentro de
+        ±10% del real (exacto en binario en streaming); los arcos nativos y
+        los paths de una sola línea no están en el modelo y quedan por debajo.
 
-                for segment in path:
-                    # Aplicar traducción a cada segmento
-                    transformed_segment = self._translate_segment(
-                        segment, translate_x, translate_y
-                    )
-                    transformed_path.append(transformed_segment)
+        Args:
+            geometry: SVGGeometry de origen
 
-                transformed_paths.append(transformed_path)
-            else:
-                # Sin transformación, usar path original
-                transformed_paths.append(path)
+        Returns:
+            dict: segments (cantidad de lines, quadratics, cubics y arcs),
+                  entities, vertices, size (bytes) y seconds (conversión
+                  secuencial, sin contar el parseo del SVG)
+        """
+        seg_types = geometry.seg_types
+        by_type = np.bincount(seg_types, minlength=4)
+        lengths = np.diff(geometry.path_offsets)
+        paths = lengths > 0
+        closed = self._closed_paths(geometry) & paths
+        lines = seg_types == SEG_LINE
+        writer = 'streaming' if self.streaming else 'documento'
+        context = _ConversionContext(*self._svg_bounds(geometry))
+
+        # Vértices de líneas, vértices de curvas aplanadas y puntos de control de SPLINE
+        if self.use_splines and not self.streaming:
+            entities, line_vertices, control_points = self._estimate_native(geometry, paths, closed)
+            curve_vertices = 0
+        else:
+            # Mismas subdivisiones que _flatten, más el punto final de cada path abierto
+            counts = np.ones(len(seg_types), dtype=np.int64)
+            curve_indices = np.flatnonzero((seg_types == SEG_CUBIC) | (seg_types == SEG_QUADRATIC))
+            counts[curve_indices] = self._curve_subdivisions(geometry.points[curve_indices])
+            if len(geometry.arc_index):
+                counts[geometry.arc_index] = self._arc_subdivisions(
+                    self._arc_centers(geometry, geometry.arc_index)
+                )
+            entities = int(np.count_nonzero(paths))
+            line_vertices = int(np.count_nonzero(lines)) + int(np.count_nonzero(paths & ~closed))
+            curve_vertices = int(counts[~lines].sum())
+            control_points = 0
+        vertices = line_vertices + curve_vertices
+
+        size_model = _SIZE_MODEL[writer, self.dxf_format]
+        size = size_model[0] + np.dot(size_model[1:], (entities, vertices, control_points))
+        if self.dxf_format == 'asc':
+            # En ASCII cada coordenada ocupa lo que su texto: se mide en una muestra
+            # (puntos de líneas, vértices de curvas aplanadas y puntos de control).
+            # Los vértices de subdivisión casi nunca son redondos, aunque lo sean
+            # los puntos de control: se miden los de una muestra de curvas
+            curves = geometry.points[~lines]
+            size += line_vertices * _coordinate_chars(self._transform_points(geometry.points[lines, 0], context))
+            if curve_vertices:
+                size += curve_vertices * _coordinate_chars(
+                    self._transform_points(_subdivision_sample(curves, counts[~lines]), context)
+                )
+            size += control_points * _coordinate_chars(
+                self._transform_points(curves[:, :3].reshape(-1, 2), context)
+            )
 
-        return transformed_paths
+        seconds = np.dot(_TIME_MODEL[writer, self.dxf_format], (entities, vertices, control_points))
+        return {
+            'segments': dict(zip(('lines', 'quadratics', 'cubics', 'arcs'), by_type.tolist())),
+            'entities': entities,
+            'vertices': vertices,
+            'size': int(size),
+            'seconds': float(seconds)
+        }
 
-    def _parse_translate(self, transform_str):
+    def _budget_settings(self, geometry, limit, estimate):
         """
-        Extrae valores de translate de una cadena transform
+        Configuración más barata que entra en el presupuesto de tamaño
+
+        Prueba primero el formato binario y después, si las curvas se
+        aplanan, tolerancias de aplanado adaptativo cada vez mayores (ver
+        _BUDGET_TOLERANCES).
 
         Args:
-            transform_str: String con transformación (ej: "translate(481.046875,97.81640625)")
+            geometry: SVGGeometry de origen
+            limit: Tamaño máximo en bytes
+            estimate: Estimación con la configuración actual
 
         Returns:
-            tuple: (translate_x, translate_y)
+            tuple: (parámetros a cambiar: dict, la opción más barata si
+                    ninguna entra; estimación con esos parámetros: dict)
         """
-        if not transform_str:
-            return 0, 0
+        candidates = [{}]
+        if self.dxf_format != 'bin':
+            candidates.append({'dxf_format': 'bin'})
+        if self.streaming or not self.use_splines:
+            current = self.flatten_tolerance or 0.0
+            candidates += [
+                {**candidates[-1], 'flatten_tolerance': tolerance}
+                for tolerance in _BUDGET_TOLERANCES if tolerance > current
+            ]
+
+        settings = candidates[0]
+        for settings in candidates[1:]:
+            estimate = self._variant(settings).estimate_geometry(geometry)
+            if estimate['size'] <= limit:
+                break
+        return settings, estimate
+
+    def _variant(self, settings):
+        """
+        Convertidor con la misma configuración salvo algunos parámetros
+
+        Args:
+            settings: dict de parámetros y valores nuevos
+
+        Returns:
+            DXFConverterV2 nuevo (este no se modifica)
+        """
+        return DXFConverterV2(**{**self.get_config(), **settings})
+
+    def _estimate_native(self, geometry, paths, closed):
+        """
+        Entidades y vértices de la conversión con curvas nativas (ver _add_native_path)
 
-        # Buscar patrón translate(x,y) o translate(x y)
-        match = re.search(r'translate\s*\(\s*([+-]?\d+\.?\d*)\s*[,\s]\s*([+-]?\d+\.?\d*)\s*\)', transform_str)
+        Cada tramo de líneas es una polilínea, cada tramo de Bezier un SPLINE
+        y cada arco un ARC o ELLIPSE; en un path cerrado el primer y el
+        último tramo del mismo tipo se unen.
 
-        if match:
-            tx = float(match.group(1))
-            ty = float(match.group(2))
-            return tx, ty
+        Args:
+            geometry: SVGGeometry de origen
+            paths: Array bool (P,) de paths con segmentos
+            closed: Array bool (P,) de paths cerrados
 
-        return 0, 0
+        Returns:
+            tuple: (entidades, vértices de polilíneas, puntos de control de SPLINE)
+        """
+        kinds = geometry.seg_types.copy()
+        kinds[kinds == SEG_QUADRATIC] = SEG_CUBIC
+        starts = geometry.path_offsets[:-1][paths]
+        last = geometry.path_offsets[1:][paths] - 1
+
+        new_run = np.ones(len(kinds), dtype=bool)
+        new_run[1:] = (kinds[1:] != kinds[:-1]) | (kinds[1:] == SEG_ARC)
+        new_run[starts] = True
+        runs = np.add.reduceat(new_run, starts) if len(starts) else np.zeros(0, dtype=np.int64)
+        merged = closed[paths] & (runs > 1) & (kinds[starts] == kinds[last]) & (kinds[starts] != SEG_ARC)
+
+        line_runs = np.count_nonzero(new_run & (kinds == SEG_LINE)) - np.count_nonzero(merged & (kinds[starts] == SEG_LINE))
+        curve_runs = np.count_nonzero(new_run & (kinds == SEG_CUBIC)) - np.count_nonzero(merged & (kinds[starts] == SEG_CUBIC))
+        entities = int(runs.sum() - np.count_nonzero(merged))
+        vertices = int(np.count_nonzero(kinds == SEG_LINE) + line_runs)
+        control_points = int(3 * np.count_nonzero(kinds == SEG_CUBIC) + curve_runs)
+        return entities, vertices, control_points
+
+    def _write_entities(self, geometry, path_groups, writer, context, depths=None, instances=None):
+        """
+        Convierte los grupos de paths a entidades en el writer dado
 
-    def _translate_segment(self, segment, tx, ty):
+        Args:
+            geometry: SVGGeometry de origen
+            path_groups: Grupos de paths (ver _optimize_paths)
+            writer: DXFDocumentWriter o StreamingDXFWriter
+            context: _ConversionContext de la conversión
+            depths: Profundidad de anidamiento de cada grupo (ver
+                nesting_depths); si es None todo va a la capa por defecto
+            instances: Bloques ya definidos de los que cada grupo es una copia
+                (ver _define_blocks); si es None y repeat_blocks está
+                activado, se buscan y se definen aquí
+        """
+        if instances is None and self.repeat_blocks and getattr(writer, 'supports_blocks', False):
+            instances = self._define_blocks(geometry, path_groups, writer, context)
+
+        if self.workers > 1 and geometry.num_segments >= _PARALLEL_MIN_SEGMENTS and len(path_groups) > 1:
+            self._write_entities_parallel(geometry, path_groups, writer, context, depths, instances)
+            return
+
+        # Sin soporte de curvas nativas en el writer, todo se aplana
+        native_curves = self.use_splines and writer.supports_curves
+
+        # Cada tanda se aplana (con la inversión de Y) y se escribe antes de
+        # pasar a la siguiente, así la memoria no crece con el dibujo
+        for start, end in self._batch_ranges(path_groups):
+            chunk, groups = self._chunk_geometry(geometry, path_groups[start:end])
+            chunk = chunk.astype(np.float64)
+            flattened = self._flatten(chunk, context, native_curves)
+            batch_depths = None if depths is None else depths[start:end]
+            batch_instances = None if instances is None else {
+                key: value[start:end] for key, value in instances.items()
+            }
+
+            if not self.arc_tolerance:
+                self._write_groups(chunk, groups, flattened, writer, context, batch_depths, batch_instances)
+                continue
+
+            # Con ajuste de arcos la tanda pasa por un buffer: sus polilíneas
+            # se ajustan juntas y después se escriben en orden
+            buffer = EntityBuffer(writer.supports_curves)
+            self._write_groups(chunk, groups, flattened, buffer, context, batch_depths, batch_instances)
+            self._fit_pending_arcs(context)
+            buffer.replay(writer)
+
+    def _batch_ranges(self, path_groups):
         """
-        Aplica traducción a un segmento SVG
+        Parte los grupos en tandas consecutivas para aplanarlos y escribirlos
+
+        Cada tanda tiene como máximo _BATCH_GROUPS grupos y _BATCH_SEGMENTS
+        segmentos, salvo un grupo solo que ya supere ese límite.
 
         Args:
-            segment: Segmento SVG (Line, CubicBezier, etc.)
-            tx: Traslación en X
-            ty: Traslación en Y
+            path_groups: Grupos de paths (ver _optimize_paths)
 
         Returns:
-            Segmento transformado del mismo tipo
+            Lista de (primer grupo, último grupo + 1)
+        """
+        cumulative = np.cumsum(path_groups.sizes())
+        ranges = []
+        start = 0
+        while start < len(path_groups):
+            reached = cumulative[start - 1] if start else 0
+            end = int(np.searchsorted(cumulative, reached + _BATCH_SEGMENTS, side='right'))
+            end = min(max(end, start + 1), start + _BATCH_GROUPS, len(path_groups))
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def _write_groups(self, geometry, path_groups, flattened, writer, context, depths, instances):
         """
-        offset = complex(tx, ty)
+        Escribe una tanda de grupos de paths en orden (ver _write_entities)
 
-        if isinstance(segment, Line):
-            return Line(
-                start=segment.start + offset,
-                end=segment.end + offset
-            )
-        elif isinstance(segment, CubicBezier):
-            return CubicBezier(
-                start=segment.start + offset,
-                control1=segment.control1 + offset,
-                control2=segment.control2 + offset,
-                end=segment.end + offset
-            )
-        elif isinstance(segment, QuadraticBezier):
-            return QuadraticBezier(
-                start=segment.start + offset,
-                control=segment.control + offset,
-                end=segment.end + offset
-            )
-        elif isinstance(segment, Arc):
-            return Arc(
-                start=segment.start + offset,
-                radius=segment.radius,
-                rotation=segment.rotation,
-                large_arc=segment.large_arc,
-                sweep=segment.sweep,
-                end=segment.end + offset
-            )
-        else:
-            # Para otros tipos, retornar sin cambios
-            return segment
+        Args:
+            geometry: SVGGeometry de la tanda (ver _chunk_geometry)
+            path_groups: Grupos de paths de la tanda
+            flattened: Curvas aplanadas de la tanda (ver _flatten)
+            writer: Writer DXF de destino (un EntityBuffer si hay ajuste de arcos)
+            context: _ConversionContext de la conversión
+            depths: Profundidad de anidamiento de cada grupo o None
+            instances: Bloques de los que cada grupo es una copia o None
+        """
+        native_curves = self.use_splines and writer.supports_curves
+        for index, path_group in enumerate(path_groups):
+            if depths is not None:
+                prefix = 'CONTORNO' if path_group.is_closed else 'ABIERTO'
+                writer.set_layer(f"{prefix}_{depths[index]}")
+            if instances is not None and instances['block'][index] >= 0:
+                writer.add_insert(
+                    f"FORMA_{instances['block'][index]}",
+                    instances['position'][index].tolist(),
+                    float(instances['rotation'][index])
+                )
+            elif native_curves:
+                self._add_native_path(path_group, geometry, flattened, writer, context)
+            else:
+                self._convert_path_group(path_group, flattened, writer, context)
 
-    def _calculate_svg_bounds(self, paths):
+    def _define_blocks(self, geometry, path_groups, writer, context):
         """
-        Calcula los límites del SVG para inversión de coordenadas Y
+        Busca los contornos cerrados repetidos y define cada forma como bloque
+
+        Cada forma se convierte una sola vez, a partir de su primera copia, con
+        el mismo aplanado, ajuste de arcos y simplificación que el resto del
+        dibujo, y se desplaza para que su centroide quede en el origen del
+        bloque FORMA_<n>. Cada copia se reemplaza por un INSERT en su centroide.
 
         Args:
-            paths: Lista de paths SVG
+            geometry: SVGGeometry de origen
+            path_groups: Grupos de paths (ver _optimize_paths)
+            writer: Writer DXF de destino (con supports_blocks)
+            context: _ConversionContext de la conversión
+
+        Returns:
+            dict con block (G,) (número de bloque o -1), position (G, 2) y
+            rotation (G,) en grados de cada grupo, o None si nada se repite
         """
-        all_points = []
+        sizes = path_groups.sizes()
+        closed = np.flatnonzero(path_groups.closed & (sizes > 0))
+        if len(closed) < 2:
+            return None
+
+        # Segmentos de los contornos cerrados en orden de recorrido
+        mask = np.repeat(path_groups.closed & (sizes > 0), sizes)
+        segments, flipped = path_groups.segments[mask], path_groups.reversed[mask]
+        offsets = np.zeros(len(closed) + 1, dtype=np.int64)
+        np.cumsum(sizes[closed], out=offsets[1:])
+        points = geometry.points[segments]
+        points[flipped] = points[flipped, ::-1]
+
+        # Los arcos deben coincidir también en radios, rotación y sentido de giro
+        seg_types = geometry.seg_types[segments]
+        segment_keys = np.zeros((len(segments), 5), dtype=np.int64)
+        arcs = np.flatnonzero(seg_types == SEG_ARC)
+        if len(arcs):
+            params = geometry.arc_params[np.searchsorted(geometry.arc_index, segments[arcs])]
+            segment_keys[arcs, :2] = np.rint(params[:, :2] / self.tolerance)
+            segment_keys[arcs, 2] = np.rint(params[:, 2] * 1000)
+            segment_keys[arcs, 3] = params[:, 3]
+            segment_keys[arcs, 4] = params[:, 4] != flipped[arcs]
+
+        representatives, centroids, angles = repeated_shapes(
+            seg_types, points, offsets, self.tolerance,
+            rotation=self.block_rotation,
+            cyclic=np.ones(len(closed), dtype=bool),
+            segment_keys=segment_keys
+        )
+        copies = np.flatnonzero(representatives >= 0)
+        if not len(copies):
+            return None
+
+        # Número de bloque de cada copia (en el orden de su primera aparición)
+        shapes = np.unique(representatives[copies])
+        instances = {
+            'block': np.full(len(path_groups), -1, dtype=np.int64),
+            'position': np.zeros((len(path_groups), 2)),
+            'rotation': np.zeros(len(path_groups))
+        }
+        instances['block'][closed[copies]] = np.searchsorted(shapes, representatives[copies])
+        instances['position'][closed[copies]] = self._transform_points(centroids[copies], context)
+        # La inversión de Y invierte el sentido de las rotaciones
+        turns = np.degrees(angles[representatives[copies]] - angles[copies]) % 360.0
+        instances['rotation'][closed[copies]] = np.round(turns, 9) % 360.0
+
+        # Convertir cada forma una sola vez, desde su primera copia
+        originals = PathGroups.from_groups(path_groups[index] for index in closed[shapes].tolist())
+        chunk, groups = self._chunk_geometry(geometry, originals)
+        chunk = chunk.astype(np.float64)
+        native_curves = self.use_splines and writer.supports_curves
+        flattened = self._flatten(chunk, context, native_curves)
+        buffers = []
+        for path_group in groups:
+            buffer = EntityBuffer(writer.supports_curves)
+            if native_curves:
+                self._add_native_path(path_group, chunk, flattened, buffer, context)
+            else:
+                self._convert_path_group(path_group, flattened, buffer, context)
+            buffers.append(buffer)
+        self._fit_pending_arcs(context)
 
-        for path in paths:
-            for segment in path:
-                # Agregar puntos de inicio y fin
-                all_points.append(segment.start)
-                all_points.append(segment.end)
+        for number, buffer in enumerate(buffers):
+            anchor = instances['position'][closed[shapes[number]]]
+            writer.add_block(f"FORMA_{number}", buffer.translated(-anchor, self.grid_decimals))
 
-                # Para curvas, agregar puntos intermedios
-                if isinstance(segment, (CubicBezier, QuadraticBezier, Arc)):
-                    for t in np.linspace(0, 1, 10):
-                        all_points.append(segment.point(t))
+        context.block_counts = [len(shapes), len(copies)]
+        return instances
 
-        if all_points:
-            y_coords = [p.imag for p in all_points]
-            self.svg_height = max(y_coords) - min(y_coords)
-            self.y_min = min(y_coords)
-        else:
-            self.svg_height = 0
-            self.y_min = 0
+    def _write_entities_parallel(self, geometry, path_groups, writer, context, depths=None, instances=None):
+        """
+        Convierte los grupos de paths en un pool de procesos
+
+        Los grupos se parten en tramos consecutivos con aproximadamente la
+        misma cantidad de segmentos y cada proceso aplana, transforma, ajusta
+        y simplifica su tramo. Con un writer que acepta fragmentos
+        (StreamingDXFWriter) el proceso también serializa las entidades y el
+        principal solo concatena los bytes; con el resto (documento ezdxf,
+        G-code) el proceso devuelve un EntityBuffer y la escritura queda en
+        el principal, así que la ganancia se limita al aplanado, el ajuste de
+        arcos y la simplificación. En los dos casos los tramos se escriben en
+        orden y la salida es idéntica a la de la conversión secuencial.
 
-    def _optimize_paths(self, paths):
+        Args:
+            geometry: SVGGeometry de origen
+            path_groups: Grupos de paths (ver _optimize_paths)
+            writer: DXFDocumentWriter o StreamingDXFWriter
+            context: _ConversionContext de la conversión
+            depths: Profundidad de anidamiento de cada grupo o None
+            instances: Bloques de los que cada grupo es una copia o None
+        """
+        chunks = self._partition_groups(path_groups)
+        config = self._chunk_config()
+        fragment_format = writer.fmt if getattr(writer, 'supports_fragments', False) else None
+        args = [
+            (config, *self._chunk_geometry(geometry, path_groups[start:end]),
+             None if depths is None else depths[start:end],
+             None if instances is None else {key: value[start:end] for key, value in instances.items()},
+             context.svg_height, context.y_min, writer.supports_curves, fragment_format)
+            for start, end in chunks
+        ]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+            # map devuelve los resultados en orden: cada tramo se escribe en
+            # cuanto termina, mientras los siguientes siguen en proceso
+            for entities, vertex_counts, arc_counts in executor.map(_convert_chunk, *zip(*args)):
+                if fragment_format is None:
+                    entities.replay(writer)
+                else:
+                    writer.add_fragment(*entities)
+                context.vertex_counts = [a + b for a, b in zip(context.vertex_counts, vertex_counts)]
+                context.arc_counts = [a + b for a, b in zip(context.arc_counts, arc_counts)]
+
+    def _partition_groups(self, path_groups):
         """
-        Optimiza paths agrupando segmentos conectados
+        Parte los grupos en tramos consecutivos equilibrados por número de segmentos
 
         Args:
-            paths: Lista de paths SVG
+            path_groups: Grupos de paths (ver _optimize_paths)
 
         Returns:
-            Lista de paths optimizados agrupados
+            Lista de (primer grupo, último grupo + 1)
         """
-        path_groups = []
+        cumulative = np.cumsum(path_groups.sizes())
+        chunk_count = min(len(path_groups), self.workers * _CHUNKS_PER_WORKER)
 
-        for path in paths:
-            if len(path) > 0:
-                # Verificar si el path está cerrado
-                is_closed = self._is_path_closed(path)
+        # Cada tramo termina en el grupo donde el acumulado alcanza su cuota
+        targets = cumulative[-1] * np.arange(1, chunk_count) / chunk_count
+        cuts = np.searchsorted(cumulative, targets, side='left') + 1
+        bounds = np.unique(np.concatenate([[0], np.minimum(cuts, len(path_groups)), [len(path_groups)]]))
+        return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
 
-                # Agrupar el path
-                path_groups.append({
-                    'path': path,
-                    'is_closed': is_closed,
-                    'segments': list(path)
-                })
+    def _chunk_geometry(self, geometry, path_groups):
+        """
+        Extrae los segmentos de un tramo de grupos en una geometría propia
 
-        return path_groups
+        Cada grupo pasa a ser un path de la nueva geometría, con sus
+        segmentos en orden de recorrido, para enviar a cada proceso solo los
+        arrays que necesita.
+
+        Args:
+            geometry: SVGGeometry de origen
+            path_groups: Grupos de paths del tramo (ver _optimize_paths)
 
-    def _is_path_closed(self, path, tolerance=1e-3):
+        Returns:
+            tuple: (SVGGeometry del tramo, grupos con índices en esa geometría)
+        """
+        sources = path_groups.segments
+        seg_types = geometry.seg_types[sources]
+        arc_positions = np.flatnonzero(seg_types == SEG_ARC)
+        arc_params = geometry.arc_params[np.searchsorted(geometry.arc_index, sources[arc_positions])]
+        source_paths = np.searchsorted(geometry.path_offsets, sources[path_groups.offsets[:-1]], side='right') - 1
+
+        chunk = SVGGeometry(
+            seg_types=seg_types,
+            points=geometry.points[sources],
+            path_offsets=path_groups.offsets,
+            closed=path_groups.closed,
+            path_element=geometry.path_element[source_paths],
+            element_fills=geometry.element_fills,
+            arc_index=arc_positions.astype(np.int64),
+            arc_params=arc_params.reshape(-1, 5),
+            width=geometry.width,
+            height=geometry.height,
+            view_box=geometry.view_box
+        )
+        groups = PathGroups(
+            np.arange(len(sources), dtype=np.int64),
+            path_groups.reversed,
+            path_groups.offsets,
+            path_groups.closed
+        )
+        return chunk, groups
+
+    def _chunk_config(self):
+        """Parámetros del convertidor que intervienen en la conversión de cada tramo"""
+        return {
+            'bezier_subdivisions': self.bezier_subdivisions,
+            'use_splines': self.use_splines,
+            'flatten_tolerance': self.flatten_tolerance,
+            'max_curve_vertices': self.max_curve_vertices,
+            'simplify_tolerance': self.simplify_tolerance,
+            'arc_tolerance': self.arc_tolerance,
+            'units': self.units,
+            'dpi': self.dpi,
+            'coordinate_grid': self.coordinate_grid
+        }
+
+    def _svg_bounds(self, geometry):
         """
-        Verifica si un path está cerrado
+        Calcula los límites del SVG para inversión de coordenadas Y
+
+        Si el SVG declara un viewBox se usa directamente; si no, se calcula la
+        caja envolvente exacta de la geometría (ver geometry_bounds).
 
         Args:
-            path: Path SVG
-            tolerance: Tolerancia para considerar puntos como iguales
+            geometry: SVGGeometry con todos los segmentos
 
         Returns:
-            bool: True si el path está cerrado
+            tuple: (alto del SVG, Y mínima)
         """
-        if len(path) == 0:
-            return False
+        if geometry.view_box is not None:
+            return geometry.view_box[3], geometry.view_box[1]
 
-        start = path[0].start
-        end = path[-1].end
+        bounds = geometry_bounds(geometry)
+        if bounds is None:
+            return 0, 0
 
-        distance = abs(end - start)
-        return distance < tolerance
+        y_min = float(bounds[0, 1])
+        return float(bounds[1, 1]) - y_min, y_min
 
-    def _convert_path_group(self, path_group, modelspace):
+    def _arc_centers(self, geometry, segment_indices):
         """
-        Convierte un grupo de paths a entidades DXF
+        Calcula la parametrización central de los arcos indicados
 
         Args:
-            path_group: Diccionario con información del path
-            modelspace: Modelspace del documento DXF
+            geometry: SVGGeometry
+            segment_indices: Array de índices de segmentos de tipo arco
+
+        Returns:
+            tuple: Parámetros centrales (ver arc_center_parameters)
         """
-        path = path_group['path']
-        is_closed = path_group['is_closed']
+        positions = np.searchsorted(geometry.arc_index, segment_indices)
+        return arc_center_parameters(
+            geometry.points[segment_indices, 0],
+            geometry.points[segment_indices, 3],
+            geometry.arc_params[positions]
+        )
+
+    def _flatten(self, geometry, context, native_curves=False):
+        """
+        Aplana todos los segmentos de la geometría en un único array de vértices
 
-        # Si el path está cerrado, intentar crear una polilínea cerrada
-        if is_closed and self._can_convert_to_polyline(path):
-            self._add_closed_polyline(path, modelspace)
-        else:
-            # Convertir segmento por segmento
-            for segment in path:
-                self._convert_segment(segment, modelspace)
+        Cada línea aporta su punto inicial y cada curva sus puntos de
+        subdivisión (sin el final, que es el inicio del segmento siguiente).
+        Las Bezier con el mismo número de subdivisiones se evalúan con una
+        sola multiplicación contra la matriz de Bernstein precalculada y la
+        inversión de Y se aplica una sola vez.
+
+        Args:
+            geometry: SVGGeometry de origen
+            context: _ConversionContext de la conversión
+            native_curves: Si True, las curvas se emitirán como entidades
+                nativas y solo hacen falta los puntos iniciales
 
-    def _can_convert_to_polyline(self, path):
+        Returns:
+            dict: vertices (V, 2), offsets (N + 1,) del primer vértice de cada
+                  segmento y ends (N, 2) con el punto final de cada segmento,
+                  todo ya en coordenadas DXF
         """
-        Verifica si un path puede convertirse a polilínea
+        if native_curves:
+            # Las curvas se emiten como entidades nativas: solo hacen falta los puntos iniciales
+            return {
+                'vertices': self._transform_points(geometry.points[:, 0], context),
+                'offsets': np.arange(geometry.num_segments + 1, dtype=np.int64),
+                'ends': self._transform_points(geometry.points[:, 3], context)
+            }
+
+        seg_types = geometry.seg_types
+        curve_indices = np.flatnonzero((seg_types == SEG_CUBIC) | (seg_types == SEG_QUADRATIC))
+        arcs = self._arc_centers(geometry, geometry.arc_index) if len(geometry.arc_index) else None
+
+        # Número de vértices que aporta cada segmento
+        counts = np.ones(len(seg_types), dtype=np.int64)
+        counts[curve_indices] = self._curve_subdivisions(geometry.points[curve_indices])
+        if arcs is not None:
+            counts[geometry.arc_index] = self._arc_subdivisions(arcs)
+
+        offsets = np.zeros(len(seg_types) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        vertices = np.empty((offsets[-1], 2))
+
+        # Líneas: solo el punto inicial
+        line_indices = np.flatnonzero(seg_types == SEG_LINE)
+        vertices[offsets[line_indices]] = geometry.points[line_indices, 0]
+
+        # Curvas: un bloque por cada número de subdivisiones distinto
+        curve_counts = counts[curve_indices]
+        for subdivisions in np.unique(curve_counts):
+            group = curve_indices[curve_counts == subdivisions]
+            targets = offsets[group, None] + np.arange(subdivisions)
+            vertices[targets] = np.einsum(
+                'kj,njd->nkd', _bernstein_basis(subdivisions), geometry.points[group]
+            )
+
+        if arcs is not None:
+            arc_counts = counts[geometry.arc_index]
+            for subdivisions in np.unique(arc_counts):
+                mask = arc_counts == subdivisions
+                t = np.arange(subdivisions) / subdivisions
+                targets = offsets[geometry.arc_index[mask], None] + np.arange(subdivisions)
+                vertices[targets] = arc_points(*(values[mask] for values in arcs), t)
+
+        return {
+            'vertices': self._transform_points(vertices, context),
+            'offsets': offsets,
+            'ends': self._transform_points(geometry.points[:, 3], context)
+        }
+
+    def _curve_subdivisions(self, control_points):
+        """
+        Número de subdivisiones uniformes de cada Bezier cúbica
+
+        En modo adaptativo usa la cota de aplanado uniforme: con n
+        subdivisiones la desviación de cuerda es como máximo
+        max|B''| / (8 n²), y para una cúbica max|B''| <= 6 max(|P0 - 2P1 + P2|,
+        |P1 - 2P2 + P3|). La curvatura se pasa a unidades del DXF con scale.
 
         Args:
-            path: Path SVG
+            control_points: Array (K, 4, 2) de puntos de control
 
         Returns:
-            bool: True si puede convertirse a polilínea
+            Array int64 (K,) de subdivisiones por curva
         """
-        # Puede convertirse a polilínea si tiene segmentos conectados
-        return len(path) > 1
+        if self.flatten_tolerance is None:
+            return np.full(len(control_points), self.bezier_subdivisions, dtype=np.int64)
 
-    def _add_closed_polyline(self, path, modelspace):
+        second_diff = control_points[:, :2] - 2 * control_points[:, 1:3] + control_points[:, 2:]
+        curvature = np.linalg.norm(second_diff, axis=2).max(axis=1)
+        subdivisions = np.ceil(np.sqrt(0.75 * curvature * self.scale / self.flatten_tolerance))
+        return np.clip(subdivisions, 1, self.max_curve_vertices).astype(np.int64)
+
+    def _arc_subdivisions(self, arcs):
         """
-        Agrega una polilínea cerrada al DXF
+        Número de subdivisiones de cada arco
+
+        En modo adaptativo el paso angular se elige para que la sagita
+        r (1 - cos(paso / 2)) no supere la tolerancia.
 
         Args:
-            path: Path SVG cerrado
-            modelspace: Modelspace del documento DXF
+            arcs: Parámetros centrales de los arcos (ver arc_center_parameters)
+
+        Returns:
+            Array int64 (M,) de subdivisiones por arco
+        """
+        _, rx, ry, _, _, delta = arcs
+        if self.flatten_tolerance is None:
+            return np.full(len(delta), self.bezier_subdivisions, dtype=np.int64)
+
+        radius = np.maximum(rx, ry) * self.scale
+        step = 2 * np.arccos(np.clip(1 - self.flatten_tolerance / radius, -1.0, 1.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            subdivisions = np.ceil(np.abs(delta) / step)
+        subdivisions = np.nan_to_num(subdivisions, nan=1.0, posinf=self.max_curve_vertices)
+        return np.clip(subdivisions, 1, self.max_curve_vertices).astype(np.int64)
+
+    def _optimize_paths(self, geometry):
         """
-        points = []
+        Optimiza paths uniendo en cadenas los paths abiertos conectados
 
-        for segment in path:
-            if isinstance(segment, Line):
-                # Para líneas, solo agregar el punto de inicio
-                start = self._transform_point(segment.start)
-                points.append(start)
+        Los extremos de los paths abiertos se indexan en una grilla de celdas
+        de lado `tolerance`; cada cadena se extiende por ambos extremos con el
+        path libre más cercano (invirtiéndolo si hace falta) y se cierra si
+        sus extremos terminan coincidiendo.
+
+        Args:
+            geometry: SVGGeometry con todos los paths
+
+        Returns:
+            PathGroups: primero los paths cerrados, en orden, y luego las cadenas
+        """
+        lengths = np.diff(geometry.path_offsets)
+        closed = self._closed_paths(geometry)
+        closed_paths = np.flatnonzero(closed)
+        open_paths = np.flatnonzero(~closed & (lengths > 0))
+
+        # Cada path cerrado es un grupo con sus segmentos en orden
+        closed_lengths = lengths[closed_paths]
+        closed_offsets = np.zeros(len(closed_paths) + 1, dtype=np.int64)
+        np.cumsum(closed_lengths, out=closed_offsets[1:])
+        closed_segments = (
+            np.arange(closed_offsets[-1], dtype=np.int64)
+            + np.repeat(geometry.path_offsets[closed_paths] - closed_offsets[:-1], closed_lengths)
+        )
+
+        chains = PathGroups.from_groups(self._chain_open_paths(geometry, open_paths))
+        return PathGroups(
+            np.concatenate([closed_segments, chains.segments]),
+            np.concatenate([np.zeros(len(closed_segments), dtype=bool), chains.reversed]),
+            np.concatenate([closed_offsets, closed_offsets[-1] + chains.offsets[1:]]),
+            np.concatenate([np.ones(len(closed_paths), dtype=bool), chains.closed])
+        )
+
+    def _chain_open_paths(self, geometry, open_paths):
+        """
+        Une los paths abiertos conectados en cadenas (ver _optimize_paths)
+
+        Args:
+            geometry: SVGGeometry con todos los paths
+            open_paths: Índices de los paths abiertos no vacíos
+
+        Returns:
+            Lista de PathGroup, una por cadena
+        """
+        chains = []
+        if not len(open_paths):
+            return chains
+
+        ranges = np.column_stack([
+            geometry.path_offsets[open_paths], geometry.path_offsets[open_paths + 1]
+        ]).astype(np.int64)
+        # Extremos: fila 2k = inicio del path k, fila 2k + 1 = fin del path k
+        endpoints = np.empty((2 * len(ranges), 2))
+        endpoints[0::2] = geometry.points[ranges[:, 0], 0]
+        endpoints[1::2] = geometry.points[ranges[:, 1] - 1, 3]
+
+        cell_size = self.tolerance if self.tolerance > 0 else 1e-9
+        cells = np.floor(endpoints / cell_size).astype(np.int64)
+        grid = {}
+        for endpoint, cell in enumerate(map(tuple, cells.tolist())):
+            grid.setdefault(cell, []).append(endpoint)
+
+        used = np.zeros(len(ranges), dtype=bool)
+
+        def take_nearest(point):
+            # Extremo libre más cercano dentro de la tolerancia (celdas vecinas)
+            cx, cy = np.floor(point / cell_size).astype(np.int64).tolist()
+            best, best_distance = None, self.tolerance
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for endpoint in grid.get((cx + dx, cy + dy), ()):
+                        if used[endpoint >> 1]:
+                            continue
+                        distance = np.hypot(*(endpoints[endpoint] - point))
+                        if distance <= best_distance:
+                            best, best_distance = endpoint, distance
+            if best is not None:
+                used[best >> 1] = True
+            return best
+
+        for first in range(len(ranges)):
+            if used[first]:
+                continue
+            used[first] = True
+            head, tail = 2 * first, 2 * first + 1
+            pieces = [(first, False)]
+
+            # Extender hacia adelante desde el final de la cadena
+            while True:
+                endpoint = take_nearest(endpoints[tail])
+                if endpoint is None:
+                    break
+                # Si coincide con el final del otro path, se recorre invertido
+                flipped = bool(endpoint & 1)
+                pieces.append((endpoint >> 1, flipped))
+                tail = endpoint ^ 1
+
+            # Extender hacia atrás desde el inicio de la cadena
+            prefix = []
+            while True:
+                endpoint = take_nearest(endpoints[head])
+                if endpoint is None:
+                    break
+                # Si coincide con el inicio del otro path, se recorre invertido
+                flipped = not endpoint & 1
+                prefix.append((endpoint >> 1, flipped))
+                head = endpoint ^ 1
+
+            pieces = prefix[::-1] + pieces
+            chain = [(int(ranges[k, 0]), int(ranges[k, 1]), flipped) for k, flipped in pieces]
+            gap = np.hypot(*(endpoints[head] - endpoints[tail]))
+            chains.append(self._make_group(chain, len(chain) > 1 and gap <= self.tolerance))
+
+        return chains
+
+    def _group_outlines(self, geometry, path_groups, context):
+        """
+        Puntos de entrada y polígono aproximado de cada grupo, en coordenadas DXF
+
+        Cada grupo cerrado puede empezar en el inicio de cualquiera de sus
+        segmentos; cada cadena abierta puede recorrerse en cualquier sentido.
+        El anidamiento y el sentido de giro se evalúan sobre el polígono de
+        inicios y puntos medios de los segmentos.
+
+        Args:
+            geometry: SVGGeometry de origen
+            path_groups: Grupos de paths (ver _optimize_paths)
+            context: _ConversionContext de la conversión
+
+        Returns:
+            Lista de dicts con points, closed y outline (ver ToolpathOptimizer.optimize)
+        """
+        points = geometry.points
+        middles = (points[:, 0] + 3 * points[:, 1] + 3 * points[:, 2] + points[:, 3]) / 8
+        if len(geometry.arc_index):
+            arcs = self._arc_centers(geometry, geometry.arc_index)
+            middles[geometry.arc_index] = arc_points(*arcs, np.array([0.5]))[:, 0]
+        starts = self._transform_points(points[:, 0], context)
+        ends = self._transform_points(points[:, 3], context)
+        middles = self._transform_points(middles, context)
+
+        paths = []
+        for group in path_groups:
+            segments = group.segments
+            flipped = group.reversed[:, None]
+            entries = np.where(flipped, ends[segments], starts[segments])
+            outline = np.stack([entries, middles[segments]], axis=1).reshape(-1, 2)
+            if group.is_closed:
+                paths.append({'points': entries, 'closed': True, 'outline': outline})
             else:
-                # Para curvas, subdividir
-                curve_points = self._subdivide_curve(segment)
-                # Agregar todos los puntos excepto el último (para evitar duplicados)
-                points.extend(curve_points[:-1])
+                last = np.where(flipped[-1], starts[segments[-1]], ends[segments[-1]])
+                paths.append({
+                    'points': np.vstack([entries[:1], last]),
+                    'closed': False,
+                    'outline': np.vstack([outline, last])
+                })
+        return paths
 
-        if len(points) > 2:
-            # Crear polilínea cerrada
-            polyline = modelspace.add_lwpolyline(points)
-            polyline.close(True)
+    def _order_paths(self, path_groups, outlines, parents=None):
+        """
+        Ordena los grupos para minimizar el recorrido en vacío
 
-    def _convert_segment(self, segment, modelspace):
+        Args:
+            path_groups: Grupos de paths (ver _optimize_paths)
+            outlines: Entradas y polígonos de los grupos (ver _group_outlines)
+            parents: Contorno padre de cada grupo ya calculado (ver
+                contour_parents) o None
+
+        Returns:
+            tuple: (PathGroups en orden de corte, rotados e invertidos según
+                    corresponda, array con el índice original de cada grupo,
+                    reporte del recorrido de ToolpathOptimizer)
         """
-        Convierte un segmento individual a entidad DXF
+        optimizer = ToolpathOptimizer(
+            time_budget=self.toolpath_time,
+            inner_first=self.inner_first,
+            loop_direction=self.loop_direction
+        )
+        order, report = optimizer.optimize(outlines, parents)
+        ordered = PathGroups.from_groups(
+            self._orient_group(path_groups[index], start, reverse) for index, start, reverse in order
+        )
+        return ordered, np.array([index for index, _, _ in order], dtype=np.int64), report
+
+    def _orient_group(self, path_group, start, reverse):
+        """
+        Rota un grupo para que empiece en el segmento start y opcionalmente lo invierte
 
         Args:
-            segment: Segmento SVG
-            modelspace: Modelspace del documento DXF
+            path_group: PathGroup del grupo (ver _optimize_paths)
+            start: Posición del segmento inicial dentro del grupo
+            reverse: Si el grupo se recorre en sentido inverso
+
+        Returns:
+            PathGroup rotado (e invertido)
+        """
+        segments = np.roll(path_group.segments, -start)
+        reversed_mask = np.roll(path_group.reversed, -start)
+        if reverse:
+            # El último segmento, recorrido al revés, empieza en el punto de entrada
+            segments = segments[::-1]
+            reversed_mask = ~reversed_mask[::-1]
+        return PathGroup(segments, reversed_mask, path_group.is_closed)
+
+    def _make_group(self, pieces, is_closed):
         """
-        if isinstance(segment, Line):
-            self._add_line(segment, modelspace)
-        elif isinstance(segment, CubicBezier):
-            self._add_cubic_bezier(segment, modelspace)
-        elif isinstance(segment, QuadraticBezier):
-            self._add_quadratic_bezier(segment, modelspace)
-        elif isinstance(segment, Arc):
-            self._add_arc(segment, modelspace)
+        Construye un grupo de conversión a partir de tramos de paths
 
-    def _add_line(self, segment, modelspace):
+        Args:
+            pieces: Lista de (primer segmento, último segmento + 1, invertido)
+            is_closed: Si la cadena resultante está cerrada
+
+        Returns:
+            PathGroup con segments, reversed e is_closed
+        """
+        segments = np.concatenate([
+            np.arange(end - 1, start - 1, -1) if flipped else np.arange(start, end)
+            for start, end, flipped in pieces
+        ])
+        reversed_mask = np.concatenate([
+            np.full(end - start, flipped, dtype=bool) for start, end, flipped in pieces
+        ])
+        return PathGroup(segments, reversed_mask, is_closed)
+
+    def _closed_paths(self, geometry, tolerance=None):
         """
-        Agrega una línea recta al DXF con coordenadas transformadas
+        Verifica qué paths están cerrados (su final coincide con su inicio)
 
         Args:
-            segment: Segmento Line de SVG
-            modelspace: Modelspace del documento DXF
+            geometry: SVGGeometry
+            tolerance: Tolerancia para considerar puntos como iguales
+                (None = tolerancia del convertidor)
+
+        Returns:
+            Array bool (P,) con True en los paths cerrados (los vacíos no lo están)
         """
-        start = self._transform_point(segment.start)
-        end = self._transform_point(segment.end)
-        modelspace.add_line(start, end)
+        if tolerance is None:
+            tolerance = self.tolerance
+
+        lengths = np.diff(geometry.path_offsets)
+        starts = geometry.path_offsets[:-1][lengths > 0]
+        ends = geometry.path_offsets[1:][lengths > 0]
+        gap = geometry.points[ends - 1, 3] - geometry.points[starts, 0]
 
-    def _add_cubic_bezier(self, segment, modelspace):
+        closed = np.zeros(geometry.num_paths, dtype=bool)
+        closed[lengths > 0] = np.hypot(gap[:, 0], gap[:, 1]) <= tolerance
+        return closed
+
+    def _convert_path_group(self, path_group, flattened, writer, context):
+        """
+        Convierte un grupo de paths a polilíneas aplanadas
+
+        Args:
+            path_group: PathGroup del grupo (ver _optimize_paths)
+            flattened: Vértices aplanados (ver _flatten)
+            writer: Writer DXF de destino
+            context: _ConversionContext de la conversión
         """
-        Convierte curva Bezier cúbica a polilínea
+        segments = path_group.segments
+        reversed_mask = path_group.reversed
+
+        # Si el grupo está cerrado, intentar crear una polilínea cerrada
+        if path_group.is_closed and self._can_convert_to_polyline(segments):
+            self._add_closed_polyline(flattened, segments, reversed_mask, writer, context)
+            return
+
+        # Cadena abierta: una sola polilínea (o línea si es un único tramo recto)
+        points = self._chain_vertices(flattened, segments, reversed_mask)
+        if len(points) == 2:
+            writer.add_line(points[0].tolist(), points[1].tolist())
+        elif len(points) > 2:
+            self._emit_polyline(points, writer, context)
+
+    def _can_convert_to_polyline(self, segments):
+        """
+        Verifica si un grupo cerrado puede convertirse a polilínea cerrada
 
         Args:
-            segment: Segmento CubicBezier de SVG
-            modelspace: Modelspace del documento DXF
+            segments: Índices de los segmentos del grupo
+
+        Returns:
+            bool: True si puede convertirse a polilínea
         """
-        points = self._subdivide_curve(segment)
-        modelspace.add_lwpolyline(points)
+        # Puede convertirse a polilínea si tiene segmentos conectados
+        return len(segments) > 1
 
-    def _add_quadratic_bezier(self, segment, modelspace):
+    def _add_closed_polyline(self, flattened, segments, reversed_mask, writer, context):
         """
-        Convierte curva Bezier cuadrática a polilínea
+        Agrega una polilínea cerrada al DXF
 
         Args:
-            segment: Segmento QuadraticBezier de SVG
-            modelspace: Modelspace del documento DXF
+            flattened: Vértices aplanados (ver _flatten)
+            segments: Índices de los segmentos en orden de recorrido
+            reversed_mask: Si cada segmento se recorre invertido
+            writer: Writer DXF de destino
+            context: _ConversionContext de la conversión
         """
-        points = self._subdivide_curve(segment)
-        modelspace.add_lwpolyline(points)
+        # El cierre une el último vértice con el primero
+        points = self._chain_vertices(flattened, segments, reversed_mask, include_end=False)
+        if len(points) > 2:
+            # Crear polilínea cerrada
+            self._emit_polyline(points, writer, context, closed=True)
 
-    def _add_arc(self, segment, modelspace):
+    def _emit_polyline(self, points, writer, context, closed=False):
         """
-        Convierte arco a polilínea
+        Simplifica (si está configurado) y escribe una polilínea
+
+        Con ajuste de arcos la polilínea se escribe tal cual y queda pendiente:
+        _fit_pending_arcs la ajusta después junto con las demás.
 
         Args:
-            segment: Segmento Arc de SVG
-            modelspace: Modelspace del documento DXF
+            points: Array (K, 2) de vértices en coordenadas DXF
+            writer: Writer DXF de destino (un EntityBuffer si hay ajuste de arcos)
+            context: _ConversionContext donde se cuentan vértices y arcos
+            closed: Si la polilínea es cerrada (se simplifica como anillo)
+        """
+        context.vertex_counts[0] += len(points)
+
+        if self.arc_tolerance:
+            context.pending_arcs.append((writer, len(writer.entities), points, closed))
+            writer.add_polyline(points, closed=closed)
+            return
+
+        if self.simplify_tolerance:
+            if closed:
+                points = simplify_ring(points, self.simplify_tolerance)
+            else:
+                points = simplify_polyline(points, self.simplify_tolerance)
+
+        context.vertex_counts[1] += len(points)
+        writer.add_polyline(points, closed=closed)
+
+    def _fit_pending_arcs(self, context):
         """
-        points = self._subdivide_curve(segment)
-        modelspace.add_lwpolyline(points)
+        Ajusta arcos en todas las polilíneas pendientes y las reemplaza en sus buffers
 
-    def _subdivide_curve(self, segment):
+        Los contornos cerrados circulares se reemplazan por un CIRCLE; en el
+        resto los tramos circulares se ajustan sobre los vértices originales y
+        la simplificación solo actúa sobre los tramos rectos que quedan entre arcos.
+
+        Args:
+            context: _ConversionContext con las polilíneas pendientes (ver _emit_polyline)
         """
-        Subdivide una curva en puntos con coordenadas transformadas
+        pending, context.pending_arcs = context.pending_arcs, []
+        if not pending:
+            return
+
+        closed = [index for index, (*_, is_closed) in enumerate(pending) if is_closed]
+        circles = dict(zip(closed, fit_circles([pending[index][2] for index in closed], self.arc_tolerance)))
+        rest = [index for index in range(len(pending)) if circles.get(index) is None]
+        fitted = fit_arcs(
+            [pending[index][2] for index in rest],
+            self.arc_tolerance,
+            [pending[index][3] for index in rest]
+        )
+
+        for index, circle in circles.items():
+            if circle is not None:
+                buffer, position = pending[index][:2]
+                buffer.replace(position, 'add_circle', circle[0].tolist(), circle[1])
+                context.arc_counts[1] += 1
+                context.vertex_counts[1] += 1
+
+        for index, (points, bulges) in zip(rest, fitted):
+            buffer, position, _, is_closed = pending[index]
+            context.arc_counts[0] += int(np.count_nonzero(bulges))
+            if self.simplify_tolerance:
+                points, bulges = simplify_with_bulges(points, bulges, self.simplify_tolerance, closed=is_closed)
+            context.vertex_counts[1] += len(points)
+            buffer.replace(position, 'add_polyline', points, is_closed, bulges)
+
+    def _chain_vertices(self, flattened, segments, reversed_mask, include_end=True):
+        """
+        Reúne los vértices aplanados de una cadena de segmentos
+
+        Cada segmento aporta sus vértices sin el punto final (que coincide,
+        dentro de la tolerancia, con el inicio del siguiente); un segmento
+        invertido aporta su punto final y sus vértices interiores al revés.
+        Los vértices iguales al anterior se descartan.
 
         Args:
-            segment: Segmento de curva SVG
+            flattened: Vértices aplanados (ver _flatten)
+            segments: Índices de los segmentos en orden de recorrido
+            reversed_mask: Si cada segmento se recorre invertido
+            include_end: Si agregar el punto final de la cadena
 
         Returns:
-            Lista de tuplas (x, y) transformadas
+            Array (K, 2) de vértices en coordenadas DXF, sin repetidos consecutivos
         """
-        points = []
-        for i in range(self.bezier_subdivisions + 1):
-            t = i / self.bezier_subdivisions
-            point = segment.point(t)
-            transformed = self._transform_point(point)
-            points.append(transformed)
-        return points
+        offsets = flattened['offsets']
+        first = offsets[segments]
+        counts = offsets[segments + 1] - first
+
+        # Posición de cada vértice dentro de su segmento
+        starts = np.cumsum(counts) - counts
+        local = np.arange(counts.sum()) - np.repeat(starts, counts)
+        flipped = np.repeat(reversed_mask, counts)
+
+        # Un segmento invertido empieza por su punto final y sigue con sus
+        # vértices interiores en orden inverso
+        index = np.where(flipped, np.repeat(first + counts, counts) - local, np.repeat(first, counts) + local)
+        from_end = flipped & (local == 0)
+
+        points = flattened['vertices'][np.where(from_end, 0, index)]
+        points[from_end] = flattened['ends'][segments[reversed_mask]]
+
+        if include_end:
+            last = segments[-1]
+            last_point = flattened['vertices'][offsets[last]] if reversed_mask[-1] else flattened['ends'][last]
+            points = np.vstack([points, last_point])
+        # Vértices que quedaron en el mismo punto (ej: al redondear a la grilla)
+        return _drop_collapsed(points, closed=not include_end)
+
+    def _add_native_path(self, path_group, geometry, flattened, writer, context):
+        """
+        Convierte un grupo de paths a entidades DXF nativas
+
+        Cada tramo de Bezier consecutivas se emite como un único SPLINE, cada
+        arco como ARC o ELLIPSE exacto y solo los tramos de líneas rectas
+        como polilíneas.
 
-    def _transform_point(self, complex_point):
+        Args:
+            path_group: PathGroup del grupo (ver _optimize_paths)
+            geometry: SVGGeometry de origen
+            flattened: Vértices aplanados (ver _flatten)
+            writer: Writer DXF de destino (con soporte de curvas nativas)
+            context: _ConversionContext de la conversión
+        """
+        segments = path_group.segments
+        reversed_mask = path_group.reversed
+        runs = self._segment_runs(geometry, segments)
+
+        # En un grupo cerrado, el primer y el último tramo del mismo tipo son uno solo
+        if (path_group.is_closed and len(runs) > 1
+                and runs[0][0] == runs[-1][0] and runs[0][0] != SEG_ARC):
+            kind, last = runs.pop()
+            runs[0] = (kind, np.concatenate([last, runs[0][1]]))
+
+        if len(runs) == 1 and runs[0][0] == SEG_LINE and path_group.is_closed:
+            if self._can_convert_to_polyline(segments):
+                self._add_closed_polyline(flattened, segments, reversed_mask, writer, context)
+                return
+
+        for kind, positions in runs:
+            if kind == SEG_LINE:
+                points = self._chain_vertices(flattened, segments[positions], reversed_mask[positions])
+                if len(points) == 2:
+                    writer.add_line(points[0].tolist(), points[1].tolist())
+                elif len(points) > 2:
+                    self._emit_polyline(points, writer, context)
+            elif kind == SEG_ARC:
+                # ARC y ELLIPSE no tienen sentido de recorrido: la inversión no importa
+                self._add_arc_entity(geometry, int(segments[positions[0]]), writer, context)
+            else:
+                self._add_bezier_spline(geometry, segments[positions], reversed_mask[positions], writer, context)
+
+    def _segment_runs(self, geometry, segments):
         """
-        Transforma un punto complejo SVG a coordenadas DXF
+        Agrupa los segmentos de una cadena en tramos consecutivos del mismo tipo
+
+        Cuadráticas y cúbicas forman un mismo tramo (ambas se guardan como
+        cúbicas) y cada arco forma su propio tramo.
 
         Args:
-            complex_point: Punto en formato complejo (x + yj)
+            geometry: SVGGeometry de origen
+            segments: Índices de los segmentos en orden de recorrido
 
         Returns:
-            tuple: (x, y) con Y invertido para coordenadas DXF
+            Lista de (tipo, array de posiciones dentro de la cadena)
         """
-        x = complex_point.real
-        y = complex_point.imag
+        kinds = geometry.seg_types[segments]
+        kinds[kinds == SEG_QUADRATIC] = SEG_CUBIC
 
-        # Invertir Y: DXF usa origen en la esquina inferior izquierda
-        # SVG usa origen en la esquina superior izquierda
-        y_inverted = self.svg_height + self.y_min - y
+        breaks = np.flatnonzero((kinds[1:] != kinds[:-1]) | (kinds[1:] == SEG_ARC)) + 1
+        bounds = np.concatenate([[0], breaks, [len(kinds)]])
+        return [
+            (int(kinds[a]), np.arange(a, b))
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
 
-        return (x, y_inverted)
+    def _add_bezier_spline(self, geometry, indices, reversed_mask, writer, context):
+        """
+        Emite una cadena de Bezier cúbicas como un único SPLINE de grado 3
 
-    def set_subdivisions(self, subdivisions):
+        Los puntos de control se concatenan compartiendo los extremos y cada
+        unión lleva un nudo de multiplicidad 3, lo que reproduce exactamente
+        la cadena de Bezier.
+
+        Args:
+            geometry: SVGGeometry de origen
+            indices: Índices de los segmentos de la cadena
+            reversed_mask: Si cada segmento se recorre invertido
+            writer: Writer DXF de destino
+            context: _ConversionContext de la conversión
+        """
+        points = geometry.points[indices]
+        points[reversed_mask] = points[reversed_mask, ::-1]
+        control_points = np.concatenate([points[:, :3].reshape(-1, 2), points[-1, 3:]])
+        control_points = self._transform_points(control_points, context)
+
+        count = len(indices)
+        knots = np.concatenate([[0.0], np.repeat(np.arange(count + 1, dtype=np.float64), 3), [count]])
+        writer.add_spline(control_points.tolist(), knots.tolist())
+
+    def _add_arc_entity(self, geometry, index, writer, context):
         """
-        Actualiza el número de subdivisiones para curvas
+        Emite un arco SVG como ARC (circular) o ELLIPSE exacto
+
+        La inversión de Y invierte el sentido de giro, por eso los ángulos
+        se niegan y se intercambian inicio y fin cuando el arco SVG gira en
+        sentido positivo.
 
         Args:
-            subdivisions: Nuevo número de subdivisiones
+            geometry: SVGGeometry de origen
+            index: Índice del segmento de arco
+            writer: Writer DXF de destino
+            context: _ConversionContext de la conversión
         """
-        self.bezier_subdivisions = max(10, min(100, subdivisions))
+        centers, rx, ry, phi, theta1, delta = self._arc_centers(geometry, np.array([index]))
+        center = self._transform_points(centers, context)[0].tolist()
+        rx, ry = float(rx[0]) * self.scale, float(ry[0]) * self.scale
+        phi, theta1, delta = float(phi[0]), float(theta1[0]), float(delta[0])
+
+        if abs(rx - ry) <= 1e-9 * max(rx, ry):
+            first = -np.degrees(theta1 + phi)
+            second = -np.degrees(theta1 + delta + phi)
+            start_angle, end_angle = (second, first) if delta > 0 else (first, second)
+            writer.add_arc(center, rx, start_angle, end_angle)
+            return
+
+        if rx >= ry:
+            major_axis = (rx * np.cos(phi), -rx * np.sin(phi), 0.0)
+            ratio = ry / rx
+            offset = 0.0
+        else:
+            major_axis = (-ry * np.sin(phi), -ry * np.cos(phi), 0.0)
+            ratio = rx / ry
+            offset = np.pi / 2
 
-    def set_use_splines(self, use_splines):
+        first = offset - theta1
+        second = offset - theta1 - delta
+        start_param, end_param = (second, first) if delta > 0 else (first, second)
+        writer.add_ellipse(center, major_axis, ratio, start_param, end_param)
+
+    def _insunits(self):
+        """Código $INSUNITS de las unidades de salida (0 = sin unidades)"""
+        return DXF_UNITS[self.units][1] if self.units else 0
+
+    def _transform_points(self, points, context):
         """
-        Configura si usar splines DXF nativos
+        Transforma puntos SVG a coordenadas DXF
 
         Args:
-            use_splines: bool
+            points: Array (K, 2) de puntos en coordenadas SVG
+            context: _ConversionContext con los límites del SVG
+
+        Returns:
+            Array (K, 2) con Y invertido, escalado a las unidades del DXF y
+            redondeado a coordinate_grid
         """
-        self.use_splines = use_splines
+        # Invertir Y: DXF usa origen en la esquina inferior izquierda
+        # SVG usa origen en la esquina superior izquierda
+        transformed = np.array(points, dtype=np.float64)
+        transformed[:, 1] = context.svg_height + context.y_min - transformed[:, 1]
+        if self.scale != 1.0:
+            transformed *= self.scale
+        if self.coordinate_grid:
+            # Redondear al múltiplo de la grilla con sus decimales exactos (texto corto en ASCII)
+            transformed = np.round(np.rint(transformed / self.coordinate_grid) * self.coordinate_grid, self.grid_decimals)
+        return transformed
+
+
+def _convert_chunk(config, geometry, path_groups, depths, instances, svg_height, y_min, supports_curves,
+                   fragment_format=None):
+    """
+    Convierte un tramo de grupos de paths a entidades en memoria
+
+    Función de módulo para poder ejecutarse en un pool de procesos.
+
+    Args:
+        config: Parámetros del convertidor (ver DXFConverterV2._chunk_config)
+        geometry: SVGGeometry del tramo
+        path_groups: Grupos de paths del tramo
+        depths: Profundidad de anidamiento de cada grupo del tramo o None
+        instances: Bloques de los que cada grupo del tramo es una copia o None
+        svg_height: Alto del SVG para la inversión de Y
+        y_min: Y mínima del SVG para la inversión de Y
+        supports_curves: Si el writer de destino soporta curvas nativas
+        fragment_format: Formato ('asc' o 'bin') en el que serializar las
+            entidades para StreamingDXFWriter.add_fragment, o None para
+            devolverlas en un EntityBuffer
+
+    Returns:
+        tuple: (EntityBuffer o (datos serializados, número de entidades),
+        vertex_counts, arc_counts)
+    """
+    context = _ConversionContext(svg_height, y_min)
+    if fragment_format is None:
+        writer = EntityBuffer(supports_curves)
+    else:
+        writer = StreamingDXFWriter.fragment(fragment_format)
+    DXFConverterV2(**config)._write_entities(geometry, path_groups, writer, context, depths, instances)
+    entities = writer if fragment_format is None else (writer.fragment_data(), writer.entity_count)
+    return entities, context.vertex_counts, context.arc_counts
+
+
+def _format_size(size):
+    """Tamaño en bytes como texto (KB por debajo de 1 MB)"""
+    if size < 2 ** 20:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / 2 ** 20:.1f} MB"
+
+
+def _decimals(step):
+    """Decimales necesarios para escribir exactamente un paso de grilla (ej: 0.005 → 3)"""
+    return max(0, -Decimal(repr(step)).as_tuple().exponent)
+
+
+def _drop_collapsed(points, closed=False):
+    """
+    Quita los vértices que coinciden con el anterior (segmentos de largo cero)
+
+    Args:
+        points: Array (K, 2) de vértices
+        closed: Si el último vértice se une con el primero
+
+    Returns:
+        Array (K', 2) sin vértices repetidos consecutivos
+    """
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    if closed and len(points) > 1:
+        keep[-1] &= bool(np.any(points[-1] != points[0]))
+    return points if keep.all() else points[keep]
+
+
+def _coordinate_chars(points, sample_size=1000):
+    """
+    Caracteres medios de un punto (x e y) en DXF ASCII, medidos en una muestra
+
+    Args:
+        points: Array (K, 2) de puntos en coordenadas DXF
+        sample_size: Máximo de puntos medidos (repartidos en todo el array)
+
+    Returns:
+        float: Caracteres por punto (0 si no hay puntos)
+    """
+    if not len(points):
+        return 0.0
+    sample = points[np.linspace(0, len(points) - 1, min(len(points), sample_size)).astype(np.int64)]
+    return sum(len(repr(x)) + len(repr(y)) for x, y in sample.tolist()) / len(sample)
+
+
+def _subdivision_sample(curves, counts, sample_size=200):
+    """
+    Vértices de subdivisión de una muestra de curvas, como los calcularía _flatten
+
+    Args:
+        curves: Array (N, 4, 2) de puntos de control de las curvas
+        counts: Array (N,) de subdivisiones por curva
+        sample_size: Máximo de curvas evaluadas (repartidas en todo el array)
+
+    Returns:
+        np.ndarray: Array (K, 2) de vértices (sin el final de cada curva)
+    """
+    sample = np.linspace(0, len(curves) - 1, min(len(curves), sample_size)).astype(np.int64)
+    return np.concatenate([
+        _bernstein_basis(int(counts[index])) @ curves[index] for index in sample
+    ])
+
+
+@lru_cache(maxsize=None)
+def _bernstein_basis(subdivisions):
+    """
+    Matriz de Bernstein cúbica para t = i / subdivisions, i = 0..subdivisions - 1
+
+    Se calcula una sola vez por número de subdivisiones.
+
+    Args:
+        subdivisions: Número de subdivisiones por curva
+
+    Returns:
+        Array de solo lectura (subdivisions, 4)
+    """
+    basis = cubic_basis(np.arange(subdivisions) / subdivisions)
+    basis.setflags(write=False)
+    return basis
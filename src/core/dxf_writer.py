@@ -0,0 +1,537 @@
+"""
+Módulo de escritura DXF
+Backends de salida del convertidor: documento ezdxf completo o escritura en streaming
+"""
+
+import io
+from functools import lru_cache
+
+import ezdxf
+import numpy as np
+from ezdxf.addons.r12writer import BinaryDXFWriter, R12FastStreamWriter
+
+
+# Formatos de salida soportados (mismos nombres que ezdxf)
+DXF_FORMATS = ('asc', 'bin')
+
+
+def _is_binary_stream(stream):
+    """Indica si un stream recibe bytes (BytesIO, archivo abierto en modo 'wb', ...)"""
+    return isinstance(stream, (io.RawIOBase, io.BufferedIOBase))
+
+
+class DXFDocumentWriter:
+    """
+    Escribe entidades en un documento ezdxf R2010 en memoria
+
+    Es el backend de máxima fidelidad: soporta SPLINE y ELLIPSE nativos y
+    permite validar el documento con ezdxf antes de guardarlo.
+    """
+
+    # Soporta curvas nativas (SPLINE, ELLIPSE)
+    supports_curves = True
+
+    # Soporta bloques (BLOCK e INSERT)
+    supports_blocks = True
+
+    def __init__(self, fmt='asc', units=0):
+        """
+        Crea el documento y su modelspace
+
+        Args:
+            fmt: 'asc' para DXF ASCII o 'bin' para DXF binario
+            units: Código $INSUNITS de las coordenadas (0 = sin unidades,
+                1 = pulgadas, 4 = milímetros)
+        """
+        if fmt not in DXF_FORMATS:
+            raise ValueError(f"Formato DXF desconocido: {fmt}")
+        self.fmt = fmt
+        self.doc = ezdxf.new('R2010')
+        # ezdxf declara metros por defecto: las coordenadas SVG no tienen unidad
+        self.doc.units = units
+        if units:
+            self.doc.header['$MEASUREMENT'] = 0 if units == 1 else 1
+        self.modelspace = self.doc.modelspace()
+        self.entity_count = 0
+        self._attribs = {'layer': '0'}
+
+    def set_layer(self, name):
+        """Capa de las entidades que se agreguen a continuación (se crea si no existe)"""
+        if name not in self.doc.layers:
+            self.doc.layers.add(name)
+        self._attribs = {'layer': name}
+
+    def add_line(self, start, end):
+        """Agrega una línea entre dos puntos (x, y)"""
+        self.modelspace.add_line(start, end, dxfattribs=self._attribs)
+        self.entity_count += 1
+
+    def add_polyline(self, points, closed=False, bulges=None):
+        """
+        Agrega una polilínea cargando todos sus vértices de una vez
+
+        ezdxf agrega los vértices de a uno concatenando arrays, lo que es
+        cuadrático en polilíneas largas; aquí se asigna el array completo.
+
+        Args:
+            points: Array (K, 2) de puntos ya transformados
+            closed: Si la polilínea debe cerrarse
+            bulges: Array (K,) opcional con el bulge del segmento que sale de cada vértice
+        """
+        polyline = self.modelspace.add_lwpolyline([], close=closed, dxfattribs=self._attribs)
+        vertices = np.zeros((len(points), 5))
+        vertices[:, :2] = points
+        if bulges is not None:
+            vertices[:, 4] = bulges
+        polyline.lwpoints.values = vertices
+        self.entity_count += 1
+
+    def add_spline(self, control_points, knots):
+        """Agrega un SPLINE abierto de grado 3 con el vector de nudos dado"""
+        self.modelspace.add_open_spline(control_points, degree=3, knots=knots, dxfattribs=self._attribs)
+        self.entity_count += 1
+
+    def add_arc(self, center, radius, start_angle, end_angle):
+        """Agrega un arco circular (ángulos en grados, sentido antihorario)"""
+        self.modelspace.add_arc(center, radius, start_angle, end_angle, dxfattribs=self._attribs)
+        self.entity_count += 1
+
+    def add_circle(self, center, radius):
+        """Agrega un círculo completo"""
+        self.modelspace.add_circle(center, radius, dxfattribs=self._attribs)
+        self.entity_count += 1
+
+    def add_ellipse(self, center, major_axis, ratio, start_param, end_param):
+        """Agrega un arco elíptico (parámetros en radianes, sentido antihorario)"""
+        self.modelspace.add_ellipse(center, major_axis, ratio, start_param, end_param, dxfattribs=self._attribs)
+        self.entity_count += 1
+
+    def add_block(self, name, entities):
+        """
+        Define un bloque con punto base en el origen
+
+        Args:
+            name: Nombre del bloque
+            entities: EntityBuffer con las entidades del bloque, sin cambios de capa
+        """
+        # Las entidades del bloque van a la capa 0: toman la capa de cada INSERT
+        # entity_count solo cuenta el modelspace: el contenido del bloque no suma
+        layout, attribs, count = self.modelspace, self._attribs, self.entity_count
+        self.modelspace, self._attribs = self.doc.blocks.new(name=name), {'layer': '0'}
+        try:
+            entities.replay(self)
+        finally:
+            self.modelspace, self._attribs, self.entity_count = layout, attribs, count
+
+    def add_insert(self, name, position, rotation=0.0):
+        """Agrega una referencia al bloque name en position (x, y), rotada en grados"""
+        attribs = dict(self._attribs, rotation=rotation) if rotation else self._attribs
+        self.modelspace.add_blockref(name, position, dxfattribs=attribs)
+        self.entity_count += 1
+
+    def save(self, output):
+        """
+        Guarda el documento
+
+        Args:
+            output: Ruta del archivo, stream de texto (solo ASCII) o stream
+                binario (ASCII o binario, ej: io.BytesIO para no usar disco)
+        """
+        if not hasattr(output, 'write'):
+            self.doc.saveas(output, fmt=self.fmt)
+        elif self.fmt == 'bin' or not _is_binary_stream(output):
+            self.doc.write(output, fmt=self.fmt)
+        else:
+            # DXF ASCII en un stream binario: codificar con la codificación del documento
+            text = io.TextIOWrapper(output, encoding=self.doc.output_encoding, errors='dxfreplace')
+            self.doc.write(text)
+            text.flush()
+            text.detach()
+
+
+class StreamingDXFWriter:
+    """
+    Escribe entidades DXF R12 directamente en un archivo o stream
+
+    Cada entidad se serializa en cuanto se agrega, así que la memoria no
+    depende del número de entidades. R12 no tiene SPLINE ni ELLIPSE: el
+    convertidor aplana las curvas cuando usa este backend. En formato
+    binario los vértices de las polilíneas se codifican en bloque con numpy.
+    Los bloques van en una sección BLOCKS previa a ENTITIES, así que deben
+    definirse antes de agregar la primera entidad. Las entidades también
+    pueden serializarse aparte (ver fragment) y agregarse ya escritas con
+    add_fragment, como hace la conversión en paralelo.
+    """
+
+    # Solo líneas, polilíneas (con bulges), arcos y círculos
+    supports_curves = False
+
+    # Soporta bloques (BLOCK e INSERT)
+    supports_blocks = True
+
+    # Acepta entidades serializadas en otro proceso (ver add_fragment)
+    supports_fragments = True
+
+    def __init__(self, output, fmt='asc', units=0):
+        """
+        Abre la salida y escribe la sección HEADER (si hace falta)
+
+        Args:
+            output: Ruta del archivo, stream de texto (solo ASCII) o stream
+                binario (archivo, socket, io.BytesIO, ...)
+            fmt: 'asc' para DXF ASCII o 'bin' para DXF binario
+            units: Código $INSUNITS de las coordenadas (0 = sin unidades); si
+                no es 0 se escribe una sección HEADER con esa sola variable
+        """
+        if fmt not in DXF_FORMATS:
+            raise ValueError(f"Formato DXF desconocido: {fmt}")
+        self.fmt = fmt
+        self._file = None
+        self._text = None
+        if not hasattr(output, 'write'):
+            self._file = open(output, 'wb' if fmt == 'bin' else 'wt', encoding=None if fmt == 'bin' else 'cp1252')
+            output = self._file
+        elif fmt == 'asc' and _is_binary_stream(output):
+            self._text = output = io.TextIOWrapper(output, encoding='cp1252', errors='dxfreplace')
+
+        # En binario, los tags de texto pasan por el codificador de ezdxf y los
+        # vértices se escriben directamente en el stream de bytes
+        self._binary = output if fmt == 'bin' else None
+        self.stream = BinaryDXFWriter(output) if fmt == 'bin' else output
+        if units:
+            self.stream.write(f'0\nSECTION\n2\nHEADER\n9\n$INSUNITS\n70\n{units}\n0\nENDSEC\n')
+        self._writer = _R12EntityWriter(self.stream)
+        # Sección abierta (None, 'BLOCKS' o 'ENTITIES') y si se está escribiendo un bloque
+        self._section = None
+        self._in_block = False
+        self._output = output
+        self.entity_count = 0
+        self.layer = '0'
+
+    @classmethod
+    def fragment(cls, fmt='asc'):
+        """
+        Crea un writer en memoria que solo serializa entidades
+
+        No escribe secciones, firma binaria ni EOF: su contenido (ver
+        fragment_data) se agrega tal cual a otro writer con add_fragment.
+
+        Args:
+            fmt: 'asc' o 'bin', el formato del writer de destino
+
+        Returns:
+            StreamingDXFWriter sobre un buffer en memoria
+        """
+        writer = cls(io.BytesIO() if fmt == 'bin' else io.StringIO(), fmt=fmt)
+        # Descartar la firma del DXF binario y no abrir la sección ENTITIES
+        writer._output.seek(0)
+        writer._output.truncate()
+        writer._section = 'ENTITIES'
+        return writer
+
+    def fragment_data(self):
+        """Entidades serializadas por un writer creado con fragment (str en ASCII, bytes en binario)"""
+        return self._output.getvalue()
+
+    def add_fragment(self, data, count):
+        """
+        Agrega entidades ya serializadas por un writer de fragment del mismo formato
+
+        Args:
+            data: Contenido de fragment_data
+            count: Número de entidades del fragmento
+        """
+        self._begin_entities()
+        if self._binary is not None:
+            self._binary.write(data)
+        else:
+            self.stream.write(data)
+        self.entity_count += count
+
+    def set_layer(self, name):
+        """Capa de las entidades que se agreguen a continuación (R12 no necesita declararla)"""
+        self.layer = name
+
+    def add_block(self, name, entities):
+        """
+        Define un bloque con punto base en el origen (antes de cualquier entidad)
+
+        Args:
+            name: Nombre del bloque
+            entities: EntityBuffer con las entidades del bloque, sin cambios de capa
+        """
+        if self._section == 'ENTITIES':
+            raise RuntimeError("Los bloques deben definirse antes de las entidades")
+        if self._section is None:
+            self.stream.write('0\nSECTION\n2\nBLOCKS\n')
+            self._section = 'BLOCKS'
+
+        # Las entidades del bloque van a la capa 0: toman la capa de cada INSERT
+        # entity_count solo cuenta el modelspace: el contenido del bloque no suma
+        layer, count, self.layer = self.layer, self.entity_count, '0'
+        self.stream.write(f'0\nBLOCK\n8\n0\n2\n{name}\n70\n0\n10\n0.0\n20\n0.0\n30\n0.0\n3\n{name}\n')
+        self._in_block = True
+        try:
+            entities.replay(self)
+        finally:
+            self._in_block = False
+            self.layer, self.entity_count = layer, count
+        self.stream.write('0\nENDBLK\n8\n0\n')
+
+    def add_insert(self, name, position, rotation=0.0):
+        """Agrega una referencia al bloque name en position (x, y), rotada en grados"""
+        self._begin_entities()
+        x, y = position
+        angle = f'50\n{rotation}\n' if rotation else ''
+        self.stream.write(f'0\nINSERT\n8\n{self.layer}\n2\n{name}\n10\n{x}\n20\n{y}\n30\n0.0\n{angle}')
+        self.entity_count += 1
+
+    def add_line(self, start, end):
+        """Agrega una línea entre dos puntos (x, y)"""
+        self._begin_entities()
+        self._writer.add_line(start, end, layer=self.layer)
+        self.entity_count += 1
+
+    def add_polyline(self, points, closed=False, bulges=None):
+        """
+        Agrega una POLYLINE 2D serializando todos sus vértices en un solo bloque
+
+        Args:
+            points: Array (K, 2) de puntos ya transformados
+            closed: Si la polilínea debe cerrarse
+            bulges: Array (K,) opcional con el bulge del segmento que sale de cada vértice
+        """
+        self._begin_entities()
+        if self._binary is not None:
+            self.stream.write(f'0\nPOLYLINE\n8\n{self.layer}\n66\n1\n70\n{int(closed)}\n')
+            self._binary.write(_binary_vertices(points, bulges, self.layer))
+            self.stream.write('0\nSEQEND\n')
+            self.entity_count += 1
+            return
+
+        layer = self.layer
+        if bulges is None or not np.any(bulges):
+            vertices = ''.join(
+                f'0\nVERTEX\n8\n{layer}\n70\n0\n10\n{x}\n20\n{y}\n' for x, y in np.asarray(points).tolist()
+            )
+        else:
+            vertices = ''.join(
+                f'0\nVERTEX\n8\n{layer}\n70\n0\n10\n{x}\n20\n{y}\n' + (f'42\n{bulge}\n' if bulge else '')
+                for (x, y), bulge in zip(np.asarray(points).tolist(), np.asarray(bulges).tolist())
+            )
+        self.stream.write(f'0\nPOLYLINE\n8\n{layer}\n66\n1\n70\n{int(closed)}\n{vertices}0\nSEQEND\n')
+        self.entity_count += 1
+
+    def add_arc(self, center, radius, start_angle, end_angle):
+        """Agrega un arco circular (ángulos en grados, sentido antihorario)"""
+        self._begin_entities()
+        self._writer.add_arc(center, radius, start_angle, end_angle, layer=self.layer)
+        self.entity_count += 1
+
+    def add_circle(self, center, radius):
+        """Agrega un círculo completo"""
+        self._begin_entities()
+        self._writer.add_circle(center, radius, layer=self.layer)
+        self.entity_count += 1
+
+    def close(self):
+        """Escribe el final del archivo y cierra la salida si la abrió el writer"""
+        self._begin_entities()
+        self._writer.close()
+        if self._text is not None:
+            # No cerrar el stream binario del llamador
+            self._text.flush()
+            self._text.detach()
+            self._text = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _begin_entities(self):
+        """Abre la sección ENTITIES (cerrando la de bloques) con la primera entidad fuera de un bloque"""
+        if self._section == 'ENTITIES' or self._in_block:
+            return
+        if self._section == 'BLOCKS':
+            self.stream.write('0\nENDSEC\n')
+        self.stream.write('0\nSECTION\n2\nENTITIES\n')
+        self._section = 'ENTITIES'
+
+
+class _R12EntityWriter(R12FastStreamWriter):
+    """R12FastStreamWriter que no abre la sección ENTITIES (la abre StreamingDXFWriter)"""
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream: Stream de texto (o BinaryDXFWriter) de destino
+        """
+        self.stream = stream
+
+
+class EntityBuffer:
+    """
+    Registra entidades en memoria para escribirlas después en otro writer
+
+    Lo usan los procesos de la conversión en paralelo: cada proceso convierte
+    su parte del dibujo en un buffer (serializable con pickle) y el proceso
+    principal los reproduce en orden sobre el writer real. El ajuste de arcos
+    también escribe en un buffer y reemplaza después cada polilínea por la
+    ajustada.
+    """
+
+    def __init__(self, supports_curves):
+        """
+        Inicializa el buffer vacío
+
+        Args:
+            supports_curves: Si el writer de destino soporta curvas nativas
+        """
+        self.supports_curves = supports_curves
+        self.entities = []
+        self.entity_count = 0
+
+    def set_layer(self, name):
+        """Capa de las entidades que se agreguen a continuación"""
+        self.entities.append(('set_layer', (name,)))
+
+    def add_line(self, start, end):
+        """Agrega una línea entre dos puntos (x, y)"""
+        self._record('add_line', start, end)
+
+    def add_polyline(self, points, closed=False, bulges=None):
+        """Agrega una polilínea (ver DXFDocumentWriter.add_polyline)"""
+        self._record('add_polyline', points, closed, bulges)
+
+    def add_spline(self, control_points, knots):
+        """Agrega un SPLINE abierto de grado 3 con el vector de nudos dado"""
+        self._record('add_spline', control_points, knots)
+
+    def add_arc(self, center, radius, start_angle, end_angle):
+        """Agrega un arco circular (ángulos en grados, sentido antihorario)"""
+        self._record('add_arc', center, radius, start_angle, end_angle)
+
+    def add_circle(self, center, radius):
+        """Agrega un círculo completo"""
+        self._record('add_circle', center, radius)
+
+    def add_ellipse(self, center, major_axis, ratio, start_param, end_param):
+        """Agrega un arco elíptico (parámetros en radianes, sentido antihorario)"""
+        self._record('add_ellipse', center, major_axis, ratio, start_param, end_param)
+
+    def add_insert(self, name, position, rotation=0.0):
+        """Agrega una referencia a un bloque (ver DXFDocumentWriter.add_insert)"""
+        self._record('add_insert', name, position, rotation)
+
+    def replace(self, index, method, *args):
+        """
+        Reemplaza una entidad ya registrada, sin cambiar su lugar
+
+        Args:
+            index: Posición de la entidad en entities
+            method: Método del writer de la nueva entidad (ej: 'add_circle')
+            *args: Argumentos del método
+        """
+        self.entities[index] = (method, args)
+
+    def translated(self, offset, decimals=None):
+        """
+        Copia del buffer con todas las entidades desplazadas
+
+        Args:
+            offset: Desplazamiento (dx, dy)
+            decimals: Decimales a los que se redondean las coordenadas
+                desplazadas (ej: para seguir en la grilla de coordenadas) o None
+
+        Returns:
+            EntityBuffer con las mismas entidades en otra posición
+        """
+        offset = np.asarray(offset, dtype=np.float64)
+
+        def move(points):
+            moved = np.asarray(points, dtype=np.float64) + offset
+            return moved if decimals is None else np.round(moved, decimals)
+
+        buffer = EntityBuffer(self.supports_curves)
+        for method, args in self.entities:
+            if method in ('add_polyline', 'add_spline'):
+                args = (move(args[0]),) + args[1:]
+            elif method == 'add_line':
+                args = (move(args[0]).tolist(), move(args[1]).tolist())
+            elif method in ('add_arc', 'add_circle', 'add_ellipse', 'add_insert'):
+                position = 1 if method == 'add_insert' else 0
+                args = args[:position] + (move(args[position]).tolist(),) + args[position + 1:]
+            buffer.entities.append((method, args))
+        buffer.entity_count = self.entity_count
+        return buffer
+
+    def replay(self, writer):
+        """
+        Escribe las entidades registradas, en el mismo orden, en otro writer
+
+        Args:
+            writer: DXFDocumentWriter, StreamingDXFWriter u otro EntityBuffer
+        """
+        for method, args in self.entities:
+            getattr(writer, method)(*args)
+
+    def _record(self, method, *args):
+        """Guarda una llamada al writer"""
+        self.entities.append((method, args))
+        self.entity_count += 1
+
+
+# Registro binario R12 de un VERTEX: códigos de grupo de 1 byte, enteros de
+# 2 bytes y dobles de 8 bytes en little endian
+
+
+@lru_cache(maxsize=None)
+def _vertex_dtype(layer_size, with_bulges):
+    """
+    Tipo estructurado de un registro VERTEX
+
+    Args:
+        layer_size: Bytes del tag de capa (código 8, nombre y terminador)
+        with_bulges: Si el registro incluye el bulge (código 42)
+
+    Returns:
+        np.dtype del registro
+    """
+    fields = [
+        ('entity', 'V8'), ('layer', f'V{layer_size}'),
+        ('flags_code', 'u1'), ('flags', '<i2'),
+        ('x_code', 'u1'), ('x', '<f8'),
+        ('y_code', 'u1'), ('y', '<f8')
+    ]
+    if with_bulges:
+        fields += [('bulge_code', 'u1'), ('bulge', '<f8')]
+    return np.dtype(fields)
+
+
+def _binary_vertices(points, bulges=None, layer='0'):
+    """
+    Codifica los VERTEX de una polilínea R12 en DXF binario con una sola copia
+
+    Args:
+        points: Array (K, 2) de puntos
+        bulges: Array (K,) opcional de bulges (se omite si todos son 0)
+        layer: Capa de los vértices
+
+    Returns:
+        bytes con los K registros VERTEX
+    """
+    points = np.asarray(points, dtype=np.float64)
+    with_bulges = bulges is not None and np.any(bulges)
+    layer_tag = b'\x08' + layer.encode('cp1252') + b'\x00'
+    records = np.empty(len(points), dtype=_vertex_dtype(len(layer_tag), bool(with_bulges)))
+    records['entity'] = b'\x00VERTEX\x00'
+    records['layer'] = layer_tag
+    records['flags_code'] = 70
+    records['flags'] = 0
+    records['x_code'] = 10
+    records['x'] = points[:, 0]
+    records['y_code'] = 20
+    records['y'] = points[:, 1]
+    if with_bulges:
+        records['bulge_code'] = 42
+        records['bulge'] = bulges
+    return records.tobytes()
@@ -0,0 +1,321 @@
+"""
+Módulo de exportación G-code
+Genera G-code de contorneado 2D (fresadora o láser) a partir de la geometría del SVG, sin pasar por un CAM
+"""
+
+import io
+
+import numpy as np
+
+from .dxf_converter_v2 import DXFConverterV2
+from .svg_parser import parse_svg
+
+
+# Tipos de máquina: fresadora/router (bajada en Z) o láser (encendido/apagado)
+GCODE_MODES = ('mill', 'laser')
+
+# Código G de las unidades de salida
+GCODE_UNITS = {
+    'mm': 'G21',
+    'in': 'G20'
+}
+
+
+class GCodeWriter:
+    """
+    Escribe G-code directamente en un archivo o stream
+
+    Recibe las mismas llamadas que los writers DXF (ver DXFConverterV2.convert_to_writer):
+    cada entidad se corta en cuanto se agrega. Las polilíneas con bulge se
+    emiten como G2/G3 y el resto como G1; las curvas llegan aplanadas.
+    """
+
+    # Solo líneas, polilíneas (con bulges), arcos y círculos
+    supports_curves = False
+
+    # Nombre de la salida en los mensajes del convertidor
+    label = 'G-code'
+
+    def __init__(
+        self,
+        output,
+        mode='mill',
+        units='mm',
+        feed_rate=1000.0,
+        plunge_rate=300.0,
+        safe_z=5.0,
+        cut_depth=1.0,
+        passes=1,
+        laser_power=1000,
+        spindle_speed=None,
+        precision=3
+    ):
+        """
+        Abre la salida y escribe el encabezado del programa
+
+        Args:
+            output: Ruta del archivo, stream de texto o stream binario
+            mode: 'mill' (sube y baja en Z) o 'laser' (M3/M5, sin Z)
+            units: 'mm' o 'in' (unidades de las coordenadas recibidas)
+            feed_rate: Avance de corte (unidades por minuto)
+            plunge_rate: Avance de bajada en Z (solo mill)
+            safe_z: Altura de los movimientos rápidos (solo mill)
+            cut_depth: Profundidad total de corte, positiva (solo mill)
+            passes: Pasadas por entidad; en mill cada pasada baja
+                cut_depth / passes más
+            laser_power: Potencia del láser (S de M3, solo laser)
+            spindle_speed: RPM del husillo (M3 al inicio) o None si el
+                husillo se controla a mano (solo mill)
+            precision: Decimales de las coordenadas
+        """
+        if mode not in GCODE_MODES:
+            raise ValueError(f"Modo G-code desconocido: {mode}")
+        if units not in GCODE_UNITS:
+            raise ValueError(f"Unidades G-code desconocidas: {units}")
+        self.mode = mode
+        self.feed_rate = feed_rate
+        self.plunge_rate = plunge_rate
+        self.safe_z = safe_z
+        self.passes = max(1, int(passes))
+        self.laser_power = laser_power
+        self.spindle_speed = spindle_speed
+        self.precision = precision
+        # Profundidad de cada pasada (en láser todas las pasadas son iguales)
+        self.depths = [-cut_depth * (k + 1) / self.passes for k in range(self.passes)]
+        self.entity_count = 0
+
+        self._file = None
+        self._text = None
+        if not hasattr(output, 'write'):
+            self._file = open(output, 'wt', encoding='ascii')
+            output = self._file
+        elif isinstance(output, (io.RawIOBase, io.BufferedIOBase)):
+            self._text = output = io.TextIOWrapper(output, encoding='ascii', errors='replace')
+        self.stream = output
+
+        header = ['(Image to Vector)', 'G90 G17 G94', GCODE_UNITS[units]]
+        if mode == 'mill':
+            header.append(f'G0 Z{safe_z:.{precision}f}')
+            if spindle_speed:
+                header.append(f'M3 S{spindle_speed:g}')
+        else:
+            header.append('M5')
+        self.stream.write('\n'.join(header) + '\n')
+
+    def set_layer(self, name):
+        """Las capas se anotan como comentario antes de sus entidades"""
+        self.stream.write(f'({name})\n')
+
+    def add_line(self, start, end):
+        """Corta una línea entre dos puntos (x, y)"""
+        self.add_polyline(np.array([start, end], dtype=np.float64))
+
+    def add_polyline(self, points, closed=False, bulges=None):
+        """
+        Corta una polilínea con todas sus pasadas
+
+        Un contorno cerrado vuelve a su inicio en cada pasada; una cadena
+        abierta se recorre en sentidos alternados para no volver en vacío.
+
+        Args:
+            points: Array (K, 2) de puntos ya transformados
+            closed: Si la polilínea es cerrada
+            bulges: Array (K,) opcional con el bulge del segmento que sale de cada vértice
+        """
+        points = np.asarray(points, dtype=np.float64)
+        bulges = np.zeros(len(points)) if bulges is None else np.asarray(bulges, dtype=np.float64)
+        forward = _moves(points, bulges, closed, self.precision)
+        backward = forward if closed else _moves(points[::-1], np.append(-bulges[-2::-1], 0.0), False, self.precision)
+
+        p = self.precision
+        x, y = points[0].tolist()
+        lines = [f'G0 X{x:.{p}f} Y{y:.{p}f}']
+        for k, depth in enumerate(self.depths):
+            moves = forward if k % 2 == 0 else backward
+            if self.mode == 'mill':
+                lines.append(f'G1 Z{depth:.{p}f} F{self.plunge_rate:g}')
+            else:
+                lines.append(f'M3 S{self.laser_power:g}')
+            lines.append(f'{moves[0]} F{self.feed_rate:g}')
+            lines.extend(moves[1:])
+            if self.mode == 'laser':
+                lines.append('M5')
+        if self.mode == 'mill':
+            lines.append(f'G0 Z{self.safe_z:.{p}f}')
+        self.stream.write('\n'.join(lines) + '\n')
+        self.entity_count += 1
+
+    def add_arc(self, center, radius, start_angle, end_angle):
+        """Corta un arco circular (ángulos en grados, sentido antihorario) como dos mitades con bulge"""
+        start = np.radians(start_angle)
+        sweep = np.radians((end_angle - start_angle) % 360.0)
+        angles = start + np.array([0.0, sweep / 2, sweep])
+        points = np.column_stack([center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)])
+        bulge = np.tan(sweep / 8)
+        self.add_polyline(points, bulges=np.array([bulge, bulge, 0.0]))
+
+    def add_circle(self, center, radius):
+        """Corta un círculo completo como dos semicírculos antihorarios"""
+        points = np.array([[center[0] + radius, center[1]], [center[0] - radius, center[1]]])
+        self.add_polyline(points, closed=True, bulges=np.ones(2))
+
+    def close(self):
+        """Escribe el final del programa y cierra la salida si la abrió el writer"""
+        footer = [f'G0 Z{self.safe_z:.{self.precision}f}', 'M5'] if self.mode == 'mill' else ['M5']
+        self.stream.write('\n'.join(footer + ['M2']) + '\n')
+        if self._text is not None:
+            # No cerrar el stream binario del llamador
+            self._text.flush()
+            self._text.detach()
+            self._text = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class GCodeExporter:
+    """
+    Exportador de SVG a G-code de contorneado 2D
+
+    Usa un DXFConverterV2 (unión de paths, ordenamiento del recorrido,
+    aplanado, ajuste de arcos, unidades) con un GCodeWriter como salida.
+    """
+
+    def __init__(
+        self,
+        dxf_config=None,
+        mode='mill',
+        feed_rate=1000.0,
+        plunge_rate=300.0,
+        safe_z=5.0,
+        cut_depth=1.0,
+        passes=1,
+        laser_power=1000,
+        spindle_speed=None,
+        precision=3
+    ):
+        """
+        Inicializa el exportador G-code
+
+        Args:
+            dxf_config: Configuración del convertidor DXF (dict) para la
+                geometría; las curvas siempre se aplanan y sin units se usan
+                milímetros
+            mode, feed_rate, plunge_rate, safe_z, cut_depth, passes,
+            laser_power, spindle_speed, precision: Parámetros de la máquina
+                (ver GCodeWriter)
+        """
+        if mode not in GCODE_MODES:
+            raise ValueError(f"Modo G-code desconocido: {mode}")
+        config = dict(dxf_config or {})
+        config['use_splines'] = False
+        config['units'] = config.get('units') or 'mm'
+        self.converter = DXFConverterV2(**config)
+        self.machine = {
+            'mode': mode,
+            'units': self.converter.units,
+            'feed_rate': feed_rate,
+            'plunge_rate': plunge_rate,
+            'safe_z': safe_z,
+            'cut_depth': cut_depth,
+            'passes': passes,
+            'laser_power': laser_power,
+            'spindle_speed': spindle_speed,
+            'precision': precision
+        }
+
+    def convert(self, svg_input, gcode_output):
+        """
+        Convierte SVG a G-code
+
+        Args:
+            svg_input: Ruta del archivo SVG, file-like object o contenido SVG
+                (str o bytes, ver parse_svg)
+            gcode_output: Ruta donde guardar el G-code, stream de texto o
+                stream binario
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        try:
+            geometry = parse_svg(svg_input, self.converter.geometry_dtype)
+        except Exception as e:
+            return False, f"Error al leer el SVG: {str(e)}"
+        return self.convert_geometry(geometry, gcode_output)
+
+    def convert_geometry(self, geometry, gcode_output=None):
+        """
+        Convierte una geometría ya parseada a G-code
+
+        Args:
+            geometry: SVGGeometry de origen (no se modifica)
+            gcode_output: Ruta, stream de texto o stream binario de destino. Si
+                es None, el G-code se genera en memoria y se retorna como bytes
+
+        Returns:
+            tuple: (success: bool, message: str), o (success, G-code: bytes o
+            None si falló, message: str) si gcode_output es None
+        """
+        if gcode_output is None:
+            buffer = io.BytesIO()
+            success, message = self.convert_geometry(geometry, buffer)
+            return success, buffer.getvalue() if success else None, message
+
+        try:
+            writer = GCodeWriter(gcode_output, **self.machine)
+        except Exception as e:
+            return False, f"Error al generar G-code: {str(e)}"
+        return self.converter.convert_to_writer(geometry, writer)
+
+    def convert_bytes(self, svg_input):
+        """
+        Convierte SVG a G-code en memoria, sin escribir en disco
+
+        Args:
+            svg_input: Contenido SVG (str o bytes), ruta o file-like object
+
+        Returns:
+            tuple: (success: bool, G-code: bytes o None si falló,
+            message: str con el reporte de la conversión o el error)
+        """
+        try:
+            geometry = parse_svg(svg_input, self.converter.geometry_dtype)
+        except Exception as e:
+            return False, None, f"Error al leer el SVG: {str(e)}"
+        return self.convert_geometry(geometry)
+
+
+def _moves(points, bulges, closed, precision):
+    """
+    Movimientos de corte de una polilínea, sin el posicionamiento inicial
+
+    Un segmento sin bulge es un G1; uno con bulge b es un arco de ángulo
+    4 atan(b), G3 si b > 0 (antihorario) o G2 si b < 0, con el centro
+    relativo al inicio (I, J) a una distancia (c / 2)(1 - b²) / (2b) del
+    punto medio de la cuerda c, sobre su normal izquierda.
+
+    Args:
+        points: Array (K, 2) de vértices
+        bulges: Array (K,) con el bulge del segmento que sale de cada vértice
+        closed: Si se agrega el segmento de cierre al primer vértice
+        precision: Decimales de las coordenadas
+
+    Returns:
+        Lista de líneas de G-code
+    """
+    starts = points if closed else points[:-1]
+    ends = np.roll(points, -1, axis=0) if closed else points[1:]
+    bulges = bulges[:len(starts)]
+
+    chord = ends - starts
+    arcs = bulges != 0
+    safe = np.where(arcs, bulges, 1.0)
+    offset = ((1 - safe ** 2) / (4 * safe))[:, None] * np.column_stack([-chord[:, 1], chord[:, 0]])
+    centers = (starts + ends) / 2 + offset - starts
+
+    p = precision
+    return [
+        f'{"G3" if bulge > 0 else "G2"} X{x:.{p}f} Y{y:.{p}f} I{i:.{p}f} J{j:.{p}f}' if arc
+        else f'G1 X{x:.{p}f} Y{y:.{p}f}'
+        for (x, y), (i, j), bulge, arc in zip(ends.tolist(), centers.tolist(), bulges.tolist(), arcs.tolist())
+    ]
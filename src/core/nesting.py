@@ -0,0 +1,236 @@
+"""
+Módulo de anidamiento de contornos
+Construye el árbol de contención de los contornos cerrados (qué agujeros están dentro de qué piezas)
+"""
+
+import numpy as np
+
+
+# Aristas por franja horizontal en la prueba de punto en polígono
+_EDGES_PER_BAND = 8
+
+
+def contour_parents(outlines, closed):
+    """
+    Contorno cerrado más chico que contiene a cada path
+
+    Cada path se representa por su primer punto; un contorno solo puede
+    contener paths de área menor cuya caja envolvente esté dentro de la suya.
+    Las cajas de los contornos se indexan en una grilla jerárquica (ver
+    _candidate_pairs), así que solo se prueban los pares cercanos, y la
+    prueba exacta de punto en polígono se hace en bloque para todos los pares.
+
+    Args:
+        outlines: Lista de arrays (K, 2) no vacíos con el polígono de cada path
+        closed: Secuencia bool indicando si cada path es un contorno cerrado
+
+    Returns:
+        Array int64 (N,) con el índice del contorno padre o -1
+    """
+    count = len(outlines)
+    parents = np.full(count, -1, dtype=np.int64)
+    if count == 0:
+        return parents
+
+    # Todos los polígonos en un solo array: vértice siguiente de cada uno dentro de su polígono
+    vertices = np.concatenate([np.asarray(outline, dtype=np.float64) for outline in outlines])
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum([len(outline) for outline in outlines], out=offsets[1:])
+    following = np.arange(1, len(vertices) + 1)
+    following[offsets[1:] - 1] = offsets[:-1]
+
+    lower = np.column_stack([np.minimum.reduceat(vertices[:, axis], offsets[:-1]) for axis in (0, 1)])
+    upper = np.column_stack([np.maximum.reduceat(vertices[:, axis], offsets[:-1]) for axis in (0, 1)])
+    cross = vertices[:, 0] * vertices[following, 1] - vertices[:, 1] * vertices[following, 0]
+    areas = np.where(np.asarray(closed, dtype=bool), np.abs(np.add.reduceat(cross, offsets[:-1])) / 2, 0.0)
+    representatives = vertices[offsets[:-1]]
+
+    # Rango por área (desempate por índice): un contenedor siempre tiene rango mayor
+    rank = np.empty(count, dtype=np.int64)
+    rank[np.lexsort((np.arange(count), areas))] = np.arange(count)
+
+    containers = np.flatnonzero(areas > 0)
+    if not len(containers):
+        return parents
+    path, container = _candidate_pairs(representatives, lower, upper, containers)
+    keep = (
+        (rank[path] < rank[container])
+        & (lower[path, 0] >= lower[container, 0])
+        & (upper[path, 0] <= upper[container, 0])
+        & (lower[path, 1] >= lower[container, 1])
+        & (upper[path, 1] <= upper[container, 1])
+    )
+    path, container = path[keep], container[keep]
+
+    inside = _pairs_in_polygons(representatives[path], container, vertices, following, offsets)
+    path, container = path[inside], container[inside]
+
+    # El padre es el contenedor de menor rango (el más chico)
+    order = np.lexsort((rank[container], path))
+    path, container = path[order], container[order]
+    first = np.ones(len(path), dtype=bool)
+    first[1:] = path[1:] != path[:-1]
+    parents[path[first]] = container[first]
+    return parents
+
+
+def nesting_depths(parents):
+    """
+    Profundidad de cada path en el árbol de contención
+
+    Args:
+        parents: Array (N,) de contornos padre (ver contour_parents)
+
+    Returns:
+        Array int64 (N,) con el número de contornos que contienen a cada path
+        (0 = exterior; en contornos cerrados, par = pieza e impar = agujero)
+    """
+    depths = np.zeros(len(parents), dtype=np.int64)
+    ancestors = np.asarray(parents, dtype=np.int64).copy()
+    while True:
+        nested = ancestors >= 0
+        if not nested.any():
+            return depths
+        depths[nested] += 1
+        ancestors[nested] = parents[ancestors[nested]]
+
+
+def signed_area(points):
+    """Área con signo de un polígono (positiva en sentido antihorario)"""
+    x, y = points[:, 0], points[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+
+def _candidate_pairs(points, lower, upper, containers):
+    """
+    Pares (punto, contenedor) cuyo punto puede caer dentro de la caja del contenedor
+
+    Cada contenedor se registra en el nivel de la grilla cuyas celdas son al
+    menos tan grandes como su caja envolvente (el nivel k tiene celdas de
+    base * 2^k), donde ocupa como máximo 2 x 2 celdas. Cada punto se busca en
+    una sola celda por nivel, así que el costo no depende de cuántos
+    contornos chicos hay dentro de uno grande.
+
+    Args:
+        points: Array (N, 2) de puntos representativos
+        lower, upper: Arrays (N, 2) con las cajas envolventes
+        containers: Índices de los contornos que pueden contener a otros
+
+    Returns:
+        tuple: (índices de puntos, índices de contenedores) de igual largo
+    """
+    origin = np.minimum(points.min(axis=0), lower[containers].min(axis=0))
+    sides = (upper[containers] - lower[containers]).max(axis=1)
+    base = max(float(np.median(sides)), 1e-9)
+    levels = np.ceil(np.log2(np.maximum(sides / base, 1.0))).astype(np.int64)
+
+    point_parts, container_parts = [], []
+    for level in np.unique(levels).tolist():
+        size = base * 2.0 ** level
+        members = containers[levels == level]
+        low = np.floor((lower[members] - origin) / size).astype(np.int64)
+        high = np.floor((upper[members] - origin) / size).astype(np.int64)
+
+        # Celdas de cada contenedor (hasta 2 x 2)
+        cells, owners = [], []
+        for dx in (0, 1):
+            for dy in (0, 1):
+                cell = low + (dx, dy)
+                valid = (cell[:, 0] <= high[:, 0]) & (cell[:, 1] <= high[:, 1])
+                cells.append(cell[valid])
+                owners.append(members[valid])
+        cells, owners = np.concatenate(cells), np.concatenate(owners)
+        width = int(cells[:, 0].max()) + 2
+        keys = cells[:, 1] * width + cells[:, 0]
+        order = np.argsort(keys, kind='stable')
+        keys, owners = keys[order], owners[order]
+
+        point_cells = np.floor((points - origin) / size).astype(np.int64)
+        point_keys = point_cells[:, 1] * width + np.minimum(point_cells[:, 0], width - 1)
+        first = np.searchsorted(keys, point_keys, side='left')
+        counts = np.searchsorted(keys, point_keys, side='right') - first
+        positions = np.arange(counts.sum()) + np.repeat(first - (np.cumsum(counts) - counts), counts)
+        point_parts.append(np.repeat(np.arange(len(points)), counts))
+        container_parts.append(owners[positions])
+
+    return np.concatenate(point_parts), np.concatenate(container_parts)
+
+
+def _pairs_in_polygons(points, polygons, vertices, following, offsets, chunk_size=1 << 22):
+    """
+    Prueba de punto en polígono (regla par-impar) para pares punto-polígono
+
+    Las aristas de cada polígono se reparten en franjas horizontales de unas
+    _EDGES_PER_BAND aristas: el rayo horizontal de un punto solo puede
+    cruzar aristas de su franja, así que un contorno grande con muchos
+    puntos adentro no se recorre entero por cada punto. Los pares se
+    evalúan en bloques de como máximo chunk_size pares punto-arista.
+
+    Args:
+        points: Array (M, 2) con el punto de cada par
+        polygons: Array (M,) con el índice del polígono de cada par
+        vertices: Array (V, 2) con los vértices de todos los polígonos
+        following: Array (V,) con el vértice siguiente de cada vértice en su polígono
+        offsets: Array (P + 1,) con el primer vértice de cada polígono
+        chunk_size: Máximo de pares punto-arista evaluados por bloque
+
+    Returns:
+        Array bool (M,)
+    """
+    inside = np.zeros(len(points), dtype=bool)
+    if not len(points):
+        return inside
+
+    # Aristas de los polígonos usados
+    used, slot = np.unique(polygons, return_inverse=True)
+    sizes = offsets[used + 1] - offsets[used]
+    edge_polygon = np.repeat(np.arange(len(used)), sizes)
+    edges = np.arange(sizes.sum()) + np.repeat(offsets[used] - (np.cumsum(sizes) - sizes), sizes)
+    y1, y2 = vertices[edges, 1], vertices[following[edges], 1]
+
+    # Franjas de igual alto en el rango Y de cada polígono
+    y_min = np.minimum.reduceat(np.minimum(y1, y2), np.cumsum(sizes) - sizes)
+    y_max = np.maximum.reduceat(np.maximum(y1, y2), np.cumsum(sizes) - sizes)
+    band_counts = np.maximum(1, sizes // _EDGES_PER_BAND)
+    band_height = np.where(y_max > y_min, (y_max - y_min) / band_counts, 1.0)
+    band_base = np.cumsum(band_counts) - band_counts
+
+    def band_of(y, polygon):
+        band = np.floor((y - y_min[polygon]) / band_height[polygon]).astype(np.int64)
+        return np.clip(band, 0, band_counts[polygon] - 1)
+
+    # Cada arista se registra en todas las franjas que atraviesa
+    first_band = band_of(np.minimum(y1, y2), edge_polygon)
+    spans = band_of(np.maximum(y1, y2), edge_polygon) - first_band + 1
+    registered = np.repeat(np.arange(len(edges)), spans)
+    bands = (
+        np.repeat(band_base[edge_polygon] + first_band, spans)
+        + np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+    )
+    order = np.argsort(bands, kind='stable')
+    band_edges = edges[registered[order]]
+    band_starts = np.searchsorted(bands[order], np.arange(band_counts.sum() + 1))
+
+    pair_band = band_base[slot] + band_of(points[:, 1], slot)
+    first = band_starts[pair_band]
+    pair_edges = band_starts[pair_band + 1] - first
+    cumulative = np.cumsum(pair_edges)
+    if cumulative[-1] == 0:
+        return inside
+    bounds = np.searchsorted(cumulative, np.arange(chunk_size, cumulative[-1], chunk_size), side='left') + 1
+    bounds = np.unique(np.concatenate([[0], np.minimum(bounds, len(points)), [len(points)]]))
+
+    for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        counts = pair_edges[a:b]
+        pair = np.repeat(np.arange(a, b), counts)
+        edge = band_edges[np.arange(counts.sum()) + np.repeat(first[a:b] - (np.cumsum(counts) - counts), counts)]
+        x1, y1 = vertices[edge, 0], vertices[edge, 1]
+        x2, y2 = vertices[following[edge], 0], vertices[following[edge], 1]
+        px, py = points[pair, 0], points[pair, 1]
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crossings = np.bincount(pair - a, weights=straddles & (px < crossing_x), minlength=b - a)
+        inside[a:b] = crossings % 2 == 1
+
+    return inside
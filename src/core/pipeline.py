@@ -1,27 +1,84 @@
 """
 Módulo de pipeline de procesamiento
-Coordina el flujo completo: Imagen → SVG → DXF
+Coordina el flujo completo: Imagen → SVG → DXF (→ G-code)
 """
 
-import os
-import tempfile
+import io
+import threading
+from collections import OrderedDict
+
 from PIL import Image
-import numpy as np
 
 from .preprocessor import ImagePreprocessor
 from .vectorizer import ImageVectorizer
 from .dxf_converter_v2 import DXFConverterV2
+from .gcode_exporter import GCodeExporter
+from .svg_optimizer import SVGOptimizer
+from .autotune import VectorizerAutoTuner
+
+
+# Máximo de instancias compartidas en caché (una por clase y configuración)
+_SHARED_INSTANCES_MAX = 64
+
+_shared_instances = OrderedDict()
+_shared_instances_lock = threading.Lock()
+
+
+def shared_instance(cls, *args, **config):
+    """
+    Instancia compartida de un módulo del núcleo para una configuración
+
+    Preprocesador, vectorizador, convertidores y optimizador no cambian
+    después de __init__ y guardan el estado de cada llamada en variables
+    locales, así que una misma instancia puede atender a varias sesiones y
+    hilos a la vez. Se conservan las usadas más recientemente.
+
+    Args:
+        cls: Clase del módulo
+        *args, **config: Argumentos del constructor
+
+    Returns:
+        Instancia de cls (la misma para la misma configuración)
+    """
+    key = (cls, _freeze(args), _freeze(config))
+    with _shared_instances_lock:
+        instance = _shared_instances.get(key)
+        if instance is None:
+            instance = _shared_instances[key] = cls(*args, **config)
+        _shared_instances.move_to_end(key)
+        if len(_shared_instances) > _SHARED_INSTANCES_MAX:
+            _shared_instances.popitem(last=False)
+    return instance
+
+
+def _freeze(value):
+    """Convierte dicts, listas y tuplas anidadas en tuplas (clave hasheable de la configuración)"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 
 class ProcessingPipeline:
-    """Pipeline completo de conversión de imagen a vector"""
+    """
+    Pipeline completo de conversión de imagen a vector
+
+    Los módulos se toman de la caché de instancias compartidas (ver
+    shared_instance) y process no modifica el pipeline: un mismo pipeline
+    puede procesar varias imágenes a la vez.
+    """
 
     def __init__(
         self,
         use_preprocessing=True,
         preprocessor_config=None,
         vectorizer_config=None,
-        dxf_config=None
+        dxf_config=None,
+        use_svg_optimization=True,
+        svg_optimizer_config=None,
+        autotune_config=None,
+        gcode_config=None
     ):
         """
         Inicializa el pipeline de procesamiento
@@ -31,13 +88,23 @@ class ProcessingPipeline:
             preprocessor_config: Configuración del preprocesador (dict)
             vectorizer_config: Configuración del vectorizador (dict)
             dxf_config: Configuración del convertidor DXF (dict)
+            use_svg_optimization: Si se debe optimizar el SVG retornado
+            svg_optimizer_config: Configuración del optimizador SVG (dict)
+            autotune_config: Objetivos del ajuste automático de VTracer (dict, None = desactivado)
+            gcode_config: Parámetros de máquina del exportador G-code (dict, None = desactivado)
         """
         self.use_preprocessing = use_preprocessing
-
-        # Inicializar módulos
-        self.preprocessor = ImagePreprocessor(**(preprocessor_config or {}))
-        self.vectorizer = ImageVectorizer(**(vectorizer_config or {}))
-        self.dxf_converter = DXFConverterV2(**(dxf_config or {}))
+        self.use_svg_optimization = use_svg_optimization
+        self.autotune_config = autotune_config
+
+        # Inicializar módulos (compartidos con otros pipelines de igual configuración)
+        self.preprocessor = shared_instance(ImagePreprocessor, **(preprocessor_config or {}))
+        self.vectorizer = shared_instance(ImageVectorizer, **(vectorizer_config or {}))
+        self.dxf_converter = shared_instance(DXFConverterV2, **(dxf_config or {}))
+        self.svg_optimizer = shared_instance(SVGOptimizer, **(svg_optimizer_config or {}))
+        self.dxf_config = dxf_config or {}
+        self.gcode_config = gcode_config
+        self.gcode_exporter = shared_instance(GCodeExporter, self.dxf_config, **gcode_config) if gcode_config else None
 
     def process(self, uploaded_file, progress_callback=None):
         """
@@ -53,115 +120,225 @@ class ProcessingPipeline:
         results = {
             'preprocessing': None,
             'svg': None,
+            'svg_stats': None,
+            'autotune': None,
             'dxf': None,
-            'svg_path': None,
-            'dxf_path': None
+            'dxf_report': None,
+            'gcode': None,
+            'gcode_report': None
         }
 
-        # Crear directorio temporal
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            try:
-                # Reportar inicio
-                if progress_callback:
-                    progress_callback('loading', 10)
+        # Todo el pipeline trabaja en memoria: no hace falta disco temporal
+        try:
+            # Reportar inicio
+            if progress_callback:
+                progress_callback('loading', 10)
 
-                # Cargar imagen
-                image = Image.open(uploaded_file)
-                image_array = np.array(image)
+            # Cargar imagen
+            image = Image.open(uploaded_file)
 
-                # Reportar progreso: Preprocesamiento
-                if progress_callback:
-                    progress_callback('preprocessing', 20)
+            # Reportar progreso: Preprocesamiento
+            if progress_callback:
+                progress_callback('preprocessing', 20)
 
-                # Paso 1: Preprocesamiento (opcional)
-                input_path = self._preprocess_image(
-                    image, image_array, tmp_dir, results
-                )
+            # Paso 1: Preprocesamiento (opcional)
+            input_image = self._preprocess_image(image, results)
 
-                # Reportar progreso: Vectorización
+            # Paso 1b: Ajuste automático de parámetros (opcional, solo para esta imagen)
+            vectorizer = self.vectorizer
+            if self.autotune_config:
                 if progress_callback:
-                    progress_callback('vectorizing', 40)
-
-                # Paso 2: Imagen → SVG
-                svg_path = os.path.join(tmp_dir, "output.svg")
-                success, message = self.vectorizer.convert(input_path, svg_path)
+                    progress_callback('tuning', 30)
+                vectorizer = self._autotune_vectorizer(input_image, results)
+
+            # Reportar progreso: Vectorización
+            if progress_callback:
+                progress_callback('vectorizing', 40)
+
+            # Paso 2: Imagen → SVG
+            geometry = None
+            if vectorizer.backend == 'opencv':
+                # Contornos de OpenCV: la geometría sale directamente en arrays y
+                # el SVG solo se escribe para mostrarlo y descargarlo
+                success, geometry = vectorizer.trace(input_image)
+                if not success:
+                    return results, geometry
+                svg_content = vectorizer.to_svg(geometry)
+            else:
+                # VTracer: la imagen se codifica en PNG en memoria
+                png = io.BytesIO()
+                input_image.save(png, format='PNG')
+                success, svg_content = vectorizer.convert_bytes(png.getvalue(), img_format='png')
 
                 if not success:
-                    return results, message
+                    return results, svg_content
 
-                # Leer SVG para retornar
-                with open(svg_path, 'r', encoding='utf-8') as f:
-                    results['svg'] = f.read()
-                results['svg_path'] = svg_path
+            results['svg'] = svg_content
 
-                # Reportar progreso: Conversión DXF
-                if progress_callback:
-                    progress_callback('converting', 70)
+            # Optimizar el SVG que se muestra y descarga (el DXF usa el original)
+            if self.use_svg_optimization:
+                results['svg'], results['svg_stats'] = self.svg_optimizer.optimize(results['svg'], geometry)
 
-                # Paso 3: SVG → DXF
-                dxf_path = os.path.join(tmp_dir, "output.dxf")
-                success, message = self.dxf_converter.convert(svg_path, dxf_path)
+            # Reportar progreso: Conversión DXF
+            if progress_callback:
+                progress_callback('converting', 70)
 
-                if not success:
-                    return results, message
+            # Paso 3: SVG → DXF (en memoria, listo para descargar)
+            if geometry is not None:
+                success, dxf_content, dxf_message = self.dxf_converter.convert_geometry(geometry)
+            else:
+                success, dxf_content, dxf_message = self.dxf_converter.convert_bytes(svg_content)
 
-                # Leer DXF para retornar
-                with open(dxf_path, 'rb') as f:
-                    results['dxf'] = f.read()
-                results['dxf_path'] = dxf_path
+            if not success:
+                return results, dxf_message
 
-                # Reportar finalización
+            results['dxf'] = dxf_content
+            results['dxf_report'] = dxf_message
+
+            # Paso 4: SVG → G-code (opcional, misma geometría que el DXF)
+            if self.gcode_exporter:
                 if progress_callback:
-                    progress_callback('completed', 100)
+                    progress_callback('gcode', 90)
+                if geometry is not None:
+                    success, gcode_content, gcode_message = self.gcode_exporter.convert_geometry(geometry)
+                else:
+                    success, gcode_content, gcode_message = self.gcode_exporter.convert_bytes(svg_content)
+
+                if not success:
+                    return results, gcode_message
 
-                return results, "✅ Procesamiento completado exitosamente"
+                results['gcode'] = gcode_content
+                results['gcode_report'] = gcode_message
 
-            except Exception as e:
-                return results, f"❌ Error en el pipeline: {str(e)}"
+            # Reportar finalización
+            if progress_callback:
+                progress_callback('completed', 100)
 
-    def _preprocess_image(self, image, image_array, tmp_dir, results):
+            message = "✅ Procesamiento completado exitosamente"
+            if results['svg_stats']:
+                message += self._format_svg_stats(results['svg_stats'])
+            if results['autotune']:
+                message += self._format_autotune(results['autotune'])
+            message += f" · {results['dxf_report']}"
+            if results['gcode_report']:
+                message += f" · {results['gcode_report']}"
+            return results, message
+
+        except Exception as e:
+            return results, f"❌ Error en el pipeline: {str(e)}"
+
+    def _preprocess_image(self, image, results):
         """
         Preprocesa la imagen si está habilitado
 
         Args:
             image: Imagen PIL original
-            image_array: Array numpy de la imagen
-            tmp_dir: Directorio temporal
             results: Diccionario de resultados
 
         Returns:
-            str: Ruta de la imagen procesada o original
+            Imagen PIL procesada o la original
         """
         if self.use_preprocessing:
             processed_image = self.preprocessor.process_pil_image(image)
             results['preprocessing'] = processed_image
+            return processed_image
+        return image
+
+    def _autotune_vectorizer(self, image, results):
+        """
+        Busca parámetros de VTracer sobre una versión reducida de la imagen
+
+        Args:
+            image: Imagen PIL que se va a vectorizar
+            results: Diccionario de resultados
+
+        Returns:
+            ImageVectorizer con la configuración elegida (el del pipeline no cambia)
+        """
+        tuner = VectorizerAutoTuner(
+            base_config=self.vectorizer.get_config(),
+            **self.autotune_config
+        )
+        config, report = tuner.tune(image)
 
-            # Guardar imagen procesada
-            input_path = os.path.join(tmp_dir, "input_processed.png")
-            processed_image.save(input_path)
-            return input_path
-        else:
-            # Guardar imagen original
-            input_path = os.path.join(tmp_dir, "input.png")
-            image.save(input_path)
-            return input_path
+        report['config'] = config
+        results['autotune'] = report
+        return shared_instance(ImageVectorizer, **config)
+
+    def _format_autotune(self, report):
+        """
+        Formatea el resultado del ajuste automático
+
+        Args:
+            report: Reporte retornado por VectorizerAutoTuner.tune
+
+        Returns:
+            str: Texto para agregar al mensaje final
+        """
+        config = report['config']
+        status = "objetivo cumplido" if report['target_met'] else "objetivo no alcanzado, se usó la más cercana"
+        return (
+            f" · Auto-ajuste ({status}, {report['evaluations']} evaluaciones): "
+            f"manchas={config['filter_speckle']}, esquinas={config['corner_threshold']}, "
+            f"longitud={config['length_threshold']}, precisión={config['path_precision']}"
+        )
+
+    def _format_svg_stats(self, stats):
+        """
+        Formatea la reducción de tamaño del SVG optimizado
+
+        Args:
+            stats: Estadísticas retornadas por SVGOptimizer.optimize
+
+        Returns:
+            str: Texto para agregar al mensaje final
+        """
+        original_kb = stats['original_size'] / 1024
+        optimized_kb = stats['optimized_size'] / 1024
+        symbols = f", {stats['symbols']} símbolos en {stats['symbol_uses']} usos" if stats.get('symbols') else ""
+        return (
+            f" (SVG optimizado: {original_kb:.1f} KB → {optimized_kb:.1f} KB, "
+            f"-{stats['reduction'] * 100:.0f}%{symbols})"
+        )
 
     def update_config(
         self,
         use_preprocessing=None,
         preprocessor_config=None,
         vectorizer_config=None,
-        dxf_config=None
+        dxf_config=None,
+        use_svg_optimization=None,
+        svg_optimizer_config=None,
+        autotune_config=None,
+        gcode_config=None
     ):
         """Actualiza la configuración del pipeline"""
         if use_preprocessing is not None:
             self.use_preprocessing = use_preprocessing
 
+        if use_svg_optimization is not None:
+            self.use_svg_optimization = use_svg_optimization
+
         if preprocessor_config:
-            self.preprocessor = ImagePreprocessor(**preprocessor_config)
+            self.preprocessor = shared_instance(ImagePreprocessor, **preprocessor_config)
 
         if vectorizer_config:
-            self.vectorizer = ImageVectorizer(**vectorizer_config)
+            self.vectorizer = shared_instance(ImageVectorizer, **vectorizer_config)
 
         if dxf_config:
-            self.dxf_converter = DXFConverterV2(**dxf_config)
+            self.dxf_converter = shared_instance(DXFConverterV2, **dxf_config)
+            self.dxf_config = dxf_config
+
+        if gcode_config is not None:
+            self.gcode_config = gcode_config
+
+        if dxf_config or gcode_config is not None:
+            self.gcode_exporter = (
+                shared_instance(GCodeExporter, self.dxf_config, **self.gcode_config) if self.gcode_config else None
+            )
+
+        if svg_optimizer_config:
+            self.svg_optimizer = shared_instance(SVGOptimizer, **svg_optimizer_config)
+
+        if autotune_config is not None:
+            self.autotune_config = autotune_config
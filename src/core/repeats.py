@@ -0,0 +1,123 @@
+"""
+Módulo de detección de formas repetidas
+Agrupa las formas congruentes (iguales salvo traslación y opcionalmente rotación) para escribirlas una sola vez
+"""
+
+import numpy as np
+
+from .svg_parser import SEG_ARC
+
+
+# Máximo de puntos de inicio candidatos que se prueban por forma
+_MAX_CANDIDATES = 8
+
+
+def repeated_shapes(seg_types, points, offsets, quantum, rotation=False, cyclic=None, segment_keys=None):
+    """
+    Encuentra las formas que se repiten en el dibujo
+
+    Cada forma es una secuencia de segmentos en orden de recorrido. Se
+    normaliza respecto de su centroide (promedio de sus puntos de control,
+    que no depende del segmento inicial), se gira para que su vértice más
+    lejano al centroide quede sobre el eje X (solo con rotation) y se
+    cuantiza a celdas de lado quantum; dos formas son congruentes si la
+    forma normalizada es idéntica. Las formas cíclicas (contornos cerrados)
+    además se rotan para empezar en ese vértice, así no importa en qué
+    segmento empezó cada copia. Con varios vértices igual de lejanos se
+    prueban todos y se usa la normalización menor.
+
+    La forma i se obtiene de su representante r como
+    R(angles[i] - angles[r]) (p - centroids[r]) + centroids[i].
+
+    Args:
+        seg_types: Array (S,) con el tipo de cada segmento
+        points: Array (S, 4, 2) con los puntos de control en orden de recorrido
+        offsets: Array (F + 1,) con el primer segmento de cada forma
+        quantum: Lado de las celdas de cuantización (error máximo entre copias)
+        rotation: Si True, también agrupa formas rotadas (las que tienen
+            arcos solo se comparan por traslación)
+        cyclic: Array bool (F,) con las formas que pueden empezar en
+            cualquier segmento, o None (ninguna)
+        segment_keys: Array entero (S, k) opcional con datos de cada segmento
+            que deben coincidir exactamente (ej: parámetros de arcos)
+
+    Returns:
+        tuple: (representantes: array int64 (F,) con la primera forma
+                congruente o -1 si la forma no se repite, centroides (F, 2),
+                ángulos (F,) en radianes)
+    """
+    count = len(offsets) - 1
+    sizes = np.diff(offsets)
+    representatives = np.full(count, -1, dtype=np.int64)
+    centroids = np.zeros((count, 2))
+    angles = np.zeros(count)
+    if count == 0:
+        return representatives, centroids, angles
+
+    filled = np.flatnonzero(sizes > 0)
+    sums = np.add.reduceat(points.sum(axis=1), offsets[filled])
+    centroids[filled] = sums / (4 * sizes[filled, None])
+    with_arcs = np.zeros(count, dtype=bool)
+    with_arcs[filled] = np.add.reduceat(seg_types == SEG_ARC, offsets[filled]) > 0
+    if cyclic is None:
+        cyclic = np.zeros(count, dtype=bool)
+    if segment_keys is None:
+        segment_keys = np.zeros((len(seg_types), 0), dtype=np.int64)
+
+    seen = {}
+    for index in filled.tolist():
+        start, end = offsets[index], offsets[index + 1]
+        key, angles[index] = _canonical_key(
+            seg_types[start:end],
+            points[start:end] - centroids[index],
+            segment_keys[start:end],
+            quantum,
+            rotation and not with_arcs[index],
+            bool(cyclic[index])
+        )
+        first = seen.setdefault(key, index)
+        if first != index:
+            representatives[first] = first
+            representatives[index] = first
+
+    return representatives, centroids, angles
+
+
+def _canonical_key(seg_types, relative, segment_keys, quantum, rotate, cyclic):
+    """
+    Normalización de una forma ya centrada en su centroide (ver repeated_shapes)
+
+    Args:
+        seg_types: Array (K,) con el tipo de cada segmento
+        relative: Array (K, 4, 2) de puntos de control relativos al centroide
+        segment_keys: Array entero (K, k) de datos exactos por segmento
+        quantum: Lado de las celdas de cuantización
+        rotate: Si se normaliza la orientación
+        cyclic: Si la forma puede empezar en cualquier segmento
+
+    Returns:
+        tuple: (clave hasheable, ángulo de la orientación canónica en radianes)
+    """
+    candidates = [0]
+    if rotate or cyclic:
+        starts = relative[:, 0]
+        distances = np.hypot(starts[:, 0], starts[:, 1])
+        candidates = np.flatnonzero(distances >= distances.max() - quantum)[:_MAX_CANDIDATES].tolist()
+
+    best = None
+    for candidate in candidates:
+        shift = -candidate if cyclic else 0
+        points = np.roll(relative, shift, axis=0)
+        angle = 0.0
+        if rotate:
+            angle = float(np.arctan2(relative[candidate, 0, 1], relative[candidate, 0, 0]))
+            cos, sin = np.cos(angle), np.sin(angle)
+            points = points @ np.array([[cos, -sin], [sin, cos]])
+        key = (
+            np.roll(seg_types, shift).tobytes(),
+            np.rint(points / quantum).astype(np.int64).tobytes(),
+            np.roll(segment_keys, shift, axis=0).tobytes()
+        )
+        if best is None or key < best[0]:
+            best = (key, angle)
+    return best
@@ -0,0 +1,185 @@
+"""
+Módulo de simplificación de polilíneas
+Ramer–Douglas–Peucker sobre arrays numpy, procesado por niveles (sin recursión)
+"""
+
+import numpy as np
+
+
+def simplify_polyline(points, tolerance):
+    """
+    Simplifica una polilínea abierta con Ramer–Douglas–Peucker
+
+    Los extremos se conservan siempre. En lugar de recursar, los tramos
+    pendientes se acumulan en una lista de trabajo que se procesa nivel a
+    nivel, así que no hay límite de profundidad.
+
+    Args:
+        points: Array (K, 2) de vértices
+        tolerance: Distancia máxima permitida entre la polilínea original y la simplificada
+
+    Returns:
+        Array (M, 2) con los vértices conservados (M <= K)
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 3 or tolerance <= 0:
+        return points
+    return points[_rdp_mask(points, tolerance)]
+
+
+def simplify_ring(points, tolerance):
+    """
+    Simplifica una polilínea cerrada manteniéndola cerrada
+
+    El anillo se divide en el primer vértice y en el vértice más lejano a
+    él; cada mitad se simplifica como polilínea abierta, de modo que los
+    dos puntos de corte se conservan y el anillo nunca queda con menos de
+    tres vértices.
+
+    Args:
+        points: Array (K, 2) de vértices del anillo (sin repetir el primero al final)
+        tolerance: Distancia máxima permitida
+
+    Returns:
+        Array (M, 2) con los vértices conservados, 3 <= M <= K
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 4 or tolerance <= 0:
+        return points
+
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    if far == 0:
+        # Todos los vértices coinciden
+        return points
+
+    loop = np.vstack([points, points[:1]])
+    first = _rdp_mask(loop[:far + 1], tolerance)
+    second = _rdp_mask(loop[far:], tolerance)
+    keep = np.concatenate([first, second[1:-1]])
+
+    if keep.sum() < 3:
+        # Anillo más chico que la tolerancia: conservar un triángulo
+        chord = _segment_distances(points, points[0], points[far])
+        keep[int(np.argmax(chord))] = True
+    return points[keep]
+
+
+def simplify_with_bulges(vertices, bulges, tolerance, closed=False):
+    """
+    Simplifica solo los tramos rectos de una polilínea con arcos (bulges)
+
+    Los vértices donde empieza o termina un arco quedan fijos; cada tramo
+    recto entre dos vértices fijos se simplifica como polilínea abierta.
+
+    Args:
+        vertices: Array (K, 2) de vértices
+        bulges: Array (K,) con el bulge del segmento que sale de cada vértice
+        tolerance: Distancia máxima permitida
+        closed: Si la polilínea es cerrada
+
+    Returns:
+        tuple: (vértices (M, 2), bulges (M,))
+    """
+    count = len(vertices)
+    arc_starts = np.flatnonzero(bulges)
+    if len(arc_starts) == 0:
+        simplified = simplify_ring(vertices, tolerance) if closed else simplify_polyline(vertices, tolerance)
+        return simplified, np.zeros(len(simplified))
+
+    fixed = np.zeros(count + 1, dtype=bool)
+    fixed[arc_starts] = True
+    fixed[arc_starts + 1] = True
+    # El primer vértice es un ancla (en anillos, el punto de entrada elegido
+    # al ordenar el recorrido); el cierre vuelve a él
+    fixed[0] = True
+    if closed:
+        fixed[count] = True
+        loop = np.vstack([vertices, vertices[:1]])
+    else:
+        fixed[count - 1] = True
+        fixed = fixed[:count]
+        loop = vertices
+
+    keep = fixed.copy()
+    anchors = np.flatnonzero(fixed)
+    for start, end in zip(anchors[:-1], anchors[1:]):
+        if end - start >= 2 and bulges[start] == 0:
+            keep[start:end + 1] |= _rdp_mask(loop[start:end + 1], tolerance)
+
+    if closed:
+        keep = keep[:count]
+    return vertices[keep], bulges[keep]
+
+
+def _rdp_mask(points, tolerance):
+    """
+    Máscara de vértices conservados por Ramer–Douglas–Peucker
+
+    Todos los tramos pendientes de un mismo nivel se evalúan juntos: las
+    distancias de sus vértices interiores se calculan en un solo paso y el
+    máximo de cada tramo se obtiene con una reducción por segmentos.
+
+    Args:
+        points: Array (K, 2) de vértices, K >= 2
+        tolerance: Distancia máxima permitida
+
+    Returns:
+        Array bool (K,)
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    starts = np.array([0])
+    ends = np.array([len(points) - 1])
+
+    while True:
+        # Solo los tramos con vértices interiores
+        active = ends - starts >= 2
+        starts, ends = starts[active], ends[active]
+        if len(starts) == 0:
+            break
+
+        counts = ends - starts - 1
+        first = np.cumsum(counts) - counts
+        owner = np.repeat(np.arange(len(starts)), counts)
+        indices = np.arange(counts.sum()) - first[owner] + starts[owner] + 1
+
+        distances = _segment_distances(points[indices], points[starts[owner]], points[ends[owner]])
+        maxima = np.maximum.reduceat(distances, first)
+
+        # Primer vértice que alcanza el máximo de cada tramo
+        candidates = np.flatnonzero(distances == maxima[owner])
+        _, position = np.unique(owner[candidates], return_index=True)
+        splits = indices[candidates[position]]
+
+        divide = maxima > tolerance
+        splits = splits[divide]
+        keep[splits] = True
+        starts, ends = (
+            np.concatenate([starts[divide], splits]),
+            np.concatenate([splits, ends[divide]])
+        )
+
+    return keep
+
+
+def _segment_distances(points, starts, ends):
+    """
+    Distancia de cada punto a su segmento [start, end]
+
+    Args:
+        points: Array (K, 2)
+        starts: Array (2,) o (K, 2) con el extremo inicial del segmento
+        ends: Array (2,) o (K, 2) con el extremo final del segmento
+
+    Returns:
+        Array (K,) de distancias
+    """
+    direction = np.broadcast_to(ends - starts, points.shape)
+    offsets = points - starts
+    length_sq = np.einsum('ij,ij->i', direction, direction)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.einsum('ij,ij->i', offsets, direction) / length_sq
+    # Segmentos degenerados (extremos iguales): distancia al punto
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    closest = offsets - t[:, None] * direction
+    return np.hypot(closest[:, 0], closest[:, 1])
@@ -0,0 +1,368 @@
+"""
+Módulo de optimización de SVG
+Reduce el tamaño del SVG generado por VTracer antes de enviarlo al navegador
+"""
+
+import io
+
+import numpy as np
+
+from .repeats import repeated_shapes
+from .svg_parser import SVGPathParser, SEG_LINE, SEG_QUADRATIC, SEG_CUBIC, SEG_ARC
+
+
+class SVGOptimizer:
+    """Optimiza SVG aplicando transformaciones, cuantizando y compactando paths"""
+
+    def __init__(self, precision=2, relative=True, merge_paths=True, symbols=False, symbol_rotation=False):
+        """
+        Inicializa el optimizador
+
+        Args:
+            precision: Decimales a conservar en las coordenadas (0-8)
+            relative: Si True, usa comandos relativos (más cortos)
+            merge_paths: Si True, une paths consecutivos con el mismo relleno
+            symbols: Si True, los elementos que se repiten (ej: la misma letra)
+                se escriben una sola vez como <symbol> y cada copia como <use>
+            symbol_rotation: Si True, también se agrupan copias rotadas
+        """
+        self.precision = precision
+        self.relative = relative
+        self.merge_paths = merge_paths
+        self.symbols = symbols
+        self.symbol_rotation = symbol_rotation
+
+    def optimize(self, svg_content, geometry=None):
+        """
+        Optimiza un SVG
+
+        Args:
+            svg_content: Contenido SVG (str)
+            geometry: SVGGeometry de svg_content si ya se tiene (evita parsearlo de nuevo)
+
+        Returns:
+            tuple: (svg optimizado: str, estadísticas: dict)
+        """
+        if geometry is None:
+            geometry = SVGPathParser().parse(io.StringIO(svg_content))
+        optimized, stats = self.serialize(geometry)
+
+        original_size = len(svg_content.encode('utf-8'))
+        optimized_size = stats['optimized_size']
+        stats['original_size'] = original_size
+        stats['reduction'] = 1 - optimized_size / original_size if original_size else 0.0
+        return optimized, stats
+
+    def serialize(self, geometry):
+        """
+        Escribe una geometría como SVG compacto
+
+        Args:
+            geometry: SVGGeometry (parseada de un SVG o generada directamente)
+
+        Returns:
+            tuple: (svg: str, estadísticas: dict sin los tamaños del original)
+        """
+        scale = 10 ** self.precision
+
+        # Elementos repetidos: cada forma se define una vez, relativa a su centroide
+        representatives = np.full(len(geometry.element_fills), -1, dtype=np.int64)
+        points = geometry.points
+        if self.symbols and geometry.num_segments:
+            representatives, centroids, angles = self._repeated_elements(geometry)
+            segment_element = np.repeat(geometry.path_element, np.diff(geometry.path_offsets))
+            defined = representatives[segment_element] == segment_element
+            points = points.copy()
+            points[defined] -= centroids[segment_element[defined], None]
+        shapes = np.unique(representatives[representatives >= 0])
+
+        # Cuantizar coordenadas absolutas: los deltas entre valores ya redondeados
+        # son exactos y no acumulan error al usar comandos relativos
+        quantized = np.rint(points * scale).astype(np.int64)
+        quad_controls = np.rint(
+            (3 * points[:, 1] - points[:, 0]) / 2 * scale
+        ).astype(np.int64)
+
+        element_data = [[] for _ in geometry.element_fills]
+        for index in range(geometry.num_paths):
+            element = geometry.path_element[index]
+            if representatives[element] not in (-1, element):
+                # Copia de una forma ya definida: se escribe como <use>
+                continue
+            start, end = geometry.path_range(index)
+            element_data[element].append(
+                self._contour_commands(geometry, quantized, quad_controls, start, end, index)
+            )
+
+        # Agrupar elementos consecutivos con el mismo relleno (las copias cortan los grupos)
+        groups = []
+        for element, (fill, contours) in enumerate(zip(geometry.element_fills, element_data)):
+            if representatives[element] >= 0:
+                groups.append((fill, None, element))
+            elif not contours:
+                continue
+            elif self.merge_paths and groups and groups[-1][1] is not None and groups[-1][0] == fill:
+                groups[-1][1].extend(contours)
+            else:
+                groups.append((fill, list(contours), None))
+
+        lines = [self._svg_header(geometry)]
+        if len(shapes):
+            lines.append('<defs>')
+            for number, element in enumerate(shapes.tolist()):
+                d = self._serialize_path(element_data[element])
+                lines.append(f'<symbol id="s{number}" overflow="visible"><path d="{d}"/></symbol>')
+            lines.append('</defs>')
+        for fill, contours, element in groups:
+            fill_attr = f' fill="{_short_color(fill)}"' if fill else ''
+            if contours is None:
+                representative = representatives[element]
+                number = int(np.searchsorted(shapes, representative))
+                placement = self._use_placement(centroids[element], angles[element] - angles[representative])
+                lines.append(f'<use href="#s{number}"{placement}{fill_attr}/>')
+            else:
+                d = self._serialize_path(contours)
+                lines.append(f'<path d="{d}"{fill_attr}/>')
+        lines.append('</svg>')
+        optimized = '\n'.join(lines)
+
+        stats = {
+            'optimized_size': len(optimized.encode('utf-8')),
+            'original_paths': len(geometry.element_fills),
+            'optimized_paths': sum(contours is not None for _, contours, _ in groups),
+            'symbols': len(shapes),
+            'symbol_uses': int(np.count_nonzero(representatives >= 0))
+        }
+        return optimized, stats
+
+    def _repeated_elements(self, geometry):
+        """
+        Busca los elementos congruentes (ver repeated_shapes)
+
+        Cada elemento se compara con todos sus contornos: los agujeros solo
+        se ven como agujeros dentro del mismo path que su contorno exterior.
+        Las formas se cuantizan con la precisión del optimizador.
+
+        Args:
+            geometry: SVGGeometry del SVG original
+
+        Returns:
+            tuple: (representante de cada elemento o -1, centroides (E, 2), ángulos (E,))
+        """
+        elements = len(geometry.element_fills)
+        lengths = np.diff(geometry.path_offsets)
+        offsets = np.zeros(elements + 1, dtype=np.int64)
+        np.cumsum(np.bincount(geometry.path_element, weights=lengths, minlength=elements).astype(np.int64), out=offsets[1:])
+
+        # Solo un contorno cerrado puede empezar en cualquier segmento
+        contours = np.bincount(geometry.path_element, minlength=elements)
+        closed = np.bincount(geometry.path_element, weights=geometry.closed, minlength=elements)
+        cyclic = (contours == 1) & (closed == 1)
+
+        # Inicio de cada contorno (y si es cerrado) y parámetros de los arcos
+        segment_keys = np.zeros((geometry.num_segments, 6), dtype=np.int64)
+        starts = geometry.path_offsets[:-1][lengths > 0]
+        segment_keys[starts, 0] = 1 + geometry.closed[lengths > 0]
+        if len(geometry.arc_index):
+            params = geometry.arc_params
+            segment_keys[geometry.arc_index, 1:3] = np.rint(params[:, :2] * 10 ** self.precision)
+            segment_keys[geometry.arc_index, 3] = np.rint(params[:, 2] * 1000)
+            segment_keys[geometry.arc_index, 4:] = params[:, 3:]
+
+        return repeated_shapes(
+            geometry.seg_types, geometry.points, offsets, 10.0 ** -self.precision,
+            rotation=self.symbol_rotation, cyclic=cyclic, segment_keys=segment_keys
+        )
+
+    def _use_placement(self, centroid, angle):
+        """
+        Atributos de posición de un <use> (su símbolo está centrado en el origen)
+
+        Args:
+            centroid: Centroide (x, y) de la copia
+            angle: Rotación de la copia respecto de la forma definida, en radianes
+
+        Returns:
+            str: Atributos x/y o transform
+        """
+        x, y = self._format_coords(np.rint(np.asarray(centroid) * 10 ** self.precision).astype(np.int64).tolist())
+        turn = _format_number(np.degrees(angle) % 360.0)
+        if turn in ('0', '360'):
+            return f' x="{x}" y="{y}"'
+        return f' transform="translate({x} {y})rotate({turn})"'
+
+    def _svg_header(self, geometry):
+        """
+        Genera la etiqueta <svg> de apertura con un viewBox explícito
+
+        Conserva el viewBox del original (las coordenadas se escriben en su
+        mismo sistema); si no tenía, lo arma con width y height.
+
+        Args:
+            geometry: SVGGeometry del SVG original
+
+        Returns:
+            str: Etiqueta de apertura
+        """
+        attributes = ['xmlns="http://www.w3.org/2000/svg"']
+        if geometry.width is not None:
+            attributes.append(f'width="{_format_number(geometry.width)}"')
+        if geometry.height is not None:
+            attributes.append(f'height="{_format_number(geometry.height)}"')
+        if geometry.view_box is not None:
+            attributes.append(f'viewBox="{" ".join(_format_number(value) for value in geometry.view_box)}"')
+        elif geometry.width is not None and geometry.height is not None:
+            attributes.append(
+                f'viewBox="0 0 {_format_number(geometry.width)} {_format_number(geometry.height)}"'
+            )
+        return f'<svg {" ".join(attributes)}>'
+
+    def _contour_commands(self, geometry, quantized, quad_controls, start, end, path_index):
+        """
+        Construye la lista de comandos de un contorno en enteros cuantizados
+
+        Args:
+            geometry: SVGGeometry de origen
+            quantized: Array (N, 4, 2) de puntos de control cuantizados
+            quad_controls: Array (N, 2) con el control original de cada cuadrática
+            start: Primer segmento del contorno
+            end: Último segmento del contorno + 1
+            path_index: Índice del contorno
+
+        Returns:
+            tuple: (punto inicial, lista de (comando, [enteros absolutos]), cerrado)
+        """
+        closed = bool(geometry.closed[path_index])
+        origin = quantized[start, 0]
+        last = end - 1
+
+        # El cierre con 'z' reemplaza a la línea final de vuelta al inicio
+        if (closed and last > start and geometry.seg_types[last] == SEG_LINE
+                and np.array_equal(quantized[last, 3], origin)):
+            last -= 1
+
+        commands = []
+        seg_types = geometry.seg_types[start:last + 1]
+        for offset, seg_type in enumerate(seg_types.tolist()):
+            index = start + offset
+            p = quantized[index]
+            if seg_type == SEG_LINE:
+                if np.array_equal(p[0], p[3]):
+                    # Segmento de longitud nula tras cuantizar
+                    continue
+                commands.append(('L', p[3].tolist()))
+            elif seg_type == SEG_CUBIC:
+                commands.append(('C', p[1:].ravel().tolist()))
+            elif seg_type == SEG_QUADRATIC:
+                commands.append(('Q', quad_controls[index].tolist() + p[3].tolist()))
+            elif seg_type == SEG_ARC:
+                rx, ry, rotation, large_arc, sweep = geometry.arc_params_for(index)
+                commands.append(('A', [rx, ry, rotation, int(large_arc), int(sweep)] + p[3].tolist()))
+
+        return origin.tolist(), commands, closed
+
+    def _serialize_path(self, contours):
+        """
+        Serializa contornos al atributo d más corto posible
+
+        Args:
+            contours: Lista de salidas de _contour_commands
+
+        Returns:
+            str: Datos del path
+        """
+        parts = []
+        previous_command = None
+        current = (0, 0)
+        relative = self.relative
+
+        def emit(command, numbers):
+            nonlocal previous_command
+            text = ''
+            for number in numbers:
+                if text and not number.startswith('-'):
+                    text += ' '
+                text += number
+            if command == previous_command and command not in ('m', 'M'):
+                # Repetición implícita del comando anterior
+                if not text.startswith('-'):
+                    text = ' ' + text
+                parts.append(text)
+            else:
+                parts.append(command + text)
+            previous_command = command
+
+        for origin, commands, closed in contours:
+            move = [origin[0] - current[0], origin[1] - current[1]] if relative and parts else origin
+            emit('m' if relative and parts else 'M', self._format_coords(move))
+            current = origin
+            for command, values in commands:
+                if command == 'A':
+                    rx, ry, rotation = (_format_number(v) for v in values[:3])
+                    end = values[5:]
+                    coords = [end[0] - current[0], end[1] - current[1]] if relative else end
+                    numbers = [rx, ry, rotation, str(values[3]), str(values[4])]
+                    emit('a' if relative else 'A', numbers + self._format_coords(coords))
+                    current = tuple(end)
+                    continue
+
+                end = values[-2:]
+                if relative:
+                    coords = [v - current[i % 2] for i, v in enumerate(values)]
+                else:
+                    coords = values
+
+                if command == 'L' and end[1] == current[1]:
+                    emit('h' if relative else 'H', self._format_coords(coords[:1]))
+                elif command == 'L' and end[0] == current[0]:
+                    emit('v' if relative else 'V', self._format_coords(coords[1:]))
+                else:
+                    emit(command.lower() if relative else command, self._format_coords(coords))
+                current = tuple(end)
+            if closed:
+                parts.append('z' if relative else 'Z')
+                previous_command = 'z'
+                current = origin
+
+        return ''.join(parts)
+
+    def _format_coords(self, values):
+        """Formatea enteros cuantizados como números decimales compactos"""
+        return [_format_fixed(value, self.precision) for value in values]
+
+
+def _format_fixed(value, precision):
+    """
+    Formatea un entero escalado por 10^precision con la menor cantidad de caracteres
+
+    Args:
+        value: Entero cuantizado
+        precision: Cantidad de decimales de la cuantización
+
+    Returns:
+        str: Número sin ceros sobrantes (ej: 50 con precisión 2 -> ".5")
+    """
+    if precision == 0:
+        return str(value)
+    sign = '-' if value < 0 else ''
+    whole, fraction = divmod(abs(value), 10 ** precision)
+    fraction_str = str(fraction).rjust(precision, '0').rstrip('0')
+    if not fraction_str:
+        return f'{sign}{whole}'
+    return f'{sign}{whole if whole else ""}.{fraction_str}'
+
+
+def _format_number(value):
+    """Formatea un float sin ceros decimales sobrantes"""
+    text = f'{value:.6f}'.rstrip('0').rstrip('.')
+    return text if text not in ('', '-0') else '0'
+
+
+def _short_color(color):
+    """Acorta colores hexadecimales de la forma #RRGGBB a #RGB cuando es posible"""
+    if len(color) == 7 and color.startswith('#'):
+        r, g, b = color[1:3], color[3:5], color[5:7]
+        if r[0] == r[1] and g[0] == g[1] and b[0] == b[1]:
+            return f'#{r[0]}{g[0]}{b[0]}'.lower()
+        return color.lower()
+    return color
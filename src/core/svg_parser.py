@@ -0,0 +1,937 @@
+"""
+Módulo de parseo rápido de SVG
+Lee los paths generados por VTracer y produce una geometría compacta basada en arrays numpy
+"""
+
+import io
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+import numpy as np
+
+from .svg_transform import apply_transform, compose, parse_transform, transform_arc_params
+
+
+# Códigos de tipo de segmento
+SEG_LINE = 0
+SEG_QUADRATIC = 1
+SEG_CUBIC = 2
+SEG_ARC = 3
+
+_COMMAND_RE = re.compile(r'([MmZzLlHhVvCcSsQqTtAa])([^MmZzLlHhVvCcSsQqTtAa]*)')
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_FLAG_RE = re.compile(r'[01]')
+
+# Formas básicas que se convierten a su path equivalente
+_SHAPE_TAGS = frozenset(('rect', 'circle', 'ellipse', 'line', 'polyline', 'polygon'))
+
+# Atributo href de SVG 1.1 (los <use> de SVG 2 usan href sin espacio de nombres)
+_XLINK_HREF = '{http://www.w3.org/1999/xlink}href'
+
+
+class SVGGeometry:
+    """
+    Geometría SVG almacenada en arrays contiguos
+
+    Cada segmento se guarda como una Bezier cúbica exacta en ``points``
+    (inicio, control 1, control 2, fin), de modo que todo el código numérico
+    puede tratar líneas, cuadráticas y cúbicas de forma uniforme:
+
+    - Línea: (p0, p0, p1, p1)
+    - Cuadrática: elevada a grado 3 (el control original es (3 * c1 - p0) / 2)
+    - Cúbica: sus cuatro puntos de control
+    - Arco: (p0, p0, p1, p1) más sus parámetros SVG en ``arc_params``
+
+    Cada path de la geometría es un subpath (contorno) continuo del SVG.
+
+    Solo contiene arrays contiguos (sin objetos por segmento): un segmento
+    ocupa 65 bytes en float64 y 33 en float32 (ver astype). Se serializa sin
+    copias con pickle protocolo 5 (los arrays se exportan como buffers fuera
+    de banda).
+    """
+
+    __slots__ = (
+        'seg_types', 'points', 'path_offsets', 'closed', 'path_element', 'element_fills',
+        'arc_index', 'arc_params', 'width', 'height', 'view_box'
+    )
+
+    def __init__(
+        self,
+        seg_types,
+        points,
+        path_offsets,
+        closed,
+        path_element,
+        element_fills,
+        arc_index=None,
+        arc_params=None,
+        width=None,
+        height=None,
+        view_box=None
+    ):
+        """
+        Inicializa la geometría
+
+        Args:
+            seg_types: Array uint8 (N,) con el código de tipo de cada segmento
+            points: Array float64 o float32 (N, 4, 2) con los puntos de control de cada segmento
+            path_offsets: Array int64 (P + 1,) con el primer segmento de cada path
+            closed: Array bool (P,) indicando si el path terminaba en 'Z'
+            path_element: Array int32 (P,) con el índice del elemento <path> de origen
+            element_fills: Lista con el atributo fill de cada elemento <path>
+            arc_index: Array int64 (M,) con el índice de segmento de cada arco
+            arc_params: Array (M, 5), del mismo tipo que points, con (rx, ry,
+                rotación en grados, large_arc, sweep)
+            width: Ancho declarado en el elemento <svg> (opcional)
+            height: Alto declarado en el elemento <svg> (opcional)
+            view_box: Tupla (min_x, min_y, ancho, alto) del atributo viewBox (opcional)
+        """
+        self.seg_types = seg_types
+        self.points = points
+        self.path_offsets = path_offsets
+        self.closed = closed
+        self.path_element = path_element
+        self.element_fills = element_fills
+        self.arc_index = arc_index if arc_index is not None else np.zeros(0, dtype=np.int64)
+        self.arc_params = arc_params if arc_params is not None else np.zeros((0, 5))
+        self.width = width
+        self.height = height
+        self.view_box = view_box
+
+    @property
+    def num_paths(self):
+        """Número de paths (contornos) de la geometría"""
+        return len(self.path_offsets) - 1
+
+    @property
+    def num_segments(self):
+        """Número total de segmentos de la geometría"""
+        return len(self.seg_types)
+
+    def path_range(self, index):
+        """
+        Retorna el rango de segmentos de un path
+
+        Args:
+            index: Índice del path
+
+        Returns:
+            tuple: (primer segmento, último segmento + 1)
+        """
+        return int(self.path_offsets[index]), int(self.path_offsets[index + 1])
+
+    @property
+    def nbytes(self):
+        """Memoria ocupada por los arrays de la geometría (bytes)"""
+        return sum(
+            array.nbytes for array in (
+                self.seg_types, self.points, self.path_offsets, self.closed,
+                self.path_element, self.arc_index, self.arc_params
+            )
+        )
+
+    def astype(self, dtype):
+        """
+        Retorna la geometría con puntos y parámetros de arco en otra precisión
+
+        float32 reduce a la mitad la memoria de geometrías grandes; el
+        convertidor DXF pasa cada tanda a float64 antes de calcular.
+
+        Args:
+            dtype: np.float32 o np.float64
+
+        Returns:
+            SVGGeometry que comparte los arrays que no cambian de tipo
+        """
+        return SVGGeometry(
+            seg_types=self.seg_types,
+            points=self.points.astype(dtype, copy=False),
+            path_offsets=self.path_offsets,
+            closed=self.closed,
+            path_element=self.path_element,
+            element_fills=self.element_fills,
+            arc_index=self.arc_index,
+            arc_params=self.arc_params.astype(dtype, copy=False),
+            width=self.width,
+            height=self.height,
+            view_box=self.view_box
+        )
+
+    def arc_params_for(self, segment_index):
+        """
+        Retorna los parámetros SVG de un segmento de arco
+
+        Args:
+            segment_index: Índice global del segmento
+
+        Returns:
+            Array (5,) con (rx, ry, rotación en grados, large_arc, sweep)
+        """
+        position = np.searchsorted(self.arc_index, segment_index)
+        return self.arc_params[position]
+
+
+# Vista de un grupo de PathGroups
+PathGroup = namedtuple('PathGroup', ['segments', 'reversed', 'is_closed'])
+
+
+class PathGroups:
+    """
+    Grupos de segmentos a emitir como una entidad (cadenas de paths), en arrays
+
+    Los índices de todos los grupos están concatenados en ``segments`` y
+    ``offsets`` marca dónde empieza cada grupo, como path_offsets en
+    SVGGeometry. Indexar con un entero retorna un PathGroup con vistas (sin
+    copias) y con un slice retorna otro PathGroups.
+    """
+
+    __slots__ = ('segments', 'reversed', 'offsets', 'closed')
+
+    def __init__(self, segments, reversed_mask, offsets, closed):
+        """
+        Inicializa los grupos
+
+        Args:
+            segments: Array int64 (S,) de índices de segmentos en orden de recorrido
+            reversed_mask: Array bool (S,) indicando si cada segmento se recorre invertido
+            offsets: Array int64 (G + 1,) con la posición del primer segmento de cada grupo
+            closed: Array bool (G,) indicando si cada grupo forma un contorno cerrado
+        """
+        self.segments = segments
+        self.reversed = reversed_mask
+        self.offsets = offsets
+        self.closed = closed
+
+    @classmethod
+    def from_groups(cls, groups):
+        """
+        Construye los arrays a partir de una secuencia de PathGroup
+
+        Args:
+            groups: Iterable de PathGroup (o tuplas segments, reversed, is_closed)
+
+        Returns:
+            PathGroups
+        """
+        groups = list(groups)
+        offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+        np.cumsum([len(group[0]) for group in groups], out=offsets[1:])
+        if not groups:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), offsets, np.zeros(0, dtype=bool))
+        return cls(
+            np.concatenate([group[0] for group in groups]).astype(np.int64, copy=False),
+            np.concatenate([group[1] for group in groups]).astype(bool, copy=False),
+            offsets,
+            np.array([group[2] for group in groups], dtype=bool)
+        )
+
+    def __len__(self):
+        """Número de grupos"""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        """PathGroup del grupo index, o PathGroups con los grupos de un slice"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("PathGroups solo admite slices contiguos")
+            stop = max(start, stop)
+            first, last = self.offsets[start], self.offsets[stop]
+            return PathGroups(
+                self.segments[first:last],
+                self.reversed[first:last],
+                self.offsets[start:stop + 1] - first,
+                self.closed[start:stop]
+            )
+        if index < 0:
+            index += len(self)
+        first, last = self.offsets[index], self.offsets[index + 1]
+        return PathGroup(self.segments[first:last], self.reversed[first:last], bool(self.closed[index]))
+
+    def __iter__(self):
+        """Recorre los grupos como PathGroup"""
+        for index in range(len(self)):
+            yield self[index]
+
+    def sizes(self):
+        """Número de segmentos de cada grupo (G,)"""
+        return np.diff(self.offsets)
+
+
+class SVGPathParser:
+    """Parser de SVG orientado a la salida de VTracer (elementos <path> y formas básicas con transformaciones)"""
+
+    def parse(self, svg_input, dtype=np.float64):
+        """
+        Parsea un SVG y construye su geometría en arrays
+
+        Las transformaciones de los elementos (incluidos los <g> anidados) se
+        componen en una pila y se aplican a los puntos de cada path. Las formas
+        básicas (<rect>, <circle>, <ellipse>, <line>, <polyline>, <polygon>)
+        se convierten a su path equivalente y se tratan igual. Los paths
+        dentro de <defs> o <symbol> no se dibujan: se guardan por id (el del
+        path y el del <symbol>) y cada <use> posterior que los referencia los
+        agrega con su transformación y su posición (x, y); un path sin fill
+        toma el del <use>.
+
+        Args:
+            svg_input: Ruta del archivo SVG o file-like object
+            dtype: Tipo de los puntos y parámetros de arco de la geometría
+                (np.float64 o np.float32); los segmentos se convierten al
+                acumularse, así que float32 también reduce la memoria del parseo
+
+        Returns:
+            SVGGeometry con todos los contornos del SVG
+        """
+        builder = _GeometryBuilder(dtype)
+        width = height = view_box = None
+        transforms = [None]
+        # Paths reutilizables por id: lista de (d, fill, matriz relativa)
+        definitions = {}
+        # ids de los <defs> y <symbol> abiertos
+        defining = []
+
+        for event, element in ET.iterparse(svg_input, events=('start', 'end')):
+            tag = element.tag.rsplit('}', 1)[-1]
+
+            if event == 'start':
+                if tag in ('defs', 'symbol'):
+                    # Su contenido se dibuja en el sistema de coordenadas de cada <use>
+                    transforms.append(None)
+                    defining.append(element.get('id'))
+                    continue
+
+                matrix = compose(transforms[-1], parse_transform(element.get('transform')))
+                transforms.append(matrix)
+
+                if tag == 'svg' and width is None:
+                    width = _parse_length(element.get('width'))
+                    height = _parse_length(element.get('height'))
+                    view_box = _parse_view_box(element.get('viewBox'))
+                elif tag == 'path' or tag in _SHAPE_TAGS:
+                    d = element.get('d') if tag == 'path' else _shape_path_data(tag, element)
+                    if d and defining:
+                        shape = (d, element.get('fill'), matrix)
+                        for key in {element.get('id'), defining[-1]} - {None}:
+                            definitions.setdefault(key, []).append(shape)
+                    elif d:
+                        builder.begin_element(element.get('fill'), matrix)
+                        self._parse_d(d, builder)
+                elif tag == 'use' and not defining:
+                    href = element.get('href') or element.get(_XLINK_HREF) or ''
+                    x = _parse_length(element.get('x')) or 0.0
+                    y = _parse_length(element.get('y')) or 0.0
+                    placement = compose(matrix, parse_transform(f'translate({x} {y})') if x or y else None)
+                    for d, fill, inner in definitions.get(href[1:] if href.startswith('#') else None, ()):
+                        builder.begin_element(fill or element.get('fill'), compose(placement, inner))
+                        self._parse_d(d, builder)
+            else:
+                transforms.pop()
+                if tag in ('defs', 'symbol'):
+                    defining.pop()
+                elif tag == 'path' or tag in _SHAPE_TAGS:
+                    # Liberar el elemento ya procesado para mantener memoria constante
+                    element.clear()
+
+        return builder.build(width, height, view_box)
+
+    def _parse_d(self, d, builder):
+        """
+        Tokeniza el atributo d de un path y agrega sus segmentos al builder
+
+        Los comandos consecutivos del mismo tipo se procesan en bloque con numpy.
+
+        Args:
+            d: Cadena de datos del path
+            builder: _GeometryBuilder donde acumular los segmentos
+        """
+        current = np.zeros(2)
+        subpath_start = np.zeros(2)
+        last_control = None
+        last_command = ''
+
+        for command, args in _COMMAND_RE.findall(d):
+            upper = command.upper()
+            relative = command != upper
+
+            if upper == 'Z':
+                builder.close_subpath(current, subpath_start)
+                current = subpath_start.copy()
+                last_command = 'Z'
+                continue
+
+            if upper == 'A':
+                current = self._parse_arcs(args, relative, current, builder)
+                last_command = 'A'
+                continue
+
+            values = np.array(_NUMBER_RE.findall(args), dtype=float)
+
+            if upper == 'M':
+                pairs = values.reshape(-1, 2)
+                target = current + pairs[0] if relative else pairs[0]
+                builder.move_to()
+                current = target.copy()
+                subpath_start = target.copy()
+                if len(pairs) > 1:
+                    # Pares adicionales tras M son líneas implícitas
+                    current = self._add_lines(pairs[1:], relative, current, builder)
+                last_command = 'L'
+            elif upper == 'L':
+                current = self._add_lines(values.reshape(-1, 2), relative, current, builder)
+                last_command = 'L'
+            elif upper in ('H', 'V'):
+                axis = 0 if upper == 'H' else 1
+                steps = np.cumsum(values) + current[axis] if relative else values
+                pairs = np.repeat(current[None, :], len(steps), axis=0)
+                pairs[:, axis] = steps
+                current = self._add_lines(pairs, False, current, builder)
+                last_command = 'L'
+            elif upper == 'C':
+                triples = values.reshape(-1, 3, 2)
+                current, last_control = self._add_cubics(triples, relative, current, builder)
+                last_command = 'C'
+            elif upper == 'Q':
+                pairs = values.reshape(-1, 2, 2)
+                current, last_control = self._add_quadratics(pairs, relative, current, builder)
+                last_command = 'Q'
+            elif upper == 'S':
+                for c2, end in values.reshape(-1, 2, 2):
+                    c1 = 2 * current - last_control if last_command == 'C' else current
+                    triple = np.array([[c1 - current if relative else c1, c2, end]])
+                    current, last_control = self._add_cubics(triple, relative, current, builder)
+                    last_command = 'C'
+            elif upper == 'T':
+                for end in values.reshape(-1, 2):
+                    control = 2 * current - last_control if last_command == 'Q' else current
+                    pair = np.array([[control - current if relative else control, end]])
+                    current, last_control = self._add_quadratics(pair, relative, current, builder)
+                    last_command = 'Q'
+
+    def _segment_starts(self, ends, current):
+        """Puntos iniciales de una cadena de segmentos dados sus puntos finales"""
+        return np.vstack([current[None, :], ends[:-1]])
+
+    def _add_lines(self, pairs, relative, current, builder):
+        """
+        Agrega una cadena de líneas rectas
+
+        Args:
+            pairs: Array (k, 2) de puntos finales
+            relative: Si las coordenadas son relativas
+            current: Punto actual
+            builder: _GeometryBuilder destino
+
+        Returns:
+            Array (2,) con el nuevo punto actual
+        """
+        ends = current + np.cumsum(pairs, axis=0) if relative else pairs
+        starts = self._segment_starts(ends, current)
+        builder.add_segments(SEG_LINE, np.stack([starts, starts, ends, ends], axis=1))
+        return ends[-1].copy()
+
+    def _add_cubics(self, triples, relative, current, builder):
+        """
+        Agrega una cadena de Bezier cúbicas
+
+        Args:
+            triples: Array (k, 3, 2) con (control 1, control 2, fin) por segmento
+            relative: Si las coordenadas son relativas al inicio de cada segmento
+            current: Punto actual
+            builder: _GeometryBuilder destino
+
+        Returns:
+            tuple: (nuevo punto actual, último punto de control)
+        """
+        if relative:
+            ends = current + np.cumsum(triples[:, 2], axis=0)
+            starts = self._segment_starts(ends, current)
+            c1 = starts + triples[:, 0]
+            c2 = starts + triples[:, 1]
+        else:
+            ends = triples[:, 2]
+            starts = self._segment_starts(ends, current)
+            c1 = triples[:, 0]
+            c2 = triples[:, 1]
+
+        builder.add_segments(SEG_CUBIC, np.stack([starts, c1, c2, ends], axis=1))
+        return ends[-1].copy(), c2[-1].copy()
+
+    def _add_quadratics(self, pairs, relative, current, builder):
+        """
+        Agrega una cadena de Bezier cuadráticas elevadas a grado 3
+
+        Args:
+            pairs: Array (k, 2, 2) con (control, fin) por segmento
+            relative: Si las coordenadas son relativas al inicio de cada segmento
+            current: Punto actual
+            builder: _GeometryBuilder destino
+
+        Returns:
+            tuple: (nuevo punto actual, punto de control cuadrático final)
+        """
+        if relative:
+            ends = current + np.cumsum(pairs[:, 1], axis=0)
+            starts = self._segment_starts(ends, current)
+            controls = starts + pairs[:, 0]
+        else:
+            ends = pairs[:, 1]
+            starts = self._segment_starts(ends, current)
+            controls = pairs[:, 0]
+
+        c1 = starts + (controls - starts) * (2.0 / 3.0)
+        c2 = ends + (controls - ends) * (2.0 / 3.0)
+        builder.add_segments(SEG_QUADRATIC, np.stack([starts, c1, c2, ends], axis=1))
+        return ends[-1].copy(), controls[-1].copy()
+
+    def _parse_arcs(self, args, relative, current, builder):
+        """
+        Parsea los argumentos de uno o más comandos de arco
+
+        Los flags large_arc y sweep pueden venir compactados ("0 01"),
+        por eso se leen carácter a carácter.
+
+        Args:
+            args: Cadena de argumentos del comando A
+            relative: Si las coordenadas son relativas
+            current: Punto actual
+            builder: _GeometryBuilder destino
+
+        Returns:
+            Array (2,) con el nuevo punto actual
+        """
+        position = 0
+        while True:
+            values = []
+            for kind in ('n', 'n', 'n', 'f', 'f', 'n', 'n'):
+                pattern = _FLAG_RE if kind == 'f' else _NUMBER_RE
+                match = _match_after_separator(pattern, args, position)
+                if match is None:
+                    return current
+                values.append(float(match.group(0)))
+                position = match.end()
+
+            rx, ry, rotation, large_arc, sweep, x, y = values
+            end = np.array([x, y]) + (current if relative else 0)
+
+            if rx == 0 or ry == 0:
+                # Un arco con radio nulo es una línea recta según la especificación SVG
+                builder.add_segments(SEG_LINE, np.array([[current, current, end, end]]))
+            else:
+                builder.add_arc(
+                    np.array([[current, current, end, end]]),
+                    (abs(rx), abs(ry), rotation, large_arc, sweep)
+                )
+            current = end
+
+
+class _GeometryBuilder:
+    """Acumula segmentos por bloques y construye la SVGGeometry final"""
+
+    def __init__(self, dtype=np.float64):
+        """
+        Inicializa los acumuladores
+
+        Args:
+            dtype: Tipo de los puntos y parámetros de arco de la geometría
+        """
+        self.dtype = dtype
+        self.type_chunks = []
+        self.point_chunks = []
+        self.path_offsets = [0]
+        self.closed = []
+        self.path_element = []
+        self.element_fills = []
+        self.arc_index = []
+        self.arc_params = []
+        self.segment_count = 0
+        self.subpath_segments = 0
+        self.matrix = None
+
+    def begin_element(self, fill, matrix):
+        """Comienza un nuevo elemento <path> con su fill y su matriz de transformación"""
+        self.finish_subpath(False)
+        self.element_fills.append(fill)
+        self.matrix = matrix
+
+    def move_to(self):
+        """Inicia un nuevo subpath"""
+        self.finish_subpath(False)
+
+    def add_segments(self, seg_type, points):
+        """Agrega un bloque de segmentos del mismo tipo"""
+        points = apply_transform(points, self.matrix)
+        self.type_chunks.append(np.full(len(points), seg_type, dtype=np.uint8))
+        self.point_chunks.append(points.astype(self.dtype, copy=False))
+        self.segment_count += len(points)
+        self.subpath_segments += len(points)
+
+    def add_arc(self, points, params):
+        """Agrega un segmento de arco con sus parámetros SVG"""
+        params = transform_arc_params(np.array([params]), self.matrix)[0]
+        if params[1] <= 1e-12 * params[0]:
+            # Una transformación degenerada aplasta el arco en una línea
+            self.add_segments(SEG_LINE, points)
+            return
+        self.arc_index.append(self.segment_count)
+        self.arc_params.append(tuple(params))
+        self.add_segments(SEG_ARC, points)
+
+    def close_subpath(self, current, subpath_start):
+        """Cierra el subpath actual agregando la línea de cierre si hace falta"""
+        if not np.array_equal(current, subpath_start):
+            self.add_segments(
+                SEG_LINE, np.array([[current, current, subpath_start, subpath_start]])
+            )
+        self.finish_subpath(True)
+
+    def finish_subpath(self, closed):
+        """Registra el subpath actual si tiene segmentos"""
+        if self.subpath_segments == 0:
+            return
+        self.path_offsets.append(self.segment_count)
+        self.closed.append(closed)
+        self.path_element.append(len(self.element_fills) - 1)
+        self.subpath_segments = 0
+
+    def build(self, width, height, view_box=None):
+        """Concatena los bloques y retorna la SVGGeometry"""
+        self.finish_subpath(False)
+
+        if self.point_chunks:
+            seg_types = np.concatenate(self.type_chunks)
+            points = np.concatenate(self.point_chunks)
+        else:
+            seg_types = np.zeros(0, dtype=np.uint8)
+            points = np.zeros((0, 4, 2), dtype=self.dtype)
+
+        return SVGGeometry(
+            seg_types=seg_types,
+            points=points,
+            path_offsets=np.array(self.path_offsets, dtype=np.int64),
+            closed=np.array(self.closed, dtype=bool),
+            path_element=np.array(self.path_element, dtype=np.int32),
+            element_fills=self.element_fills,
+            arc_index=np.array(self.arc_index, dtype=np.int64),
+            arc_params=np.array(self.arc_params, dtype=self.dtype).reshape(-1, 5),
+            width=width,
+            height=height,
+            view_box=view_box
+        )
+
+
+def parse_svg(svg_input, dtype=np.float64):
+    """
+    Parsea el SVG desde una ruta, un file-like object o su contenido
+
+    Un str se interpreta como contenido SVG si empieza con '<' (ignorando
+    espacios iniciales) y como ruta en caso contrario; bytes siempre es
+    contenido.
+
+    Args:
+        svg_input: Ruta, file-like object, str o bytes
+        dtype: Tipo de los puntos de la geometría (ver SVGPathParser.parse)
+
+    Returns:
+        SVGGeometry con todos los contornos del SVG
+    """
+    if isinstance(svg_input, (bytes, bytearray)):
+        svg_input = io.BytesIO(svg_input)
+    elif isinstance(svg_input, str) and svg_input.lstrip().startswith('<'):
+        svg_input = io.BytesIO(svg_input.encode('utf-8'))
+    return SVGPathParser().parse(svg_input, dtype)
+
+
+def _shape_path_data(tag, element):
+    """
+    Construye el atributo d equivalente a una forma básica de SVG
+
+    Sigue las reglas de la especificación: un <rect> con rx o ry usa el mismo
+    radio en ambos ejes si falta uno y los limita a la mitad del lado; las
+    formas con tamaño nulo o negativo no se dibujan; los puntos impares de
+    <polyline>/<polygon> se descartan.
+
+    Args:
+        tag: Nombre de la forma sin espacio de nombres
+        element: Elemento XML de la forma
+
+    Returns:
+        Cadena de datos del path, o None si la forma no se dibuja
+    """
+    def length(name):
+        value = _parse_length(element.get(name))
+        return 0.0 if value is None else value
+
+    if tag == 'rect':
+        x, y, w, h = length('x'), length('y'), length('width'), length('height')
+        if w <= 0 or h <= 0:
+            return None
+        rx = _parse_length(element.get('rx'))
+        ry = _parse_length(element.get('ry'))
+        rx = ry if rx is None or rx < 0 else rx
+        ry = rx if ry is None or ry < 0 else ry
+        rx = min(rx or 0.0, w / 2)
+        ry = min(ry or 0.0, h / 2)
+        if rx <= 0 or ry <= 0:
+            return f'M{x!r} {y!r} H{x + w!r} V{y + h!r} H{x!r} Z'
+        corner = f'A{rx!r} {ry!r} 0 0 1'
+        # Los lados rectos desaparecen cuando el radio llega a la mitad del lado
+        top = f'H{x + w - rx!r} ' if w > 2 * rx else ''
+        bottom = f'H{x + rx!r} ' if w > 2 * rx else ''
+        right = f'V{y + h - ry!r} ' if h > 2 * ry else ''
+        left = f'V{y + ry!r} ' if h > 2 * ry else ''
+        return (
+            f'M{x + rx!r} {y!r} {top}{corner} {x + w!r} {y + ry!r} '
+            f'{right}{corner} {x + w - rx!r} {y + h!r} '
+            f'{bottom}{corner} {x!r} {y + h - ry!r} '
+            f'{left}{corner} {x + rx!r} {y!r} Z'
+        )
+
+    if tag in ('circle', 'ellipse'):
+        cx, cy = length('cx'), length('cy')
+        if tag == 'circle':
+            rx = ry = length('r')
+        else:
+            rx, ry = length('rx'), length('ry')
+        if rx <= 0 or ry <= 0:
+            return None
+        # Dos semiarcos: un único arco con inicio igual al fin no se dibuja
+        half = f'A{rx!r} {ry!r} 0 0 1'
+        return f'M{cx + rx!r} {cy!r} {half} {cx - rx!r} {cy!r} {half} {cx + rx!r} {cy!r} Z'
+
+    if tag == 'line':
+        return f"M{length('x1')!r} {length('y1')!r} L{length('x2')!r} {length('y2')!r}"
+
+    numbers = _NUMBER_RE.findall(element.get('points') or '')
+    numbers = numbers[:len(numbers) - len(numbers) % 2]
+    if len(numbers) < 4:
+        return None
+    return 'M' + ' '.join(numbers) + (' Z' if tag == 'polygon' else '')
+
+
+def _match_after_separator(pattern, text, position):
+    """Busca el patrón tras saltar espacios y comas desde la posición dada"""
+    while position < len(text) and text[position] in ' \t\r\n,':
+        position += 1
+    return pattern.match(text, position)
+
+
+def _parse_length(value):
+    """Convierte un atributo de longitud SVG ("600", "600px") a float"""
+    if not value:
+        return None
+    match = _NUMBER_RE.match(value.strip())
+    return float(match.group(0)) if match else None
+
+
+def _parse_view_box(value):
+    """Convierte el atributo viewBox a tupla (min_x, min_y, ancho, alto)"""
+    if not value:
+        return None
+    numbers = [float(n) for n in _NUMBER_RE.findall(value)]
+    if len(numbers) != 4 or numbers[2] <= 0 or numbers[3] <= 0:
+        return None
+    return tuple(numbers)
+
+
+def geometry_bounds(geometry, chunk_size=65536):
+    """
+    Calcula la caja envolvente exacta de la geometría
+
+    Los extremos de cada Bezier se obtienen de las raíces de su derivada
+    (una cuadrática por eje) y los de cada arco de los ángulos donde la
+    tangente de la elipse es horizontal o vertical. Se procesa por bloques
+    de tamaño fijo, así que la memoria temporal no depende del número de
+    segmentos.
+
+    Args:
+        geometry: SVGGeometry a medir
+        chunk_size: Segmentos procesados por bloque
+
+    Returns:
+        Array (2, 2) con [[min_x, min_y], [max_x, max_y]], o None si no hay segmentos
+    """
+    if geometry.num_segments == 0:
+        return None
+
+    lower = np.full(2, np.inf)
+    upper = np.full(2, -np.inf)
+
+    for start in range(0, geometry.num_segments, chunk_size):
+        points = geometry.points[start:start + chunk_size]
+        extrema = _cubic_extrema(points)
+        lower = np.fmin(lower, np.fmin.reduce(extrema.reshape(-1, 2)))
+        upper = np.fmax(upper, np.fmax.reduce(extrema.reshape(-1, 2)))
+
+    for start in range(0, len(geometry.arc_index), chunk_size):
+        index = geometry.arc_index[start:start + chunk_size]
+        extrema = _arc_extrema(
+            geometry.points[index, 0], geometry.points[index, 3],
+            geometry.arc_params[start:start + chunk_size]
+        )
+        lower = np.fmin(lower, np.fmin.reduce(extrema.reshape(-1, 2)))
+        upper = np.fmax(upper, np.fmax.reduce(extrema.reshape(-1, 2)))
+
+    return np.stack([lower, upper])
+
+
+def _cubic_extrema(points):
+    """
+    Puntos candidatos a extremo de cada Bezier cúbica
+
+    Args:
+        points: Array (N, 4, 2) de puntos de control
+
+    Returns:
+        Array (N, 6, 2): los dos extremos del segmento y, por eje, la curva
+        evaluada en las dos raíces de la derivada (acotadas a [0, 1])
+    """
+    p0, p1, p2, p3 = points[:, 0], points[:, 1], points[:, 2], points[:, 3]
+
+    # Derivada / 3 = a t^2 + b t + c, por eje
+    a = -p0 + 3 * p1 - 3 * p2 + p3
+    b = 2 * (p0 - 2 * p1 + p2)
+    c = p1 - p0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(b * b - 4 * a * c, 0.0))
+        quadratic = np.abs(a) > 1e-12
+        t1 = np.where(quadratic, (-b + root) / (2 * a), -c / b)
+        t2 = np.where(quadratic, (-b - root) / (2 * a), -c / b)
+    # Raíces fuera del segmento (o inexistentes) se evalúan en un extremo
+    t = np.nan_to_num(np.stack([t1, t2], axis=1), nan=0.0, posinf=0.0, neginf=0.0)
+    t = np.clip(t, 0.0, 1.0)[..., None]
+
+    mt = 1.0 - t
+    curve = (
+        mt ** 3 * points[:, None, 0, None, :] + 3 * mt ** 2 * t * points[:, None, 1, None, :]
+        + 3 * mt * t ** 2 * points[:, None, 2, None, :] + t ** 3 * points[:, None, 3, None, :]
+    )
+    # curve: (N, 2 raíces, 2 ejes de la raíz, 2 coordenadas)
+    return np.concatenate([points[:, [0, 3]], curve.reshape(len(points), 4, 2)], axis=1)
+
+
+def _arc_extrema(starts, ends, arc_params):
+    """
+    Puntos candidatos a extremo de cada arco
+
+    Args:
+        starts: Array (M, 2) con el punto inicial de cada arco
+        ends: Array (M, 2) con el punto final de cada arco
+        arc_params: Array (M, 5) con los parámetros SVG de cada arco
+
+    Returns:
+        Array (M, 6, 2): inicio, fin y los cuatro puntos de tangente
+        horizontal o vertical (reemplazados por el inicio si caen fuera del arco)
+    """
+    centers, rx, ry, phi, theta1, delta = arc_center_parameters(starts, ends, arc_params)
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+
+    # dx/dθ = 0 y dy/dθ = 0, más sus opuestos
+    theta_x = np.arctan2(-ry * sin_phi, rx * cos_phi)
+    theta_y = np.arctan2(ry * cos_phi, rx * sin_phi)
+    theta = np.stack([theta_x, theta_x + np.pi, theta_y, theta_y + np.pi], axis=1)
+
+    # Recorrido angular desde el inicio en el sentido del barrido
+    direction = np.where(delta < 0, -1.0, 1.0)[:, None]
+    travel = np.mod((theta - theta1[:, None]) * direction, 2 * np.pi)
+    theta = np.where(travel <= np.abs(delta)[:, None], theta, theta1[:, None])
+
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    x = centers[:, 0, None] + rx[:, None] * cos_phi[:, None] * cos_t - ry[:, None] * sin_phi[:, None] * sin_t
+    y = centers[:, 1, None] + rx[:, None] * sin_phi[:, None] * cos_t + ry[:, None] * cos_phi[:, None] * sin_t
+    return np.concatenate([starts[:, None], ends[:, None], np.stack([x, y], axis=-1)], axis=1)
+
+
+def arc_center_parameters(starts, ends, arc_params):
+    """
+    Convierte arcos SVG de parametrización por extremos a parametrización central
+
+    Implementa la conversión de la especificación SVG (apéndice F.6.5) para
+    todos los arcos a la vez.
+
+    Args:
+        starts: Array (M, 2) con el punto inicial de cada arco
+        ends: Array (M, 2) con el punto final de cada arco
+        arc_params: Array (M, 5) con (rx, ry, rotación en grados, large_arc, sweep)
+
+    Returns:
+        tuple: (centros (M, 2), rx (M,), ry (M,), rotación en radianes (M,),
+                ángulo inicial (M,), barrido angular (M,))
+    """
+    rx = np.abs(arc_params[:, 0])
+    ry = np.abs(arc_params[:, 1])
+    phi = np.radians(arc_params[:, 2])
+    large_arc = arc_params[:, 3] != 0
+    sweep = arc_params[:, 4] != 0
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+
+    half = (starts - ends) / 2.0
+    x1p = cos_phi * half[:, 0] + sin_phi * half[:, 1]
+    y1p = -sin_phi * half[:, 0] + cos_phi * half[:, 1]
+
+    # Escalar radios insuficientes para que el arco sea posible
+    scale = np.sqrt(np.maximum(1.0, x1p ** 2 / rx ** 2 + y1p ** 2 / ry ** 2))
+    rx = rx * scale
+    ry = ry * scale
+
+    numerator = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    denominator = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coef = np.sqrt(np.maximum(0.0, np.where(denominator > 0, numerator / denominator, 0.0)))
+    coef = np.where(large_arc == sweep, -coef, coef)
+    cxp = coef * rx * y1p / ry
+    cyp = -coef * ry * x1p / rx
+
+    mid = (starts + ends) / 2.0
+    centers = np.column_stack([
+        cos_phi * cxp - sin_phi * cyp + mid[:, 0],
+        sin_phi * cxp + cos_phi * cyp + mid[:, 1]
+    ])
+
+    theta1 = np.arctan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    theta2 = np.arctan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    delta = theta2 - theta1
+    delta = np.where(~sweep & (delta > 0), delta - 2 * np.pi, delta)
+    delta = np.where(sweep & (delta < 0), delta + 2 * np.pi, delta)
+
+    return centers, rx, ry, phi, theta1, delta
+
+
+def arc_points(centers, rx, ry, phi, theta1, delta, t):
+    """
+    Evalúa arcos en parametrización central para los parámetros t dados
+
+    Args:
+        centers, rx, ry, phi, theta1, delta: Salida de arc_center_parameters
+        t: Array (K,) de parámetros en [0, 1]
+
+    Returns:
+        Array (M, K, 2) con los puntos de cada arco
+    """
+    theta = theta1[:, None] + delta[:, None] * t[None, :]
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    cos_phi = np.cos(phi)[:, None]
+    sin_phi = np.sin(phi)[:, None]
+    x = centers[:, 0, None] + rx[:, None] * cos_phi * cos_t - ry[:, None] * sin_phi * sin_t
+    y = centers[:, 1, None] + rx[:, None] * sin_phi * cos_t + ry[:, None] * cos_phi * sin_t
+    return np.stack([x, y], axis=-1)
+
+
+def cubic_basis(t):
+    """
+    Matriz de bases de Bernstein cúbicas
+
+    Args:
+        t: Array (K,) de parámetros en [0, 1]
+
+    Returns:
+        Array (K, 4) tal que basis @ puntos_de_control da los puntos de la curva
+    """
+    mt = 1.0 - t
+    return np.column_stack([mt ** 3, 3 * mt ** 2 * t, 3 * mt * t ** 2, t ** 3])
@@ -0,0 +1,165 @@
+"""
+Módulo de transformaciones SVG
+Parsea el atributo transform y aplica matrices afines a bloques completos de puntos
+"""
+
+import re
+
+import numpy as np
+
+
+_TRANSFORM_RE = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+# Número de argumentos aceptados por cada función de transformación
+_ARGUMENT_COUNTS = {
+    'matrix': (6,),
+    'translate': (1, 2),
+    'scale': (1, 2),
+    'rotate': (1, 3),
+    'skewX': (1,),
+    'skewY': (1,)
+}
+
+
+def parse_transform(transform_str):
+    """
+    Convierte un atributo transform SVG en una matriz afín 3x3
+
+    Soporta matrix, translate, scale, rotate (con centro opcional), skewX y
+    skewY. Las funciones de una lista se componen de izquierda a derecha,
+    como indica la especificación ("A B" aplica primero B y luego A).
+
+    Args:
+        transform_str: String con la transformación (ej: "translate(10) scale(2, 1)")
+
+    Returns:
+        Array (3, 3) con la matriz, o None si no hay transformación (identidad)
+    """
+    if not transform_str:
+        return None
+
+    matrix = None
+    for name, args in _TRANSFORM_RE.findall(transform_str):
+        values = [float(value) for value in _NUMBER_RE.findall(args)]
+        if len(values) not in _ARGUMENT_COUNTS[name]:
+            # Una función con argumentos inválidos invalida todo el atributo
+            return None
+        matrix = compose(matrix, _function_matrix(name, values))
+
+    return matrix
+
+
+def _function_matrix(name, values):
+    """
+    Matriz 3x3 de una función de transformación individual
+
+    Args:
+        name: Nombre de la función (matrix, translate, ...)
+        values: Lista de argumentos numéricos ya validados
+
+    Returns:
+        Array (3, 3)
+    """
+    matrix = np.eye(3)
+
+    if name == 'matrix':
+        a, b, c, d, e, f = values
+        matrix[:2] = [[a, c, e], [b, d, f]]
+    elif name == 'translate':
+        matrix[0, 2] = values[0]
+        matrix[1, 2] = values[1] if len(values) > 1 else 0.0
+    elif name == 'scale':
+        matrix[0, 0] = values[0]
+        matrix[1, 1] = values[1] if len(values) > 1 else values[0]
+    elif name == 'rotate':
+        angle = np.radians(values[0])
+        cos_a, sin_a = np.cos(angle), np.sin(angle)
+        matrix[:2, :2] = [[cos_a, -sin_a], [sin_a, cos_a]]
+        if len(values) == 3:
+            # rotate(a, cx, cy) = translate(cx, cy) rotate(a) translate(-cx, -cy)
+            center = np.array(values[1:])
+            matrix[:2, 2] = center - matrix[:2, :2] @ center
+    elif name == 'skewX':
+        matrix[0, 1] = np.tan(np.radians(values[0]))
+    elif name == 'skewY':
+        matrix[1, 0] = np.tan(np.radians(values[0]))
+
+    return matrix
+
+
+def compose(parent, child):
+    """
+    Compone dos transformaciones (la hija se aplica primero)
+
+    Args:
+        parent: Matriz (3, 3) exterior o None (identidad)
+        child: Matriz (3, 3) interior o None (identidad)
+
+    Returns:
+        Array (3, 3) con parent @ child, o None si ambas son la identidad
+    """
+    if parent is None:
+        return child
+    if child is None:
+        return parent
+    return parent @ child
+
+
+def apply_transform(points, matrix):
+    """
+    Aplica una matriz afín a un array de puntos de cualquier forma
+
+    Args:
+        points: Array (..., 2) de puntos
+        matrix: Matriz (3, 3) o None (identidad)
+
+    Returns:
+        Array (..., 2) con los puntos transformados
+    """
+    if matrix is None:
+        return points
+    return points @ matrix[:2, :2].T + matrix[:2, 2]
+
+
+def transform_arc_params(arc_params, matrix):
+    """
+    Transforma los parámetros SVG de arcos elípticos
+
+    La elipse de cada arco es la imagen del círculo unidad por
+    L · R(rotación) · diag(rx, ry), donde L es la parte lineal de la matriz;
+    su descomposición en valores singulares da los nuevos radios y la nueva
+    rotación. Una matriz con determinante negativo invierte el sentido de
+    barrido.
+
+    Args:
+        arc_params: Array (M, 5) con (rx, ry, rotación en grados, large_arc, sweep)
+        matrix: Matriz (3, 3) o None (identidad)
+
+    Returns:
+        Array (M, 5) con los parámetros transformados
+    """
+    if matrix is None:
+        return arc_params
+
+    arc_params = np.asarray(arc_params, dtype=np.float64)
+    linear = matrix[:2, :2]
+    phi = np.radians(arc_params[:, 2])
+    cos_phi, sin_phi = np.cos(phi), np.sin(phi)
+
+    # Ejes de cada elipse como columnas: R(phi) · diag(rx, ry)
+    axes = np.empty((len(arc_params), 2, 2))
+    axes[:, 0, 0] = cos_phi * arc_params[:, 0]
+    axes[:, 1, 0] = sin_phi * arc_params[:, 0]
+    axes[:, 0, 1] = -sin_phi * arc_params[:, 1]
+    axes[:, 1, 1] = cos_phi * arc_params[:, 1]
+
+    u, radii, _ = np.linalg.svd(linear @ axes)
+
+    transformed = arc_params.copy()
+    transformed[:, 0] = radii[:, 0]
+    transformed[:, 1] = radii[:, 1]
+    transformed[:, 2] = np.degrees(np.arctan2(u[:, 1, 0], u[:, 0, 0]))
+    if np.linalg.det(linear) < 0:
+        transformed[:, 4] = 1.0 - transformed[:, 4]
+    return transformed
@@ -0,0 +1,382 @@
+"""
+Módulo de ordenamiento de trayectorias
+Ordena contornos y cadenas abiertas para reducir el recorrido en vacío de la máquina
+"""
+
+import math
+import time
+
+import numpy as np
+
+from .nesting import contour_parents, signed_area
+
+
+class ToolpathOptimizer:
+    """
+    Ordena las entidades de corte para minimizar los movimientos rápidos
+
+    Construye un recorrido de vecino más cercano sobre una grilla espacial,
+    lo mejora con 2-opt mientras quede presupuesto de tiempo y elige el
+    punto de entrada de cada contorno cerrado. Opcionalmente respeta que
+    todo lo que está dentro de un contorno se corte antes que el contorno.
+    """
+
+    def __init__(self, time_budget=1.0, inner_first=True, loop_direction=None, origin=(0.0, 0.0)):
+        """
+        Inicializa el optimizador de trayectorias
+
+        Args:
+            time_budget: Segundos máximos dedicados a la mejora 2-opt
+            inner_first: Si True, los contornos interiores (y las cadenas dentro
+                de un contorno) se cortan antes que el contorno que los contiene
+            loop_direction: Sentido de los contornos cerrados: 'ccw' (antihorario),
+                'cw' (horario) o None para conservar el sentido original
+            origin: Posición inicial de la herramienta
+        """
+        self.time_budget = time_budget
+        self.inner_first = inner_first
+        self.loop_direction = loop_direction
+        self.origin = origin
+
+    def optimize(self, paths, parents=None):
+        """
+        Calcula el orden de corte de una lista de paths
+
+        Args:
+            paths: Lista de dicts con points (K, 2), closed y opcionalmente
+                outline (M, 2). En una cadena abierta solo importan el primer y
+                el último punto; en un contorno cerrado cada punto (sin repetir
+                el primero) es una posible entrada. outline es el polígono usado
+                para el anidamiento y el sentido de giro (por defecto points)
+            parents: Contorno padre de cada path ya calculado (ver
+                contour_parents); si es None se calcula cuando inner_first
+
+        Returns:
+            tuple: (orden: lista de (índice del path, punto de entrada, invertido),
+                    reporte: dict con travel_before, travel_after y seconds)
+        """
+        started = time.perf_counter()
+        count = len(paths)
+        if count == 0:
+            report = {'travel_before': 0.0, 'travel_after': 0.0, 'seconds': 0.0}
+            return [], report
+
+        closed = np.array([bool(path['closed']) for path in paths])
+        firsts = np.array([path['points'][0] for path in paths], dtype=np.float64)
+        lasts = np.array([
+            path['points'][0] if path['closed'] else path['points'][-1] for path in paths
+        ], dtype=np.float64)
+        origin = np.asarray(self.origin, dtype=np.float64)
+        travel_before = _travel(origin, firsts, lasts)
+
+        if not self.inner_first:
+            parents = np.full(count, -1)
+        elif parents is None:
+            parents = self._containment(paths)
+        tour, entries, flipped = self._nearest_neighbour(paths, closed, parents, origin)
+
+        # Posición 0 = origen de la herramienta (fijo)
+        entry = np.vstack([origin, np.array([paths[i]['points'][e] for i, e in zip(tour, entries)])])
+        exit = entry.copy()
+        for position, (index, reverse) in enumerate(zip(tour, flipped), start=1):
+            if not closed[index]:
+                points = paths[index]['points']
+                entry[position], exit[position] = (points[-1], points[0]) if reverse else (points[0], points[-1])
+
+        tour = np.array(tour, dtype=np.int64)
+        entries = np.array(entries, dtype=np.int64)
+        flipped = np.array(flipped, dtype=bool)
+        deadline = started + self.time_budget
+
+        while True:
+            improved = _two_opt(tour, entry, exit, entries, flipped, parents, deadline)
+            improved |= self._refine_entries(paths, closed, tour, entry, exit, entries)
+            if not improved or time.perf_counter() > deadline:
+                break
+
+        order = []
+        for position, index in enumerate(tour.tolist(), start=1):
+            if closed[index]:
+                reverse = self._reverse_loop(paths[index])
+                order.append((index, int(entries[position - 1]), reverse))
+            else:
+                order.append((index, 0, bool(flipped[position - 1])))
+
+        report = {
+            'travel_before': travel_before,
+            'travel_after': float(np.hypot(*(entry[1:] - exit[:-1]).T).sum()),
+            'seconds': time.perf_counter() - started
+        }
+        return order, report
+
+    def _containment(self, paths):
+        """
+        Contorno cerrado más chico que contiene a cada path
+
+        Args:
+            paths: Lista de paths (ver optimize)
+
+        Returns:
+            Array int64 (N,) con el índice del contorno padre o -1
+        """
+        outlines = [path.get('outline', path['points']) for path in paths]
+        return contour_parents(outlines, [path['closed'] for path in paths])
+
+    def _nearest_neighbour(self, paths, closed, parents, origin):
+        """
+        Recorrido inicial: siempre al punto de entrada libre más cercano
+
+        Los puntos candidatos (extremos de cadenas y vértices de contornos) se
+        indexan en una grilla; un contorno recién entra a la grilla cuando ya
+        se visitó todo lo que contiene.
+
+        Args:
+            paths: Lista de paths (ver optimize)
+            closed: Array bool (N,)
+            parents: Contorno padre de cada path (-1 = ninguno)
+            origin: Posición inicial (2,)
+
+        Returns:
+            tuple: (índices en orden de visita, punto de entrada de cada uno,
+                    si cada cadena abierta se recorre invertida)
+        """
+        candidates = [
+            np.asarray(path['points'], dtype=np.float64) if path['closed']
+            else np.asarray([path['points'][0], path['points'][-1]], dtype=np.float64)
+            for path in paths
+        ]
+        grid = _PointGrid(candidates)
+
+        pending = np.bincount(parents[parents >= 0], minlength=len(paths))
+        for index in np.flatnonzero(pending == 0):
+            grid.insert(int(index))
+
+        tour, entries, flipped = [], [], []
+        x, y = origin.tolist()
+        for _ in range(len(paths)):
+            index, vertex = grid.nearest(x, y)
+            grid.remove(index)
+            points = paths[index]['points']
+            tour.append(index)
+
+            if closed[index]:
+                entries.append(vertex)
+                flipped.append(False)
+                x, y = candidates[index][vertex].tolist()
+            else:
+                reverse = vertex == 1
+                entries.append(len(points) - 1 if reverse else 0)
+                flipped.append(reverse)
+                x, y = candidates[index][1 - vertex].tolist()
+
+            parent = parents[index]
+            if parent >= 0:
+                pending[parent] -= 1
+                if pending[parent] == 0:
+                    grid.insert(int(parent))
+
+        return tour, entries, flipped
+
+    def _refine_entries(self, paths, closed, tour, entry, exit, entries):
+        """
+        Elige el punto de entrada de cada contorno según sus vecinos en el recorrido
+
+        Se elige el vértice que minimiza la distancia desde la salida anterior
+        más la distancia hasta la entrada siguiente.
+
+        Args:
+            paths: Lista de paths (ver optimize)
+            closed: Array bool (N,)
+            tour: Índices en orden de visita
+            entry, exit: Arrays (N + 1, 2) de entrada y salida por posición (se actualizan)
+            entries: Punto de entrada de cada posición (se actualiza)
+
+        Returns:
+            bool: True si el recorrido mejoró
+        """
+        improved = False
+        last = len(tour)
+        for position in range(1, last + 1):
+            index = tour[position - 1]
+            if not closed[index]:
+                continue
+            points = paths[index]['points']
+            cost = np.hypot(*(points - exit[position - 1]).T)
+            if position < last:
+                cost = cost + np.hypot(*(points - entry[position + 1]).T)
+            best = int(np.argmin(cost))
+            if cost[best] < cost[entries[position - 1]] - 1e-9:
+                entries[position - 1] = best
+                entry[position] = exit[position] = points[best]
+                improved = True
+        return improved
+
+    def _reverse_loop(self, path):
+        """Indica si un contorno debe recorrerse invertido para respetar loop_direction"""
+        if self.loop_direction is None:
+            return False
+        area = signed_area(np.asarray(path.get('outline', path['points']), dtype=np.float64))
+        return area < 0 if self.loop_direction == 'ccw' else area > 0
+
+
+class _PointGrid:
+    """Grilla de puntos candidatos agrupados por path, con inserción y borrado por path"""
+
+    # Anillos de celdas a revisar antes de pasar a búsqueda exhaustiva
+    MAX_RINGS = 6
+
+    def __init__(self, candidates):
+        """
+        Args:
+            candidates: Lista de arrays (K, 2) con los puntos de cada path
+        """
+        self.offsets = np.zeros(len(candidates) + 1, dtype=np.int64)
+        np.cumsum([len(points) for points in candidates], out=self.offsets[1:])
+        self.points = np.concatenate(candidates)
+        self.owner = np.repeat(np.arange(len(candidates)), np.diff(self.offsets))
+        self.alive = np.zeros(len(self.points), dtype=bool)
+
+        # Celdas con ~2 puntos en promedio sobre la caja envolvente
+        extent = np.ptp(self.points, axis=0)
+        area = max(float(extent[0] * extent[1]), float(max(extent.max(), 1e-9)) ** 2 / len(self.points))
+        self.cell_size = math.sqrt(2 * area / len(self.points)) or 1.0
+        self.cells_of = [
+            tuple(cell) for cell in np.floor(self.points / self.cell_size).astype(np.int64).tolist()
+        ]
+        self.coords = self.points.tolist()
+        self.cells = {}
+
+    def insert(self, index):
+        """Agrega los puntos de un path"""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        self.alive[start:end] = True
+        for point in range(start, end):
+            self.cells.setdefault(self.cells_of[point], []).append(point)
+
+    def remove(self, index):
+        """Quita los puntos de un path"""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        self.alive[start:end] = False
+        for point in range(start, end):
+            cell = self.cells_of[point]
+            members = self.cells[cell]
+            members.remove(point)
+            if not members:
+                del self.cells[cell]
+
+    def nearest(self, x, y):
+        """
+        Punto vivo más cercano a (x, y)
+
+        Returns:
+            tuple: (índice del path, posición del punto dentro del path)
+        """
+        size = self.cell_size
+        cx, cy = math.floor(x / size), math.floor(y / size)
+        best, best_distance = -1, math.inf
+
+        for ring in range(self.MAX_RINGS + 1):
+            for cell in _ring_cells(cx, cy, ring):
+                for point in self.cells.get(cell, ()):
+                    px, py = self.coords[point]
+                    distance = math.hypot(px - x, py - y)
+                    if distance < best_distance:
+                        best, best_distance = point, distance
+            # Los puntos de anillos siguientes están a más de ring * size
+            if best >= 0 and best_distance <= ring * size:
+                break
+        else:
+            # Zona vacía alrededor de la posición: búsqueda exhaustiva vectorizada
+            alive = np.flatnonzero(self.alive)
+            distances = np.hypot(self.points[alive, 0] - x, self.points[alive, 1] - y)
+            best = int(alive[np.argmin(distances)])
+
+        index = int(self.owner[best])
+        return index, best - int(self.offsets[index])
+
+
+def _ring_cells(cx, cy, ring):
+    """Celdas a distancia de Chebyshev exacta ring de (cx, cy)"""
+    if ring == 0:
+        yield cx, cy
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cy - ring
+        yield cx + dx, cy + ring
+    for dy in range(-ring + 1, ring):
+        yield cx - ring, cy + dy
+        yield cx + ring, cy + dy
+
+
+def _two_opt(tour, entry, exit, entries, flipped, parents, deadline):
+    """
+    Mejora el recorrido invirtiendo tramos (2-opt) hasta no encontrar mejoras
+
+    Invertir el tramo i..j solo cambia las uniones (i - 1, i) y (j, j + 1):
+    cada cadena del tramo se recorre al revés y los contornos no cambian. Para
+    cada i se evalúan todos los j de una vez y se aplica la mejor inversión.
+    Con anidamiento, un tramo no puede contener a un path y a su contorno padre.
+
+    Args:
+        tour: Array int64 (N,) de índices en orden de visita (se actualiza)
+        entry, exit: Arrays (N + 1, 2) de entrada y salida por posición (se actualizan)
+        entries: Array int64 (N,) con el punto de entrada de cada contorno (se actualiza)
+        flipped: Array bool (N,) de cadenas invertidas (se actualiza)
+        parents: Contorno padre de cada path (-1 = ninguno)
+        deadline: Instante (perf_counter) en que se detiene la búsqueda
+
+    Returns:
+        bool: True si el recorrido mejoró
+    """
+    count = len(tour)
+    has_parent = parents >= 0
+    improved = False
+
+    def precedence_limits():
+        # Primera posición desde cada i en la que aparece el padre de algún path
+        position = np.empty(count, dtype=np.int64)
+        position[tour] = np.arange(1, count + 1)
+        parent_position = np.where(has_parent[tour], position[parents[tour]], count + 1)
+        return np.minimum.accumulate(parent_position[::-1])[::-1]
+
+    limits = precedence_limits()
+    changed = True
+    while changed:
+        changed = False
+        for i in range(1, count + 1):
+            if time.perf_counter() > deadline:
+                return improved
+            last = min(count, int(limits[i - 1]) - 1)
+            if last < i:
+                continue
+
+            a, b = exit[i - 1], entry[i]
+            c = exit[i:last + 1]
+            removed = np.hypot(*(a - b))
+            added = np.hypot(*(c - a).T)
+            # Uniones (j, j + 1); la última posición no tiene siguiente
+            following = entry[i + 1:last + 2]
+            tail = len(following)
+            gain = removed - added
+            gain[:tail] += np.hypot(*(c[:tail] - following).T) - np.hypot(*(following - b).T)
+
+            j = int(np.argmax(gain))
+            if gain[j] <= 1e-9 * (1.0 + removed):
+                continue
+            j += i
+
+            # Invertir el tramo i..j: entradas y salidas se intercambian
+            entry[i:j + 1], exit[i:j + 1] = exit[j:i - 1:-1].copy(), entry[j:i - 1:-1].copy()
+            tour[i - 1:j] = tour[i - 1:j][::-1].copy()
+            entries[i - 1:j] = entries[i - 1:j][::-1].copy()
+            flipped[i - 1:j] = ~flipped[i - 1:j][::-1]
+            limits = precedence_limits()
+            changed = improved = True
+
+    return improved
+
+
+def _travel(origin, firsts, lasts):
+    """Recorrido en vacío total visitando los paths en orden desde el origen"""
+    starts = np.vstack([origin, lasts[:-1]])
+    return float(np.hypot(*(firsts - starts).T).sum())
@@ -3,11 +3,23 @@ Módulo de vectorización de imágenes
 Convierte imágenes raster a formato SVG vectorizado
 """
 
+import io
+
+import numpy as np
 import vtracer
+from PIL import Image
+
+from .contour_trace import trace_mask
+from .svg_optimizer import SVGOptimizer
+from .svg_parser import parse_svg
+
+
+# Motores de vectorización: VTracer o contornos de OpenCV (solo binario)
+VECTORIZER_BACKENDS = ('vtracer', 'opencv')
 
 
 class ImageVectorizer:
-    """Convierte imágenes a formato SVG usando VTracer"""
+    """Convierte imágenes a formato SVG usando VTracer o los contornos de OpenCV"""
 
     def __init__(
         self,
@@ -21,7 +33,9 @@ class ImageVectorizer:
         color_precision=6,
         layer_difference=16,
         max_iterations=10,
-        hierarchical="stacked"
+        hierarchical="stacked",
+        backend="vtracer",
+        contour_epsilon=1.0
     ):
         """
         Inicializa el vectorizador
@@ -38,7 +52,15 @@ class ImageVectorizer:
             layer_difference: Diferencia de color entre capas de gradiente (1-255, solo para modo color)
             max_iterations: Iteraciones máximas de algoritmos internos (1-20)
             hierarchical: Estrategia de clustering ("stacked" o "cutout", solo para modo color)
+            backend: Motor de vectorización ("vtracer" u "opencv"). OpenCV traza
+                los contornos de la imagen binaria directamente a geometría (usa
+                filter_speckle, corner_threshold, mode y path_precision)
+            contour_epsilon: Desviación máxima (px) al simplificar los contornos (solo opencv)
         """
+        if backend not in VECTORIZER_BACKENDS:
+            raise ValueError(f"Motor de vectorización desconocido: {backend}")
+        if backend == "opencv" and color_mode != "binary":
+            raise ValueError("El motor opencv solo vectoriza en modo binary")
         self.color_mode = color_mode
         self.filter_speckle = filter_speckle
         self.corner_threshold = corner_threshold
@@ -50,6 +72,8 @@ class ImageVectorizer:
         self.layer_difference = layer_difference
         self.max_iterations = max_iterations
         self.hierarchical = hierarchical
+        self.backend = backend
+        self.contour_epsilon = contour_epsilon
 
     def convert(self, input_path, output_path):
         """
@@ -62,6 +86,17 @@ class ImageVectorizer:
         Returns:
             tuple: (success: bool, message: str)
         """
+        if self.backend == "opencv":
+            try:
+                success, geometry = self.trace(Image.open(input_path))
+                if not success:
+                    return False, geometry
+                with open(output_path, 'w', encoding='utf-8') as file:
+                    file.write(self.to_svg(geometry))
+                return True, "SVG generado exitosamente"
+            except Exception as e:
+                return False, f"Error al generar SVG: {str(e)}"
+
         try:
             vtracer.convert_image_to_svg_py(
                 image_path=input_path,
@@ -82,6 +117,95 @@ class ImageVectorizer:
         except Exception as e:
             return False, f"Error al generar SVG: {str(e)}"
 
+    def convert_bytes(self, image_bytes, img_format="png"):
+        """
+        Convierte una imagen codificada en memoria a SVG sin usar disco
+
+        Args:
+            image_bytes: Bytes de la imagen (PNG, JPG, ...)
+            img_format: Formato de la imagen codificada
+
+        Returns:
+            tuple: (success: bool, svg o mensaje de error: str)
+        """
+        if self.backend == "opencv":
+            try:
+                success, geometry = self.trace(Image.open(io.BytesIO(image_bytes)))
+                return (True, self.to_svg(geometry)) if success else (False, geometry)
+            except Exception as e:
+                return False, f"Error al generar SVG: {str(e)}"
+
+        try:
+            svg = vtracer.convert_raw_image_to_svg(
+                image_bytes,
+                img_format=img_format,
+                colormode=self.color_mode,
+                hierarchical=self.hierarchical,
+                mode=self.mode,
+                filter_speckle=self.filter_speckle,
+                color_precision=self.color_precision,
+                layer_difference=self.layer_difference,
+                corner_threshold=self.corner_threshold,
+                length_threshold=self.length_threshold,
+                max_iterations=self.max_iterations,
+                splice_threshold=self.splice_threshold,
+                path_precision=self.path_precision
+            )
+            return True, svg
+        except Exception as e:
+            return False, f"Error al generar SVG: {str(e)}"
+
+    def trace(self, image):
+        """
+        Vectoriza una imagen directamente a geometría
+
+        Con el motor opencv la imagen se umbraliza como en VTracer (canal rojo
+        < 128 es dibujo) y se trazan sus contornos sin generar texto SVG; con
+        vtracer se vectoriza en memoria y se parsea el SVG resultante.
+
+        Args:
+            image: Imagen PIL
+
+        Returns:
+            tuple: (success: bool, SVGGeometry o mensaje de error: str)
+        """
+        if self.backend == "vtracer":
+            png = io.BytesIO()
+            image.save(png, format='PNG')
+            success, svg = self.convert_bytes(png.getvalue(), img_format='png')
+            if not success:
+                return False, svg
+            try:
+                return True, parse_svg(svg)
+            except Exception as e:
+                return False, f"Error al leer el SVG: {str(e)}"
+
+        try:
+            mask = np.asarray(image.convert('RGB'))[..., 0] < 128
+            geometry = trace_mask(
+                mask,
+                epsilon=self.contour_epsilon,
+                min_area=self.filter_speckle ** 2,
+                curves=self.mode == "spline",
+                corner_threshold=self.corner_threshold
+            )
+            return True, geometry
+        except Exception as e:
+            return False, f"Error al trazar contornos: {str(e)}"
+
+    def to_svg(self, geometry):
+        """
+        Escribe una geometría trazada como SVG (un path por elemento, coordenadas absolutas)
+
+        Args:
+            geometry: SVGGeometry retornada por trace
+
+        Returns:
+            str: Contenido SVG
+        """
+        optimizer = SVGOptimizer(precision=min(self.path_precision, 8), relative=False, merge_paths=False)
+        return optimizer.serialize(geometry)[0]
+
     def get_config(self):
         """Retorna la configuración actual del vectorizador"""
         return {
@@ -95,5 +219,7 @@ class ImageVectorizer:
             "color_precision": self.color_precision,
             "layer_difference": self.layer_difference,
             "max_iterations": self.max_iterations,
-            "hierarchical": self.hierarchical
+            "hierarchical": self.hierarchical,
+            "backend": self.backend,
+            "contour_epsilon": self.contour_epsilon
         }
@@ -364,6 +364,13 @@ class MainView:
                 file_name="vectorizado.dxf",
                 mime="application/dxf"
             )
+            if results.get('gcode'):
+                st.download_button(
+                    label="⬇️ Descargar G-code",
+                    data=results['gcode'],
+                    file_name="vectorizado.gcode",
+                    mime="text/plain"
+                )
 
     def render_main_viewer(self, uploaded_file, results, config):
         """
@@ -407,7 +414,7 @@ class MainView:
         elif content_to_render == 'svg':
             self._render_svg_result(results['svg'])
         elif content_to_render == 'dxf':
-            self._render_dxf_result(results['dxf'], results.get('svg'))
+            self._render_dxf_result(results['dxf'], results.get('svg'), results.get('gcode'))
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -459,8 +466,8 @@ class MainView:
             mime="image/svg+xml"
         )
 
-    def _render_dxf_result(self, dxf_content, svg_content=None):
-        """Renderiza el resultado DXF"""
+    def _render_dxf_result(self, dxf_content, svg_content=None, gcode_content=None):
+        """Renderiza el resultado DXF (y la descarga del G-code si se generó)"""
         import streamlit.components.v1 as components
         
         # Usar SVG modificado como preview visual
@@ -488,6 +495,13 @@ class MainView:
             file_name="vectorizado.dxf",
             mime="application/dxf"
         )
+        if gcode_content:
+            st.download_button(
+                label="⬇️ Descargar G-code",
+                data=gcode_content,
+                file_name="vectorizado.gcode",
+                mime="text/plain"
+            )
 
     def show_processing_spinner(self, message="Procesando imagen..."):
         return st.spinner(message)
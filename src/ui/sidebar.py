@@ -3,6 +3,8 @@ Módulo de la barra lateral de configuración
 Maneja todos los controles y configuraciones de la UI
 """
 
+import os
+
 import streamlit as st
 
 
@@ -27,9 +29,50 @@ class Sidebar:
         self.layer_difference = 16
         self.max_iterations = 10
         self.hierarchical = "stacked"
+        self.vectorizer_backend = "VTracer"
+        self.contour_epsilon = 1.0
         self.bezier_subdivisions = 30
+        self.use_adaptive_flattening = True
+        self.flatten_tolerance = 0.05
         self.use_splines = True
         self.tolerance = 0.1
+        self.use_streaming = False
+        self.use_float32 = False
+        self.dxf_format = "ASCII"
+        self.remove_duplicates = False
+        self.workers = 1
+        self.dxf_units = "Sin unidades (píxeles)"
+        self.dpi = 96.0
+        self.use_coordinate_grid = False
+        self.coordinate_grid = 0.001
+        self.use_size_limit = False
+        self.max_output_mb = 50.0
+        self.over_budget = "Advertir"
+        self.use_simplification = False
+        self.simplify_tolerance = 0.05
+        self.use_arc_fitting = False
+        self.arc_tolerance = 0.05
+        self.order_toolpath = False
+        self.toolpath_time = 1.0
+        self.inner_first = True
+        self.loop_direction = "Original"
+        self.nesting_layers = False
+        self.repeat_blocks = False
+        self.block_rotation = False
+        self.use_gcode = False
+        self.gcode_mode = "Fresadora"
+        self.feed_rate = 1000.0
+        self.plunge_rate = 300.0
+        self.safe_z = 5.0
+        self.cut_depth = 1.0
+        self.gcode_passes = 1
+        self.laser_power = 1000
+        self.use_svg_optimization = True
+        self.use_autotune = False
+        self.autotune_target = "Fidelidad mínima"
+        self.autotune_value = 0.97
+        self.svg_precision = 2
+        self.svg_symbols = False
 
     def render(self):
         """Renderiza la barra lateral y retorna la configuración"""
@@ -55,11 +98,21 @@ class Sidebar:
 
         st.sidebar.markdown("---")
 
+        # Sección de optimización SVG
+        self._render_svg_optimization_section()
+
+        st.sidebar.markdown("---")
+
         # Sección de DXF
         self._render_dxf_section()
 
         st.sidebar.markdown("---")
 
+        # Sección de G-code
+        self._render_gcode_section()
+
+        st.sidebar.markdown("---")
+
         # Presets rápidos
         self._render_presets_section()
 
@@ -120,6 +173,21 @@ class Sidebar:
             index=0
         )
 
+        # Motor de vectorización (los contornos de OpenCV solo trazan imágenes binarias)
+        if self.color_mode == "binary":
+            self.vectorizer_backend = st.sidebar.selectbox(
+                "Motor de vectorización",
+                ["VTracer", "OpenCV (contornos)"],
+                help="OpenCV traza los contornos directamente, mucho más rápido que VTracer en imágenes grandes"
+            )
+
+            if self.vectorizer_backend == "OpenCV (contornos)":
+                self.contour_epsilon = st.sidebar.slider(
+                    "📏 Tolerancia de contornos (px)",
+                    0.1, 5.0, 1.0, 0.1,
+                    help="Desviación máxima al simplificar los contornos (valores más bajos = más vértices)"
+                )
+
         self.filter_speckle = st.sidebar.slider(
             "🔍 Filtro de manchas",
             0, 10, 4,
@@ -139,6 +207,29 @@ class Sidebar:
             index=0
         )
         
+        # Ajuste automático de parámetros
+        self.use_autotune = st.sidebar.checkbox(
+            "🤖 Auto-ajuste de parámetros",
+            value=False,
+            help="Busca automáticamente filtro, esquinas, longitud y precisión sobre una versión reducida de la imagen"
+        )
+
+        if self.use_autotune:
+            self.autotune_target = st.sidebar.selectbox(
+                "Objetivo",
+                ["Fidelidad mínima", "Máximo de nodos", "Máximo de entidades DXF"],
+                help="La búsqueda se detiene en la primera configuración que cumple el objetivo"
+            )
+
+            if self.autotune_target == "Fidelidad mínima":
+                self.autotune_value = st.sidebar.slider(
+                    "Fidelidad", 0.80, 1.0, 0.97, 0.005
+                )
+            else:
+                self.autotune_value = st.sidebar.number_input(
+                    "Límite", min_value=10, max_value=1000000, value=5000, step=100
+                )
+
         # Configuración Avanzada (colapsable)
         with st.sidebar.expander("⚙️ Configuración Avanzada", expanded=False):
             self.length_threshold = st.slider(
@@ -186,6 +277,33 @@ class Sidebar:
                     help="Stacked = capas apiladas (recomendado), Cutout = sin apilar"
                 )
 
+    def _render_svg_optimization_section(self):
+        """Renderiza controles de optimización del SVG"""
+        st.sidebar.markdown("""
+            <div style="color: #fafafa; font-weight: 600; font-size: 1rem; margin-bottom: 0.75rem;">
+                🗜️ Optimización SVG
+            </div>
+        """, unsafe_allow_html=True)
+
+        self.use_svg_optimization = st.sidebar.checkbox(
+            "✓ Optimizar SVG",
+            value=True,
+            help="Reduce el tamaño del SVG: aplica transformaciones, redondea coordenadas y une paths"
+        )
+
+        if self.use_svg_optimization:
+            self.svg_precision = st.sidebar.slider(
+                "🎯 Decimales del SVG",
+                0, 6, 2,
+                help="Decimales en las coordenadas del SVG optimizado (menos = archivo más pequeño)"
+            )
+
+            self.svg_symbols = st.sidebar.checkbox(
+                "✓ Formas repetidas como símbolos",
+                value=False,
+                help="Escribe una sola vez cada forma que se repite (ej: letras) como <symbol> y cada copia como <use>"
+            )
+
     def _render_dxf_section(self):
         """Renderiza controles de configuración DXF"""
         st.sidebar.markdown("""
@@ -200,12 +318,29 @@ class Sidebar:
             help="Usa splines DXF nativos para curvas más precisas (recomendado)"
         )
 
-        self.bezier_subdivisions = st.sidebar.slider(
-            "📊 Subdivisiones Bezier",
-            10, 100, 30,
-            help="Mayor número = curvas más suaves pero archivos más grandes"
+        self.use_adaptive_flattening = st.sidebar.checkbox(
+            "✓ Aplanado adaptativo",
+            value=True,
+            help="Cada curva usa solo los vértices necesarios para respetar la tolerancia"
         )
 
+        if self.use_adaptive_flattening:
+            self.flatten_tolerance = st.sidebar.number_input(
+                "📏 Tolerancia de aplanado",
+                min_value=0.001,
+                max_value=1.0,
+                value=0.05,
+                step=0.01,
+                format="%.3f",
+                help="Desviación máxima permitida entre la curva y la polilínea (cada curva usa solo los vértices que necesita)"
+            )
+        else:
+            self.bezier_subdivisions = st.sidebar.slider(
+                "📊 Subdivisiones Bezier",
+                10, 100, 30,
+                help="Mayor número = curvas más suaves pero archivos más grandes"
+            )
+
         self.tolerance = st.sidebar.number_input(
             "🎯 Tolerancia de conexión",
             min_value=0.01,
@@ -215,6 +350,253 @@ class Sidebar:
             help="Tolerancia para conectar paths cercanos (valores pequeños = más preciso)"
         )
 
+        self.remove_duplicates = st.sidebar.checkbox(
+            "✓ Eliminar bordes duplicados",
+            value=False,
+            help="Elimina los bordes compartidos que VTracer emite dos veces (formas adyacentes): el láser no corta dos veces el mismo trazo"
+        )
+
+        self.use_simplification = st.sidebar.checkbox(
+            "✓ Simplificar polilíneas",
+            value=False,
+            help="Elimina vértices casi colineales (Ramer–Douglas–Peucker): DXF más livianos y menos carga para el CNC"
+        )
+
+        if self.use_simplification:
+            self.simplify_tolerance = st.sidebar.number_input(
+                "📐 Tolerancia de simplificación",
+                min_value=0.001,
+                max_value=1.0,
+                value=0.05,
+                step=0.01,
+                format="%.3f",
+                help="Elimina vértices casi colineales de las polilíneas sin desviarse más que esta distancia"
+            )
+
+        self.use_arc_fitting = st.sidebar.checkbox(
+            "✓ Ajustar arcos",
+            value=False,
+            help="Reemplaza tramos circulares por arcos (bulges) y contornos circulares por CIRCLE: el CNC recibe G2/G3 en lugar de micro-segmentos"
+        )
+
+        if self.use_arc_fitting:
+            self.arc_tolerance = st.sidebar.number_input(
+                "⭕ Tolerancia de arcos",
+                min_value=0.001,
+                max_value=1.0,
+                value=0.05,
+                step=0.01,
+                format="%.3f",
+                help="Desviación máxima entre la polilínea original y los arcos ajustados"
+            )
+
+        self.order_toolpath = st.sidebar.checkbox(
+            "✓ Optimizar recorrido de corte",
+            value=False,
+            help="Ordena las entidades para minimizar los movimientos en vacío de la máquina (vecino más cercano + 2-opt)"
+        )
+
+        if self.order_toolpath:
+            self.inner_first = st.sidebar.checkbox(
+                "Interiores primero",
+                value=True,
+                help="Corta los contornos interiores antes que el contorno que los contiene (la pieza no se suelta antes de tiempo)"
+            )
+
+            self.loop_direction = st.sidebar.selectbox(
+                "Sentido de contornos",
+                ["Original", "Antihorario", "Horario"],
+                help="Sentido de corte de los contornos cerrados"
+            )
+
+            self.toolpath_time = st.sidebar.number_input(
+                "⏱️ Tiempo de optimización (s)",
+                min_value=0.0,
+                max_value=30.0,
+                value=1.0,
+                step=0.5,
+                help="Segundos máximos dedicados a mejorar el recorrido con 2-opt"
+            )
+
+        self.nesting_layers = st.sidebar.checkbox(
+            "✓ Capas por anidamiento",
+            value=False,
+            help="Ubica cada contorno en la capa CONTORNO_<n> según cuántos contornos lo contienen (par = pieza, impar = agujero) para que el CAM aplique la compensación interior o exterior"
+        )
+
+        self.repeat_blocks = st.sidebar.checkbox(
+            "✓ Formas repetidas como bloques",
+            value=False,
+            help="Escribe una sola vez cada contorno que se repite (ej: letras) como BLOCK y cada copia como INSERT: archivos mucho más chicos en dibujos con texto"
+        )
+
+        if self.repeat_blocks:
+            self.block_rotation = st.sidebar.checkbox(
+                "✓ Incluir copias rotadas",
+                value=False,
+                help="También reutiliza el bloque en copias rotadas de la forma (el INSERT lleva la rotación)"
+            )
+
+        self.use_streaming = st.sidebar.checkbox(
+            "✓ Escritura en streaming (R12)",
+            value=False,
+            help="Escribe un DXF R12 entidad por entidad con memoria constante (para dibujos muy grandes; las curvas se aplanan)"
+        )
+
+        self.use_float32 = st.sidebar.checkbox(
+            "✓ Geometría en float32",
+            value=False,
+            help="Guarda la geometría parseada en precisión simple: la mitad de memoria en dibujos muy grandes (los cálculos siguen en doble precisión)"
+        )
+
+        self.dxf_units = st.sidebar.selectbox(
+            "📏 Unidades DXF",
+            ["Sin unidades (píxeles)", "Milímetros", "Pulgadas"],
+            help="Escala las coordenadas (píxeles) a milímetros o pulgadas y lo declara en el DXF ($INSUNITS); las tolerancias de aplanado, simplificación y arcos quedan en esas unidades"
+        )
+
+        if self.dxf_units != "Sin unidades (píxeles)":
+            self.dpi = st.sidebar.number_input(
+                "DPI de la imagen",
+                min_value=1.0,
+                max_value=2400.0,
+                value=96.0,
+                step=1.0,
+                help="Píxeles por pulgada de la imagen: define el tamaño físico del dibujo"
+            )
+
+        self.use_coordinate_grid = st.sidebar.checkbox(
+            "✓ Redondear coordenadas",
+            value=False,
+            help="Redondea las coordenadas a esta grilla: archivos ASCII más chicos y sin micro-segmentos de largo cero"
+        )
+
+        if self.use_coordinate_grid:
+            self.coordinate_grid = st.sidebar.number_input(
+                "Grilla de redondeo",
+                min_value=0.0001,
+                max_value=1.0,
+                value=0.001,
+                step=0.001,
+                format="%.4f",
+                help="Paso de la grilla en unidades del DXF"
+            )
+
+        self.dxf_format = st.sidebar.selectbox(
+            "Formato DXF",
+            ["ASCII", "Binario"],
+            help="Binario = archivos ~20-45% más chicos, más rápidos de escribir y de abrir en CAD/CAM; ASCII = legible y compatible con cualquier programa"
+        )
+
+        self.workers = st.sidebar.number_input(
+            "🧵 Procesos de conversión",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=1,
+            step=1,
+            help="Reparte el aplanado, ajuste de arcos y simplificación entre varios procesos (dibujos con decenas de miles de segmentos); el DXF es idéntico"
+        )
+
+        self.use_size_limit = st.sidebar.checkbox(
+            "✓ Límite de tamaño DXF",
+            value=False,
+            help="Estima el tamaño del DXF antes de convertir (segmentos por tipo × subdivisiones) y lo compara con este límite"
+        )
+
+        if self.use_size_limit:
+            self.max_output_mb = st.sidebar.number_input(
+                "📦 Tamaño máximo (MB)",
+                min_value=0.5,
+                max_value=1000.0,
+                value=50.0,
+                step=5.0,
+                help="Tamaño máximo estimado del DXF"
+            )
+
+            self.over_budget = st.sidebar.selectbox(
+                "Si se supera el límite",
+                ["Advertir", "Reducir calidad", "Rechazar"],
+                help="Si el DXF estimado supera el límite: avisar, reducir la calidad (binario y aplanado más grueso) o no convertir"
+            )
+
+    def _render_gcode_section(self):
+        """Renderiza sección de exportación G-code"""
+        st.sidebar.markdown("""
+            <div style="color: #fafafa; font-weight: 600; font-size: 1rem; margin-bottom: 0.75rem;">
+                🛠️ G-code
+            </div>
+        """, unsafe_allow_html=True)
+
+        self.use_gcode = st.sidebar.checkbox(
+            "✓ Exportar G-code",
+            value=False,
+            help="Genera G-code de contorneado 2D con la misma geometría del DXF (arcos como G2/G3)"
+        )
+
+        if not self.use_gcode:
+            return
+
+        self.gcode_mode = st.sidebar.selectbox(
+            "Máquina",
+            ["Fresadora", "Láser"],
+            help="Fresadora = baja en Z por pasadas; Láser = enciende (M3) y apaga (M5) en cada contorno"
+        )
+
+        self.feed_rate = st.sidebar.number_input(
+            "Avance de corte (por minuto)",
+            min_value=1.0,
+            max_value=100000.0,
+            value=1000.0,
+            step=100.0,
+            help="Velocidad de corte en unidades del DXF por minuto (mm si no se eligieron unidades)"
+        )
+
+        if self.gcode_mode == "Fresadora":
+            self.plunge_rate = st.sidebar.number_input(
+                "Avance de bajada (por minuto)",
+                min_value=1.0,
+                max_value=100000.0,
+                value=300.0,
+                step=50.0,
+                help="Velocidad de bajada en Z"
+            )
+
+            self.safe_z = st.sidebar.number_input(
+                "Altura segura (Z)",
+                min_value=0.0,
+                max_value=100.0,
+                value=5.0,
+                step=0.5,
+                help="Altura de los movimientos rápidos entre contornos"
+            )
+
+            self.cut_depth = st.sidebar.number_input(
+                "Profundidad de corte",
+                min_value=0.01,
+                max_value=100.0,
+                value=1.0,
+                step=0.1,
+                help="Profundidad total; se reparte entre las pasadas"
+            )
+        else:
+            self.laser_power = st.sidebar.number_input(
+                "Potencia del láser (S)",
+                min_value=0,
+                max_value=100000,
+                value=1000,
+                step=50,
+                help="Valor S de M3 (depende del firmware, ej: 0-1000 en GRBL)"
+            )
+
+        self.gcode_passes = st.sidebar.number_input(
+            "Pasadas",
+            min_value=1,
+            max_value=50,
+            value=1,
+            step=1,
+            help="Pasadas por contorno; las cadenas abiertas se recorren en zig-zag"
+        )
+
     def _render_presets_section(self):
         """Renderiza sección de presets rápidos"""
         st.sidebar.markdown("""
@@ -306,7 +688,7 @@ class Sidebar:
         Retorna la configuración actual como diccionarios separados
 
         Returns:
-            dict: Configuración completa con claves preprocessor, vectorizer, dxf
+            dict: Configuración completa con claves preprocessor, vectorizer, dxf, gcode
         """
         return {
             'use_preprocessing': self.use_preprocessing,
@@ -327,11 +709,77 @@ class Sidebar:
                 'color_precision': self.color_precision,
                 'layer_difference': self.layer_difference,
                 'max_iterations': self.max_iterations,
-                'hierarchical': self.hierarchical
+                'hierarchical': self.hierarchical,
+                'backend': 'opencv' if self.color_mode == "binary" and self.vectorizer_backend == "OpenCV (contornos)" else 'vtracer',
+                'contour_epsilon': self.contour_epsilon
             },
             'dxf': {
                 'bezier_subdivisions': self.bezier_subdivisions,
                 'use_splines': self.use_splines,
-                'tolerance': self.tolerance
+                'tolerance': self.tolerance,
+                'flatten_tolerance': self.flatten_tolerance if self.use_adaptive_flattening else None,
+                'streaming': self.use_streaming,
+                'geometry_dtype': 'float32' if self.use_float32 else 'float64',
+                'remove_duplicates': self.remove_duplicates,
+                'simplify_tolerance': self.simplify_tolerance if self.use_simplification else None,
+                'arc_tolerance': self.arc_tolerance if self.use_arc_fitting else None,
+                'order_toolpath': self.order_toolpath,
+                'toolpath_time': self.toolpath_time,
+                'inner_first': self.inner_first,
+                'loop_direction': {"Antihorario": 'ccw', "Horario": 'cw'}.get(self.loop_direction),
+                'nesting_layers': self.nesting_layers,
+                'repeat_blocks': self.repeat_blocks,
+                'block_rotation': self.block_rotation and self.repeat_blocks,
+                'dxf_format': 'bin' if self.dxf_format == "Binario" else 'asc',
+                'workers': int(self.workers),
+                'max_output_mb': self.max_output_mb if self.use_size_limit else None,
+                'over_budget': {"Reducir calidad": 'reduce', "Rechazar": 'refuse'}.get(self.over_budget, 'warn'),
+                'units': {"Milímetros": 'mm', "Pulgadas": 'in'}.get(self.dxf_units),
+                'dpi': self.dpi,
+                'coordinate_grid': self.coordinate_grid if self.use_coordinate_grid else None
+            },
+            'gcode': self._get_gcode_config(),
+            'autotune': self._get_autotune_config(),
+            'use_svg_optimization': self.use_svg_optimization,
+            'svg_optimizer': {
+                'precision': self.svg_precision,
+                'symbols': self.svg_symbols
             }
         }
+
+    def _get_gcode_config(self):
+        """
+        Retorna los parámetros de máquina del exportador G-code
+
+        Returns:
+            dict o None si la exportación G-code está desactivada
+        """
+        if not self.use_gcode:
+            return None
+
+        return {
+            'mode': 'laser' if self.gcode_mode == "Láser" else 'mill',
+            'feed_rate': self.feed_rate,
+            'plunge_rate': self.plunge_rate,
+            'safe_z': self.safe_z,
+            'cut_depth': self.cut_depth,
+            'passes': int(self.gcode_passes),
+            'laser_power': self.laser_power
+        }
+
+    def _get_autotune_config(self):
+        """
+        Retorna los objetivos del ajuste automático
+
+        Returns:
+            dict o None si el ajuste automático está desactivado
+        """
+        if not self.use_autotune:
+            return None
+
+        targets = {
+            "Fidelidad mínima": 'min_fidelity',
+            "Máximo de nodos": 'max_nodes',
+            "Máximo de entidades DXF": 'max_entities'
+        }
+        return {targets[self.autotune_target]: self.autotune_value}
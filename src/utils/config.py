@@ -25,14 +25,66 @@ DEFAULT_VECTORIZER_CONFIG = {
     'length_threshold': 4.0,
     'mode': 'spline',
     'splice_threshold': 45,
-    'path_precision': 8
+    'path_precision': 8,
+    'backend': 'vtracer',
+    'contour_epsilon': 1.0
 }
 
 # Configuración por defecto del convertidor DXF
 DEFAULT_DXF_CONFIG = {
     'bezier_subdivisions': 30,
     'use_splines': True,
-    'tolerance': 0.1
+    'tolerance': 0.1,
+    'flatten_tolerance': 0.05,
+    'max_curve_vertices': 100,
+    'streaming': False,
+    'geometry_dtype': 'float64',
+    'simplify_tolerance': None,
+    'arc_tolerance': None,
+    'order_toolpath': False,
+    'toolpath_time': 1.0,
+    'inner_first': True,
+    'loop_direction': None,
+    'nesting_layers': False,
+    'dxf_format': 'asc',
+    'remove_duplicates': False,
+    'workers': 1,
+    'max_output_mb': None,
+    'over_budget': 'warn',
+    'units': None,
+    'dpi': 96.0,
+    'coordinate_grid': None,
+    'repeat_blocks': False,
+    'block_rotation': False
+}
+
+# Configuración por defecto del exportador G-code (parámetros de máquina)
+DEFAULT_GCODE_CONFIG = {
+    'mode': 'mill',
+    'feed_rate': 1000.0,
+    'plunge_rate': 300.0,
+    'safe_z': 5.0,
+    'cut_depth': 1.0,
+    'passes': 1,
+    'laser_power': 1000,
+    'spindle_speed': None,
+    'precision': 3
+}
+
+# Configuración por defecto del optimizador SVG
+DEFAULT_SVG_OPTIMIZER_CONFIG = {
+    'precision': 2,
+    'relative': True,
+    'merge_paths': True,
+    'symbols': False,
+    'symbol_rotation': False
+}
+
+# Objetivos por defecto del ajuste automático de VTracer
+DEFAULT_AUTOTUNE_CONFIG = {
+    'min_fidelity': 0.97,
+    'proxy_size': 512,
+    'levels': 12
 }
 
 # Formatos de archivo soportados
@@ -56,7 +108,36 @@ HELP_TEXTS = {
     'filter_speckle': 'Elimina puntos pequeños y ruido (valores más altos = más filtrado)',
     'corner_threshold': 'Sensibilidad para detectar esquinas (60-100 típico para logos)',
     'mode': 'Spline = curvas suaves (recomendado para DXF), Polygon = segmentos rectos',
+    'backend': 'OpenCV traza los contornos directamente, mucho más rápido que VTracer en imágenes grandes',
+    'contour_epsilon': 'Desviación máxima al simplificar los contornos (valores más bajos = más vértices)',
     'bezier_subdivisions': 'Mayor número = curvas más suaves pero archivos más grandes',
+    'flatten_tolerance': 'Desviación máxima permitida entre la curva y la polilínea (cada curva usa solo los vértices que necesita)',
     'use_splines': 'Usa splines DXF nativos para curvas más precisas (recomendado)',
-    'tolerance': 'Tolerancia para conectar paths cercanos (valores pequeños = más preciso)'
+    'tolerance': 'Tolerancia para conectar paths cercanos (valores pequeños = más preciso)',
+    'remove_duplicates': 'Elimina los bordes compartidos que VTracer emite dos veces (formas adyacentes): el láser no corta dos veces el mismo trazo',
+    'simplify_tolerance': 'Elimina vértices casi colineales de las polilíneas sin desviarse más que esta distancia',
+    'arc_tolerance': 'Reemplaza tramos circulares por arcos (bulges) y contornos circulares por CIRCLE: el CNC recibe G2/G3 en lugar de micro-segmentos',
+    'order_toolpath': 'Ordena las entidades para minimizar los movimientos en vacío de la máquina (vecino más cercano + 2-opt)',
+    'toolpath_time': 'Segundos máximos dedicados a mejorar el recorrido con 2-opt',
+    'inner_first': 'Corta los contornos interiores antes que el contorno que los contiene (la pieza no se suelta antes de tiempo)',
+    'loop_direction': 'Sentido de corte de los contornos cerrados',
+    'nesting_layers': 'Ubica cada contorno en la capa CONTORNO_<n> según cuántos contornos lo contienen (par = pieza, impar = agujero) para que el CAM aplique la compensación interior o exterior',
+    'dxf_format': 'Binario = archivos ~20-45% más chicos, más rápidos de escribir y de abrir en CAD/CAM; ASCII = legible y compatible con cualquier programa',
+    'max_output_mb': 'Estima el tamaño del DXF antes de convertir (segmentos por tipo × subdivisiones) y lo compara con este límite',
+    'over_budget': 'Si el DXF estimado supera el límite: avisar, reducir la calidad (binario y aplanado más grueso) o no convertir',
+    'units': 'Escala las coordenadas (píxeles) a milímetros o pulgadas y lo declara en el DXF ($INSUNITS); las tolerancias de aplanado, simplificación y arcos quedan en esas unidades',
+    'dpi': 'Píxeles por pulgada de la imagen: define el tamaño físico del dibujo',
+    'coordinate_grid': 'Redondea las coordenadas a esta grilla: archivos ASCII más chicos y sin micro-segmentos de largo cero',
+    'repeat_blocks': 'Escribe una sola vez cada contorno que se repite (ej: letras) como BLOCK y cada copia como INSERT: archivos mucho más chicos en dibujos con texto',
+    'block_rotation': 'También reutiliza el bloque en copias rotadas de la forma (el INSERT lleva la rotación)',
+    'workers': 'Reparte el aplanado, ajuste de arcos y simplificación entre varios procesos (dibujos con decenas de miles de segmentos); el DXF es idéntico',
+    'streaming': 'Escribe un DXF R12 entidad por entidad con memoria constante (para dibujos muy grandes; las curvas se aplanan)',
+    'geometry_dtype': 'Guarda la geometría parseada en precisión simple: la mitad de memoria en dibujos muy grandes (los cálculos siguen en doble precisión)',
+    'gcode': 'Genera G-code de contorneado 2D con la misma geometría del DXF (arcos como G2/G3)',
+    'gcode_mode': 'Fresadora = baja en Z por pasadas; Láser = enciende (M3) y apaga (M5) en cada contorno',
+    'gcode_passes': 'Pasadas por contorno; las cadenas abiertas se recorren en zig-zag',
+    'svg_optimization': 'Reduce el tamaño del SVG: aplica transformaciones, redondea coordenadas y une paths',
+    'svg_precision': 'Decimales en las coordenadas del SVG optimizado (menos = archivo más pequeño)',
+    'svg_symbols': 'Escribe una sola vez cada forma que se repite (ej: letras) como <symbol> y cada copia como <use>',
+    'autotune': 'Busca automáticamente filtro, esquinas, longitud y precisión sobre una versión reducida de la imagen'
 }
@@ -0,0 +1,36 @@
+"""
+Utilidades compartidas por las pruebas
+"""
+
+import io
+
+import ezdxf
+import pytest
+
+
+@pytest.fixture
+def read_dxf():
+    """Lee un DXF ASCII generado en memoria y retorna el documento ezdxf"""
+    def read(data):
+        return ezdxf.read(io.StringIO(data.decode('ascii')))
+    return read
+
+
+@pytest.fixture
+def grid_svg():
+    """Genera un SVG con una grilla de formas (cúbicas, arcos y líneas) de tamaño configurable"""
+    def build(rows, columns=20):
+        shapes = []
+        for row in range(rows):
+            for column in range(columns):
+                x, y = column * 30, row * 30
+                shapes.append(
+                    f'<path d="M{x} {y} C{x + 5} {y - 8} {x + 15} {y + 8} {x + 20} {y} '
+                    f'A6 6 0 0 1 {x + 20} {y + 12} L{x} {y + 12} Z"/>'
+                    f'<path d="M{x + 2} {y + 20} Q{x + 10} {y + 28} {x + 18} {y + 20}"/>'
+                )
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="-10 -10 {columns * 30} {rows * 30}">'
+            + ''.join(shapes) + '</svg>'
+        )
+    return build
@@ -0,0 +1,83 @@
+"""
+Pruebas del ajuste de arcos (bulges de LWPOLYLINE y CIRCLE) sobre polilíneas
+"""
+
+import numpy as np
+import pytest
+
+from src.core.arc_fit import fit_arcs, fit_circles
+from src.core.dxf_converter_v2 import DXFConverterV2
+
+
+# Dos arcos circulares en un viewBox de 100 x 100
+ARCS_SVG = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+<path d="M10 50 A20 20 0 0 1 50 50"/>
+<path d="M10 80 A25 25 0 0 0 60 80"/>
+</svg>'''
+
+
+def test_streaming_fits_arcs_back_into_bulges(read_dxf):
+    """Aplanado en streaming y ajustado: cada arco vuelve a ser un solo segmento con bulge"""
+    converter = DXFConverterV2(streaming=True, flatten_tolerance=0.001, arc_tolerance=0.01)
+    success, data, message = converter.convert_bytes(ARCS_SVG)
+    assert success, message
+    assert '2 arcos' in message
+
+    for polyline in read_dxf(data).modelspace():
+        vertices = list(polyline.vertices)
+        bulges = [vertex.dxf.bulge for vertex in vertices]
+        assert len(vertices) == 2
+        assert bulges[0] != 0 and bulges[1] == 0
+
+
+def test_full_circle_path_becomes_circle(read_dxf):
+    svg = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+    <path d="M30 50 A20 20 0 0 1 70 50 A20 20 0 0 1 30 50 Z"/></svg>'''
+    converter = DXFConverterV2(use_splines=False, flatten_tolerance=0.001, arc_tolerance=0.01)
+    success, data, message = converter.convert_bytes(svg)
+    assert success, message
+    (circle,) = read_dxf(data).modelspace()
+    assert circle.dxftype() == 'CIRCLE'
+    assert circle.dxf.center.vec2.isclose((50.0, 50.0), abs_tol=1e-3)
+    assert circle.dxf.radius == pytest.approx(20.0, abs=1e-3)
+
+
+def test_fit_arcs_keeps_corners_and_tolerance():
+    """Un semicírculo entre dos rectas: las rectas se conservan y el arco es uno solo"""
+    angles = np.linspace(np.pi, 0, 40)
+    arc = np.column_stack([10 * np.cos(angles), 10 * np.sin(angles)])
+    polyline = np.vstack([[-10.0, -20.0], arc, [10.0, -20.0]])
+
+    ((vertices, bulges),) = fit_arcs([polyline], 0.01, [False])
+    np.testing.assert_allclose(vertices, [[-10, -20], [-10, 0], [10, 0], [10, -20]], atol=1e-9)
+    # Semicírculo horario: bulge -tan(pi / 4)
+    np.testing.assert_allclose(bulges, [0, -1, 0, 0], atol=1e-9)
+
+
+def test_fit_arcs_matches_each_polyline_alone():
+    """Ajustar varias polilíneas juntas da lo mismo que ajustarlas de a una"""
+    rng = np.random.default_rng(0)
+    polylines, closed = [], []
+    for index in range(20):
+        angles = np.linspace(0, rng.uniform(1, 6), int(rng.integers(5, 300)))
+        radius = rng.uniform(1, 50)
+        points = np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+        polylines.append(points + rng.normal(0, 0.002, points.shape))
+        closed.append(bool(index % 2))
+
+    together = fit_arcs(polylines, 0.01, closed)
+    for points, is_closed, (vertices, bulges) in zip(polylines, closed, together):
+        ((alone_vertices, alone_bulges),) = fit_arcs([points], 0.01, [is_closed])
+        np.testing.assert_array_equal(vertices, alone_vertices)
+        np.testing.assert_array_equal(bulges, alone_bulges)
+
+
+def test_fit_circles():
+    angles = np.linspace(0, 2 * np.pi, 60, endpoint=False)
+    circle = np.column_stack([3 + 5 * np.cos(angles), 4 + 5 * np.sin(angles)])
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0, 0.5], [0, 0.4], [0, 0.3], [0, 0.2]], dtype=float)
+
+    fitted, not_circle, too_short = fit_circles([circle, square, circle[:5]], 0.01)
+    np.testing.assert_allclose(fitted[0], [3, 4], atol=1e-9)
+    assert fitted[1] == pytest.approx(5)
+    assert not_circle is None and too_short is None
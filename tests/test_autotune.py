@@ -0,0 +1,82 @@
+"""
+Pruebas del ajuste automático: escalera de niveles, caché y pool de procesos
+"""
+
+from collections import OrderedDict
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.core import autotune
+from src.core.autotune import VectorizerAutoTuner
+
+
+@pytest.fixture
+def image():
+    """Logo binario chico: un disco y un rectángulo"""
+    image = Image.new('RGB', (96, 64), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((8, 8, 48, 56), fill='black')
+    draw.rectangle((60, 16, 88, 40), fill='black')
+    return image
+
+
+@pytest.fixture
+def evaluations(monkeypatch):
+    """Reemplaza la vectorización por métricas que mejoran con el detalle y cuenta las llamadas"""
+    monkeypatch.setattr(autotune, '_evaluation_cache', OrderedDict())
+    calls = []
+
+    def evaluate(png_bytes, reference, config):
+        calls.append(config)
+        detail = config['path_precision']
+        return {
+            'success': True, 'proxy_nodes': 10 * detail, 'paths': 1, 'entities': detail,
+            'svg_size': 100 * detail, 'fidelity': 0.5 + detail / 20
+        }
+
+    monkeypatch.setattr(autotune, '_evaluate_candidate', evaluate)
+    return calls
+
+
+def test_ladder_stops_at_first_config_meeting_fidelity(image, evaluations):
+    tuner = VectorizerAutoTuner(min_fidelity=0.75, levels=7, workers=1)
+    config, report = tuner.tune(image)
+
+    # De simple a detallado: path_precision 2, 3, 4, 5, ... y se corta en 5
+    assert [call['path_precision'] for call in evaluations] == [2, 3, 4, 5]
+    assert config['path_precision'] == 5
+    assert report['target_met'] and report['evaluations'] == 4
+    assert report['metrics']['fidelity'] >= 0.75
+
+
+def test_cache_hit_skips_evaluation(image, evaluations):
+    tuner = VectorizerAutoTuner(min_fidelity=0.75, levels=7, workers=1)
+    first = tuner.tune(image)
+    count = len(evaluations)
+
+    second = tuner.tune(image)
+    assert len(evaluations) == count
+    assert second[0] == first[0]
+    assert second[1]['metrics'] == first[1]['metrics']
+
+
+def test_one_process_pool_per_tune(image, monkeypatch):
+    monkeypatch.setattr(autotune, '_evaluation_cache', OrderedDict())
+    pools = []
+
+    class CountingExecutor(autotune.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(autotune, 'ProcessPoolExecutor', CountingExecutor)
+    parallel = VectorizerAutoTuner(min_fidelity=1.0, levels=6, workers=2).tune(image)
+    assert len(pools) == 1
+    assert parallel[1]['evaluations'] == 6
+
+    monkeypatch.setattr(autotune, '_evaluation_cache', OrderedDict())
+    serial = VectorizerAutoTuner(min_fidelity=1.0, levels=6, workers=1).tune(image)
+    assert len(pools) == 1
+    assert parallel[0] == serial[0]
+    assert [result for _, result in parallel[1]['history']] == [result for _, result in serial[1]['history']]
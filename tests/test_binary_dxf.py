@@ -0,0 +1,55 @@
+"""
+Pruebas del DXF binario: se lee con ezdxf y tiene las mismas entidades que el ASCII
+"""
+
+import ezdxf
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+
+
+BINARY_SENTINEL = b'AutoCAD Binary DXF\r\n\x1a\x00'
+
+
+def _entities(document):
+    """Tipo, capa y geometría de cada entidad del modelspace"""
+    result = []
+    for entity in document.modelspace():
+        kind = entity.dxftype()
+        if kind == 'LWPOLYLINE':
+            geometry = [tuple(round(value, 9) for value in point) for point in entity.get_points('xyb')]
+        elif kind == 'POLYLINE':
+            geometry = [
+                (round(vertex.dxf.location.x, 9), round(vertex.dxf.location.y, 9), round(vertex.dxf.bulge, 9))
+                for vertex in entity.vertices
+            ]
+        else:
+            geometry = str(entity.dxfattribs(drop={'handle', 'owner'}))
+        result.append((kind, entity.dxf.layer, geometry))
+    return result
+
+
+@pytest.mark.parametrize('config', [
+    {},
+    {'use_splines': False, 'flatten_tolerance': 0.01, 'arc_tolerance': 0.01, 'nesting_layers': True},
+    {'streaming': True, 'units': 'mm'},
+    {'streaming': True, 'flatten_tolerance': 0.01, 'arc_tolerance': 0.01, 'repeat_blocks': True, 'nesting_layers': True}
+])
+def test_binary_round_trip(config, grid_svg, tmp_path):
+    svg = grid_svg(3, columns=4)
+    ascii_path, binary_path = tmp_path / 'ascii.dxf', tmp_path / 'binary.dxf'
+
+    success, message = DXFConverterV2(**config).convert(svg, str(ascii_path))
+    assert success, message
+    success, message = DXFConverterV2(dxf_format='bin', **config).convert(svg, str(binary_path))
+    assert success, message
+
+    data = binary_path.read_bytes()
+    assert data.startswith(BINARY_SENTINEL)
+    assert len(data) < ascii_path.stat().st_size
+
+    ascii_document, binary_document = ezdxf.readfile(ascii_path), ezdxf.readfile(binary_path)
+    assert binary_document.header.get('$INSUNITS', 0) == ascii_document.header.get('$INSUNITS', 0)
+    assert len(binary_document.modelspace()) > 0
+    assert _entities(binary_document) == _entities(ascii_document)
+    assert sorted(block.name for block in binary_document.blocks) == sorted(block.name for block in ascii_document.blocks)
@@ -0,0 +1,65 @@
+"""
+Pruebas de las formas repetidas escritas como BLOCK + INSERT
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+
+
+# Forma asimétrica (líneas y cúbica) repetida trasladada y rotada
+SHAPE = 'M0 0 L20 0 C25 5 25 15 20 20 L8 20 L0 12 Z'
+# Las formas con arcos solo se agrupan por traslación: la copia rotada queda suelta
+ARC_SHAPE = 'M0 0 L12 0 A6 6 0 0 1 12 12 L0 12 Z'
+ARC_COPIES = ['translate(10 110)', 'translate(40 110)', 'translate(90 110) rotate(90 6 6)']
+COPIES = [
+    'translate(10 10)',
+    'translate(60 10)',
+    'translate(110 10)',
+    'translate(10 80) rotate(90 10 10)',
+    'translate(60 80) rotate(30 10 10)',
+    'translate(110 80) rotate(-135 10 10)'
+]
+REPEATED_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 160 140">'
+    + ''.join(f'<path transform="{transform}" d="{SHAPE}"/>' for transform in COPIES)
+    + ''.join(f'<path transform="{transform}" d="{ARC_SHAPE}"/>' for transform in ARC_COPIES)
+    + '<path d="M5 130 L150 130 L150 135 L5 135 Z"/></svg>'
+)
+
+
+def _shapes(doc, expand):
+    """Vértices de cada polilínea del modelspace, con los INSERT expandidos si expand"""
+    shapes = []
+    for entity in doc.modelspace():
+        entities = entity.virtual_entities() if expand and entity.dxftype() == 'INSERT' else [entity]
+        for polyline in entities:
+            assert polyline.dxftype() == 'LWPOLYLINE'
+            shapes.append(np.array([point[:2] for point in polyline.get_points()]))
+    # Mismo orden en ambas salidas: por centroide y, dentro de cada forma, por vértice
+    shapes = [shape[np.lexsort(np.round(shape, 6).T[::-1])] for shape in shapes]
+    return sorted(shapes, key=lambda shape: tuple(np.round(shape.mean(axis=0), 3)))
+
+
+@pytest.mark.parametrize('block_rotation, inserts', [(False, 5), (True, 8)])
+def test_expanded_inserts_match_plain_output(block_rotation, inserts, read_dxf):
+    config = {'use_splines': False}
+    success, plain, message = DXFConverterV2(**config).convert_bytes(REPEATED_SVG)
+    assert success, message
+    success, blocks, message = DXFConverterV2(
+        repeat_blocks=True, block_rotation=block_rotation, **config
+    ).convert_bytes(REPEATED_SVG)
+    assert success, message
+
+    doc = read_dxf(blocks)
+    assert len(doc.modelspace().query('INSERT')) == inserts
+    rotations = sorted(round(insert.dxf.rotation, 6) for insert in doc.modelspace().query('INSERT'))
+    if block_rotation:
+        # La inversión de Y invierte el sentido: rotate(90) del SVG es 270° en el DXF
+        assert rotations == [0.0] * 5 + [135.0, 270.0, 330.0]
+
+    expected, actual = _shapes(read_dxf(plain), False), _shapes(doc, True)
+    assert [len(shape) for shape in actual] == [len(shape) for shape in expected]
+    for expected_shape, actual_shape in zip(expected, actual):
+        np.testing.assert_allclose(actual_shape, expected_shape, atol=1e-6)
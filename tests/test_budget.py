@@ -0,0 +1,93 @@
+"""
+Pruebas de la estimación del DXF y del presupuesto de tamaño (over_budget)
+"""
+
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.svg_parser import parse_svg
+from src.core.vectorizer import ImageVectorizer
+
+
+# Margen documentado de la estimación con salidas de VTracer (ver estimate_geometry)
+SIZE_RATIO = 0.10
+
+
+@pytest.fixture(scope='module')
+def vtracer_geometry():
+    """Geometría de VTracer de un logo binario: discos, rectángulos y texto"""
+    image = Image.new('RGB', (400, 260), 'white')
+    draw = ImageDraw.Draw(image)
+    for index in range(4):
+        draw.ellipse((10 + 95 * index, 10, 90 + 95 * index, 120), fill='black')
+        draw.ellipse((35 + 95 * index, 40, 65 + 95 * index, 90), fill='white')
+    draw.rectangle((20, 150, 380, 240), fill='black')
+    draw.text((40, 180), 'Plasma CNC 2026', fill='white')
+    png = io.BytesIO()
+    image.save(png, format='PNG')
+
+    success, svg = ImageVectorizer().convert_bytes(png.getvalue())
+    assert success, svg
+    return parse_svg(svg)
+
+
+@pytest.mark.parametrize('config', [
+    {},
+    {'dxf_format': 'bin'},
+    {'use_splines': False},
+    {'use_splines': False, 'flatten_tolerance': 0.05},
+    {'streaming': True},
+    {'streaming': True, 'flatten_tolerance': 0.05},
+    {'streaming': True, 'dxf_format': 'bin'},
+    {'units': 'mm', 'streaming': True, 'flatten_tolerance': 0.01}
+])
+def test_estimate_within_documented_ratio(config, vtracer_geometry):
+    converter = DXFConverterV2(**config)
+    estimate = converter.estimate_geometry(vtracer_geometry)
+    success, data, message = converter.convert_geometry(vtracer_geometry)
+    assert success, message
+
+    assert estimate['size'] == pytest.approx(len(data), rel=SIZE_RATIO)
+    if config.get('streaming') and config.get('dxf_format') == 'bin':
+        assert estimate['size'] == len(data)
+
+
+def test_refuse_writes_nothing(vtracer_geometry):
+    estimate = DXFConverterV2(streaming=True).estimate_geometry(vtracer_geometry)
+    converter = DXFConverterV2(streaming=True, max_output_mb=estimate['size'] / 2 / 2 ** 20, over_budget='refuse')
+
+    output = io.BytesIO()
+    success, message = converter.convert_geometry(vtracer_geometry, output)
+    assert not success and 'supera el límite' in message
+    assert output.getvalue() == b''
+
+
+def test_warn_converts_and_notes_it(vtracer_geometry):
+    estimate = DXFConverterV2(streaming=True).estimate_geometry(vtracer_geometry)
+    converter = DXFConverterV2(streaming=True, max_output_mb=estimate['size'] / 2 / 2 ** 20, over_budget='warn')
+
+    success, data, message = converter.convert_geometry(vtracer_geometry)
+    assert success and 'advertencia' in message
+    assert data == DXFConverterV2(streaming=True).convert_geometry(vtracer_geometry)[1]
+
+
+@pytest.mark.parametrize('fraction, changes', [
+    (0.75, ['formato binario']),
+    (0.25, ['formato binario', 'tolerancia de aplanado'])
+])
+def test_reduce_fits_the_limit(fraction, changes, vtracer_geometry):
+    """Primero binario y, si no alcanza, aplanado más grueso hasta entrar en el límite"""
+    original = DXFConverterV2(streaming=True, flatten_tolerance=0.01)
+    limit = original.estimate_geometry(vtracer_geometry)['size'] * fraction
+    converter = DXFConverterV2(
+        streaming=True, flatten_tolerance=0.01, max_output_mb=limit / 2 ** 20, over_budget='reduce'
+    )
+
+    success, data, message = converter.convert_geometry(vtracer_geometry)
+    assert success, message
+    assert all(change in message for change in changes)
+    assert len(data) <= limit
+    assert data.startswith(b'AutoCAD Binary DXF')
@@ -0,0 +1,72 @@
+"""
+Pruebas de la unión de paths abiertos en cadenas por proximidad de sus extremos
+"""
+
+import numpy as np
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.svg_parser import parse_svg
+
+
+def _svg(*paths):
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">'
+        + ''.join(f'<path d="{d}"/>' for d in paths) + '</svg>'
+    )
+
+
+def _chain_points(geometry, path_groups, index):
+    """Vértices de una cadena en orden de recorrido (inicio de cada segmento y fin del último)"""
+    group = path_groups[index]
+    points = geometry.points[group.segments]
+    points[group.reversed] = points[group.reversed, ::-1]
+    return np.vstack([points[:, 0], points[-1:, 3]])
+
+
+def test_shuffled_and_reversed_pieces_form_one_chain():
+    """Tramos desordenados y algunos invertidos, con huecos menores que la tolerancia"""
+    svg = _svg('M20 0 L30 0', 'M10 0.05 L20 0', 'M40 0 L30.05 0', 'M0 0 L10 0', 'M40 0 L50 10')
+    geometry = parse_svg(svg)
+    path_groups = DXFConverterV2(tolerance=0.1)._optimize_paths(geometry)
+
+    assert len(path_groups) == 1 and not path_groups.closed[0]
+    points = _chain_points(geometry, path_groups, 0)
+    if points[0, 0] > points[-1, 0]:
+        points = points[::-1]
+    np.testing.assert_allclose(points[[0, -1]], [[0, 0], [50, 10]])
+    assert np.all(np.diff(points[:, 0]) > 0)
+
+
+def test_pieces_that_meet_again_close_the_chain():
+    svg = _svg('M0 0 L10 0', 'M10 10 L10 0', 'M10 10 L0 10', 'M0 0 L0 10')
+    path_groups = DXFConverterV2()._optimize_paths(parse_svg(svg))
+    assert len(path_groups) == 1 and path_groups.closed.tolist() == [True]
+    assert sorted(path_groups.segments.tolist()) == [0, 1, 2, 3]
+
+
+def test_gap_larger_than_tolerance_is_not_joined():
+    svg = _svg('M0 0 L10 0', 'M10.5 0 L20 0')
+    assert len(DXFConverterV2(tolerance=0.1)._optimize_paths(parse_svg(svg))) == 2
+    assert len(DXFConverterV2(tolerance=1.0)._optimize_paths(parse_svg(svg))) == 1
+
+
+def test_branches_use_every_piece_once():
+    """En un cruce de tres tramos cada uno se usa en una sola cadena"""
+    svg = _svg('M0 0 L10 0', 'M10 0 L20 0', 'M10 0 L10 10', 'M50 50 L60 60 Z')
+    path_groups = DXFConverterV2()._optimize_paths(parse_svg(svg))
+
+    assert path_groups.closed.tolist() == [True, False, False]
+    assert sorted(path_groups.segments.tolist()) == [0, 1, 2, 3, 4]
+
+
+def test_chain_is_written_as_one_polyline(read_dxf):
+    svg = _svg('M20 0 L30 5', 'M0 0 L10 0', 'M20 0 L10 0')
+    success, data, message = DXFConverterV2().convert_bytes(svg)
+    assert success, message
+    (polyline,) = read_dxf(data).modelspace()
+    assert polyline.dxftype() == 'LWPOLYLINE' and not polyline.closed
+
+    vertices = np.array(list(polyline.get_points('xy')))
+    if vertices[0, 0] > vertices[-1, 0]:
+        vertices = vertices[::-1]
+    np.testing.assert_allclose(vertices, [[0, 100], [10, 100], [20, 100], [30, 95]])
@@ -0,0 +1,102 @@
+"""
+Pruebas del trazado de contornos con OpenCV frente a la máscara de origen
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.contour_trace import trace_mask
+from src.core.svg_parser import SEG_CUBIC, SEG_LINE
+
+
+def _sample_mask():
+    """Máscara con agujeros, un disco, trazos de un píxel y manchas en diagonal"""
+    mask = np.zeros((40, 50), dtype=np.uint8)
+    mask[5:20, 5:30] = 1
+    mask[8:14, 10:20] = 0          # agujero
+    cv2.circle(mask, (38, 28), 8, 1, -1)
+    mask[30:38, 3] = 1             # trazo vertical de un píxel
+    mask[25, 20] = 1               # píxel suelto
+    mask[30:35, 10:15] = 1
+    mask[32, 12] = 0               # agujero de un píxel
+    mask[0:3, 40:43] = 1
+    mask[3:5, 43:46] = 1           # tocan solo en diagonal
+    return mask
+
+
+def _render(geometry, shape):
+    """Píxeles cuyo centro queda dentro de un número impar de contornos"""
+    height, width = shape
+    inside = np.zeros(shape, dtype=np.int64)
+    for index in range(geometry.num_paths):
+        start, end = geometry.path_range(index)
+        polygon = geometry.points[start:end, 0].astype(np.float32)
+        for y in range(height):
+            for x in range(width):
+                inside[y, x] += cv2.pointPolygonTest(polygon, (x + 0.5, y + 0.5), False) > 0
+    return inside % 2
+
+
+def _signed_areas(geometry):
+    areas = []
+    for index in range(geometry.num_paths):
+        start, end = geometry.path_range(index)
+        x, y = geometry.points[start:end, 0].T
+        areas.append((x * np.roll(y, -1) - np.roll(x, -1) * y).sum() / 2)
+    return np.array(areas)
+
+
+def test_exact_trace_reproduces_mask():
+    mask = _sample_mask()
+    geometry = trace_mask(mask, epsilon=0.0)
+    assert geometry.closed.all()
+    assert geometry.view_box == (0.0, 0.0, 50.0, 40.0)
+    np.testing.assert_array_equal(_render(geometry, mask.shape), mask)
+    # Los contornos siguen los bordes de los píxeles (con los pasos en diagonal recortados)
+    assert _signed_areas(geometry).sum() == pytest.approx(mask.sum(), rel=0.02)
+
+
+def test_holes_have_opposite_orientation_and_same_element():
+    mask = _sample_mask()
+    geometry = trace_mask(mask, epsilon=0.0)
+    areas = _signed_areas(geometry)
+    holes = areas < 0
+    assert holes.sum() == 2
+    # Cada agujero va en el elemento de su contorno exterior
+    outer_elements = set(geometry.path_element[~holes].tolist())
+    assert set(geometry.path_element[holes].tolist()) <= outer_elements
+    assert len(geometry.element_fills) == len(outer_elements)
+
+
+def test_simplified_trace_stays_close_to_mask():
+    mask = _sample_mask()
+    geometry = trace_mask(mask, epsilon=1.0)
+    differences = _render(geometry, mask.shape) != mask
+    assert differences.sum() <= 0.05 * mask.sum()
+    # Solo difieren píxeles del borde de la máscara
+    border = cv2.dilate(mask, np.ones((3, 3), np.uint8)) != cv2.erode(mask, np.ones((3, 3), np.uint8))
+    assert not (differences & ~border).any()
+
+
+def test_min_area_drops_small_spots_and_holes():
+    mask = _sample_mask()
+    geometry = trace_mask(mask, epsilon=0.0, min_area=2)
+    rendered = _render(geometry, mask.shape)
+    assert rendered[25, 20] == 0   # píxel suelto
+    assert rendered[32, 12] == 1   # agujero de un píxel rellenado
+    np.testing.assert_array_equal(rendered[5:20, 5:30], mask[5:20, 5:30])
+
+
+def test_curves_keep_corners():
+    mask = np.zeros((30, 45), dtype=np.uint8)
+    cv2.circle(mask, (15, 15), 10, 1, -1)
+    mask[5:15, 32:42] = 1
+    geometry = trace_mask(mask, epsilon=0.5, curves=True)
+    kinds = {
+        int(geometry.points[geometry.path_offsets[index], 0, 0] > 30):
+            set(geometry.seg_types[slice(*geometry.path_range(index))].tolist())
+        for index in range(geometry.num_paths)
+    }
+    # El disco es todo curvas; el cuadrado conserva sus esquinas con rectas
+    assert kinds == {0: {SEG_CUBIC}, 1: {SEG_LINE}}
@@ -0,0 +1,81 @@
+"""
+Pruebas de la eliminación de segmentos duplicados y líneas solapadas
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dedup import remove_duplicate_segments
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.svg_parser import parse_svg
+
+
+def _svg(*paths):
+    return '<svg xmlns="http://www.w3.org/2000/svg">' + ''.join(f'<path d="{d}"/>' for d in paths) + '</svg>'
+
+
+def _lines(geometry):
+    """Inicio y fin de cada segmento, redondeados"""
+    return geometry.points[:, [0, 3]].reshape(-1, 4).round(6).tolist()
+
+
+def test_shared_edge_is_cut_once():
+    """Dos cuadrados adyacentes: el borde común del segundo (en sentido opuesto) se elimina"""
+    geometry = parse_svg(_svg('M0 0 H10 V10 H0 Z', 'M10 0 H20 V10 H10 Z'))
+    deduplicated, stats = remove_duplicate_segments(geometry, 0.05)
+    assert stats == {'duplicates': 1, 'overlaps': 0}
+    assert deduplicated.num_segments == 7
+    assert [10.0, 10.0, 10.0, 0.0] not in _lines(deduplicated)
+
+
+def test_duplicate_arcs_match_in_either_direction():
+    geometry = parse_svg(_svg('M0 0 A5 5 0 0 1 10 0', 'M10 0 A5 5 0 0 0 0 0', 'M10 0 A5 5 0 0 1 0 0'))
+    _, stats = remove_duplicate_segments(geometry, 0.05)
+    # El tercero recorre el otro semicírculo: no es un duplicado
+    assert stats['duplicates'] == 1
+
+
+def test_collinear_overlap_keeps_uncovered_piece():
+    geometry = parse_svg(_svg('M0 0 L10 0', 'M5 0 L15 0'))
+    deduplicated, stats = remove_duplicate_segments(geometry, 0.05)
+    assert stats == {'duplicates': 0, 'overlaps': 1}
+    assert _lines(deduplicated) == [[0, 0, 10, 0], [10, 0, 15, 0]]
+
+
+@pytest.mark.parametrize('covered', [
+    'M0.012 2 L0.008 8',
+    'M0 2 L0.003 8',
+    'M0.008 8 L0.012 2'
+])
+@pytest.mark.parametrize('line', ['M0 0 L0.01 10', 'M0 0 L-0.005 10'])
+def test_near_vertical_overlap_across_angle_wrap(line, covered):
+    """Líneas casi verticales a uno y otro lado de ±90°: el tramo cubierto se elimina"""
+    geometry = parse_svg(_svg(line, covered))
+    deduplicated, stats = remove_duplicate_segments(geometry, 0.05)
+    assert stats['overlaps'] == 1
+    assert deduplicated.num_segments == 1
+
+
+def test_distant_parallel_lines_are_kept():
+    geometry = parse_svg(_svg('M0 0 L10 0', 'M0 1 L10 1', 'M0 0 L0 10', 'M1 0 L1 10'))
+    deduplicated, stats = remove_duplicate_segments(geometry, 0.05)
+    assert stats == {'duplicates': 0, 'overlaps': 0}
+    assert deduplicated is geometry
+
+
+def _cut_length(entity):
+    """Largo recorrido por una LINE o LWPOLYLINE (con su cierre)"""
+    if entity.dxftype() == 'LINE':
+        return entity.dxf.start.distance(entity.dxf.end)
+    points = np.array(entity.get_points('xy'))
+    if entity.closed:
+        points = np.vstack([points, points[:1]])
+    return np.hypot(*np.diff(points, axis=0).T).sum()
+
+
+def test_converter_cuts_each_edge_once(read_dxf):
+    svg = _svg('M0 0 H10 V10 H0 Z', 'M10 0 H20 V10 H10 Z', 'M0 20 L10 20', 'M5 20 L15 20')
+    success, data, message = DXFConverterV2(remove_duplicates=True).convert_bytes(svg)
+    assert success, message
+    # 7 lados de 10 y 15 de línea
+    assert sum(_cut_length(entity) for entity in read_dxf(data).modelspace()) == pytest.approx(85.0)
@@ -0,0 +1,65 @@
+"""
+Pruebas del aplanado adaptativo: la polilínea no se aparta de la curva más que flatten_tolerance
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dxf_converter_v2 import DXF_UNITS, DXFConverterV2
+from src.core.svg_parser import SEG_ARC, arc_center_parameters, arc_points, cubic_basis, parse_svg
+
+
+# Cúbica, arco elíptico rotado y cuadrática en un path abierto (viewBox de 100 x 100)
+CURVES_SVG = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+<path d="M5 90 C20 10 40 120 60 40 A30 12 25 1 0 80 70 Q95 95 70 95"/>
+</svg>'''
+
+
+def _curve_samples(svg, count=2000):
+    """Puntos densos de cada segmento del SVG, en coordenadas SVG"""
+    geometry = parse_svg(svg)
+    samples = cubic_basis(np.linspace(0, 1, count)) @ geometry.points
+    arcs = geometry.seg_types == SEG_ARC
+    samples[arcs] = arc_points(*arc_center_parameters(
+        geometry.points[arcs, 0], geometry.points[arcs, 3], geometry.arc_params
+    ), np.linspace(0, 1, count))
+    return samples.reshape(-1, 2)
+
+
+def _distance_to_segments(points, polyline):
+    """Distancia de cada punto al tramo más cercano de una polilínea"""
+    starts, ends = polyline[:-1], polyline[1:]
+    direction = ends - starts
+    length = np.maximum((direction ** 2).sum(axis=1), 1e-300)
+    t = np.clip(((points[:, None] - starts) * direction).sum(axis=2) / length, 0.0, 1.0)
+    closest = starts + t[..., None] * direction
+    return np.hypot(*(points[:, None] - closest).transpose(2, 0, 1)).min(axis=1)
+
+
+def _flattened(read_dxf, **config):
+    success, data, message = DXFConverterV2(use_splines=False, **config).convert_bytes(CURVES_SVG)
+    assert success, message
+    (polyline,) = read_dxf(data).modelspace()
+    return np.array(list(polyline.get_points('xy')))
+
+
+@pytest.mark.parametrize('units', [None, 'mm'])
+@pytest.mark.parametrize('tolerance', [0.5, 0.05, 0.01])
+def test_deviation_within_tolerance(tolerance, units, read_dxf):
+    """La tolerancia está en unidades del DXF, también cuando se escala a mm"""
+    polyline = _flattened(read_dxf, flatten_tolerance=tolerance, units=units)
+
+    samples = _curve_samples(CURVES_SVG)
+    samples[:, 1] = 100 - samples[:, 1]
+    if units:
+        samples /= 96.0 * DXF_UNITS[units][0]
+
+    assert _distance_to_segments(samples, polyline).max() <= tolerance * (1 + 1e-6)
+
+
+def test_vertices_adapt_to_tolerance(read_dxf):
+    counts = [len(_flattened(read_dxf, flatten_tolerance=tolerance)) for tolerance in (0.5, 0.05, 0.01)]
+    assert counts[0] < counts[1] < counts[2]
+
+    # Con una tolerancia holgada hacen falta menos vértices que con subdivisiones fijas
+    assert counts[0] < len(_flattened(read_dxf, bezier_subdivisions=30))
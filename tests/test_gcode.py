@@ -0,0 +1,84 @@
+"""
+Pruebas del exportador G-code: centros de los arcos G2/G3
+"""
+
+import io
+import re
+
+import numpy as np
+import pytest
+
+from src.core.gcode_exporter import GCodeExporter, GCodeWriter
+
+
+_MOVE = re.compile(r'^(G[0123]) X(\S+) Y(\S+)(?: I(\S+) J(\S+))?')
+
+
+def _arc_moves(gcode):
+    """(código, inicio, fin, centro) de cada G2/G3, siguiendo la posición actual"""
+    position = None
+    moves = []
+    for line in gcode.splitlines():
+        match = _MOVE.match(line)
+        if not match:
+            continue
+        code, x, y, i, j = match.groups()
+        end = np.array([float(x), float(y)])
+        if code in ('G2', 'G3'):
+            moves.append((code, position, end, position + [float(i), float(j)]))
+        position = end
+    return moves
+
+
+def _write(points, bulges, closed=False):
+    """G-code de una sola polilínea"""
+    output = io.StringIO()
+    writer = GCodeWriter(output, mode='laser', precision=4)
+    writer.add_polyline(np.array(points, dtype=float), closed=closed, bulges=np.array(bulges, dtype=float))
+    writer.close()
+    return output.getvalue()
+
+
+@pytest.mark.parametrize('bulge, code, center', [
+    (1.0, 'G3', (1.0, 0.0)),                         # semicírculo antihorario
+    (-1.0, 'G2', (1.0, 0.0)),                        # semicírculo horario
+    (np.tan(np.pi / 8), 'G3', (1.0, 1.0)),           # cuarto de círculo antihorario
+    (-np.tan(np.pi / 8), 'G2', (1.0, -1.0)),         # cuarto de círculo horario
+    (np.tan(3 * np.pi / 8), 'G3', (1.0, -1.0)),      # tres cuartos antihorario
+])
+def test_bulge_arc_centers(bulge, code, center):
+    ((move, start, end, arc_center),) = _arc_moves(_write([[0, 0], [2, 0]], [bulge, 0]))
+    assert move == code
+    np.testing.assert_allclose(arc_center, center, atol=1e-4)
+    # I, J relativos al inicio: el fin queda a la misma distancia del centro
+    assert np.hypot(*(end - arc_center)) == pytest.approx(np.hypot(*(start - arc_center)), abs=1e-4)
+
+
+def test_closed_polyline_closing_arc():
+    """El bulge del último vértice describe el arco de cierre (solo en polilíneas cerradas)"""
+    moves = _arc_moves(_write([[1, 0], [-1, 0]], [1, 1], closed=True))
+    assert [move[0] for move in moves] == ['G3', 'G3']
+    for _, _, _, center in moves:
+        np.testing.assert_allclose(center, [0, 0], atol=1e-4)
+    np.testing.assert_allclose(moves[-1][2], [1, 0], atol=1e-4)
+    assert len(_arc_moves(_write([[1, 0], [-1, 0]], [1, 1]))) == 1
+
+
+def test_svg_arcs_to_gcode_centers():
+    """Círculo y arco SVG: centros en coordenadas de máquina (mm, Y invertido)"""
+    svg = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+    <path d="M30 50 A20 20 0 0 1 70 50 A20 20 0 0 1 30 50 Z"/>
+    <path d="M10 90 A30 30 0 0 0 40 60"/></svg>'''
+    exporter = GCodeExporter({'arc_tolerance': 0.01, 'flatten_tolerance': 0.001}, mode='laser', precision=4)
+    success, data, message = exporter.convert_bytes(svg)
+    assert success, message
+
+    mm = 25.4 / 96
+    expected = {(50 * mm, 50 * mm): 20 * mm, (10 * mm, 40 * mm): 30 * mm}
+    moves = _arc_moves(data.decode('ascii'))
+    assert len(moves) == 3
+    for _, start, end, center in moves:
+        nearest = min(expected, key=lambda point: np.hypot(*(center - point)))
+        np.testing.assert_allclose(center, nearest, atol=2e-3)
+        assert np.hypot(*(start - center)) == pytest.approx(expected[nearest], abs=2e-3)
+        assert np.hypot(*(end - center)) == pytest.approx(expected[nearest], abs=2e-3)
@@ -0,0 +1,54 @@
+"""
+Pruebas del modelo de geometría en arrays: precisión float32 y su uso en el convertidor
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.svg_parser import parse_svg
+
+
+def test_float32_geometry_halves_point_memory(grid_svg):
+    svg = grid_svg(4)
+    geometry = parse_svg(svg)
+    compact = parse_svg(svg, np.float32)
+
+    assert compact.points.dtype == np.float32 and compact.arc_params.dtype == np.float32
+    assert compact.points.nbytes * 2 == geometry.points.nbytes
+    assert compact.nbytes < geometry.nbytes
+    np.testing.assert_allclose(compact.points, geometry.points, atol=1e-4)
+
+    # astype comparte los arrays que no cambian de tipo
+    assert geometry.astype(np.float64).points is geometry.points
+    assert compact.astype(np.float64).seg_types is compact.seg_types
+
+
+@pytest.mark.parametrize('config', [
+    {'streaming': True},
+    {'use_splines': False, 'flatten_tolerance': 0.01, 'nesting_layers': True, 'units': 'mm'}
+])
+def test_float32_conversion_matches_float64(config, grid_svg, read_dxf):
+    def polylines(data):
+        return [
+            np.array([vertex[:2] for vertex in entity.get_points()] if entity.dxftype() == 'LWPOLYLINE'
+                     else [vertex.dxf.location.vec2 for vertex in entity.vertices])
+            for entity in read_dxf(data).modelspace()
+            if entity.dxftype() in ('LWPOLYLINE', 'POLYLINE')
+        ]
+
+    svg = grid_svg(4)
+    success, expected, message = DXFConverterV2(**config).convert_bytes(svg)
+    assert success, message
+    success, compact, message = DXFConverterV2(geometry_dtype='float32', **config).convert_bytes(svg)
+    assert success, message
+
+    expected, compact = polylines(expected), polylines(compact)
+    assert len(compact) == len(expected) > 0
+    for points, reference in zip(compact, expected):
+        np.testing.assert_allclose(points, reference, atol=1e-3)
+
+
+def test_unknown_geometry_dtype():
+    with pytest.raises(ValueError):
+        DXFConverterV2(geometry_dtype='float16')
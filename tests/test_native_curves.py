@@ -0,0 +1,80 @@
+"""
+Pruebas de las curvas nativas del DXF: ARC, ELLIPSE y SPLINE
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.svg_parser import arc_center_parameters, arc_points, cubic_basis, parse_svg
+
+
+# Arco circular y arco elíptico rotado (large_arc, sweep 0) en un viewBox de 100 x 100
+ARCS_SVG = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+<path d="M10 50 A20 20 0 0 1 50 50"/>
+<path d="M10 80 A30 10 30 1 0 60 80"/>
+</svg>'''
+
+
+def _svg_arc_samples(svg, count=1500):
+    """Puntos de cada arco SVG en coordenadas DXF (Y invertido en el viewBox de 100)"""
+    geometry = parse_svg(svg)
+    arcs = arc_center_parameters(
+        geometry.points[geometry.arc_index, 0],
+        geometry.points[geometry.arc_index, 3],
+        geometry.arc_params
+    )
+    samples = arc_points(*arcs, np.linspace(0, 1, count))
+    samples[..., 1] = 100 - samples[..., 1]
+    return samples
+
+
+def _distance_to_polyline(points, polyline):
+    """Distancia de cada punto al vértice más cercano de una polilínea densa"""
+    return np.min(np.hypot(*(points[:, None] - polyline[None]).transpose(2, 0, 1)), axis=1)
+
+
+def test_svg_arcs_become_arc_and_ellipse(read_dxf):
+    success, data, message = DXFConverterV2().convert_bytes(ARCS_SVG)
+    assert success, message
+    arc, ellipse = read_dxf(data).modelspace()
+    assert (arc.dxftype(), ellipse.dxftype()) == ('ARC', 'ELLIPSE')
+
+    # Circular: centro y radio exactos; el sentido del SVG se conserva tras invertir Y
+    center = np.array(arc.dxf.center.vec2)
+    np.testing.assert_allclose(center, [30, 50], atol=1e-9)
+    assert arc.dxf.radius == pytest.approx(20.0)
+    ends = sorted(tuple(point.vec2) for point in (arc.start_point, arc.end_point))
+    np.testing.assert_allclose(ends, [(10, 50), (50, 50)], atol=1e-9)
+    # El arco SVG pasa por (30, 30): en el DXF (antihorario de inicio a fin), por (30, 70)
+    middle = np.radians(arc.dxf.start_angle + (arc.dxf.end_angle - arc.dxf.start_angle) % 360 / 2)
+    np.testing.assert_allclose(center + 20 * np.array([np.cos(middle), np.sin(middle)]), [30, 70], atol=1e-9)
+
+    # Elíptica: los puntos de la ELLIPSE siguen el arco SVG en toda su extensión
+    dxf_points = np.array([vertex.vec2 for vertex in ellipse.vertices(ellipse.params(1500))])
+    svg_points = _svg_arc_samples(ARCS_SVG)[1]
+    assert _distance_to_polyline(dxf_points, svg_points).max() < 0.1
+    assert _distance_to_polyline(svg_points, dxf_points).max() < 0.1
+    ends = sorted(tuple(point.vec2) for point in (ellipse.start_point, ellipse.end_point))
+    np.testing.assert_allclose(ends, [(10, 20), (60, 20)], atol=1e-6)
+
+
+def test_cubic_becomes_spline(read_dxf):
+    """La SPLINE sigue a la Bezier cúbica del SVG (Y invertido)"""
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><path d="M10 10 C20 60 70 -20 90 40"/></svg>'
+    success, data, message = DXFConverterV2().convert_bytes(svg)
+    assert success, message
+    (spline,) = read_dxf(data).modelspace()
+    assert spline.dxftype() == 'SPLINE'
+
+    control = parse_svg(svg).points[0]
+    svg_points = cubic_basis(np.linspace(0, 1, 1500)) @ control
+    svg_points[:, 1] = 100 - svg_points[:, 1]
+    dxf_points = np.array([vertex.vec2 for vertex in spline.flattening(0.001)])
+    assert _distance_to_polyline(dxf_points, svg_points).max() < 0.1
+
+
+def test_without_splines_curves_are_flattened(read_dxf):
+    success, data, message = DXFConverterV2(use_splines=False).convert_bytes(ARCS_SVG)
+    assert success, message
+    assert {entity.dxftype() for entity in read_dxf(data).modelspace()} == {'LWPOLYLINE'}
@@ -0,0 +1,51 @@
+"""
+Pruebas del árbol de contención de contornos
+"""
+
+import numpy as np
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.nesting import contour_parents, nesting_depths
+
+
+def _square(x, y, size):
+    return np.array([[x, y], [x + size, y], [x + size, y + size], [x, y + size]], dtype=float)
+
+
+def test_parents_and_depths():
+    """Pieza con agujero, isla dentro del agujero y una pieza aparte"""
+    outlines = [
+        _square(0, 0, 100),    # pieza
+        _square(10, 10, 80),   # agujero
+        _square(20, 20, 20),   # isla
+        _square(50, 50, 10),   # otra isla dentro del mismo agujero
+        _square(200, 0, 10),   # pieza aparte
+        np.array([[25.0, 25.0], [30.0, 30.0]])  # trazo abierto sobre la isla
+    ]
+    closed = [True, True, True, True, True, False]
+
+    parents = contour_parents(outlines, closed)
+    assert parents.tolist() == [-1, 0, 1, 1, -1, 2]
+    assert nesting_depths(parents).tolist() == [0, 1, 2, 2, 0, 3]
+
+
+def test_box_inside_but_point_outside():
+    """Un contorno en L contiene la caja de otro, pero no al otro"""
+    l_shape = np.array([[0, 0], [100, 0], [100, 10], [10, 10], [10, 100], [0, 100]], dtype=float)
+    parents = contour_parents([l_shape, _square(50, 50, 10)], [True, True])
+    assert parents.tolist() == [-1, -1]
+
+
+def test_open_paths_are_never_containers():
+    outlines = [np.array([[0.0, 0.0], [100.0, 0.0], [100.0, 100.0], [0.0, 100.0]]), _square(10, 10, 10)]
+    assert contour_parents(outlines, [False, True]).tolist() == [-1, -1]
+
+
+def test_nesting_layers_in_dxf(read_dxf):
+    svg = '''<svg xmlns="http://www.w3.org/2000/svg">
+    <path d="M0 0 H100 V100 H0 Z M10 10 V90 H90 V10 Z M20 20 H40 V40 H20 Z"/>
+    <path d="M25 30 L35 30"/></svg>'''
+    success, data, message = DXFConverterV2(nesting_layers=True).convert_bytes(svg)
+    assert success, message
+    layers = sorted(entity.dxf.layer for entity in read_dxf(data).modelspace())
+    assert layers == ['ABIERTO_3', 'CONTORNO_0', 'CONTORNO_1', 'CONTORNO_2']
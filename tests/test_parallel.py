@@ -0,0 +1,49 @@
+"""
+Pruebas de la conversión en paralelo: la salida es idéntica a la secuencial
+"""
+
+import pytest
+
+from src.core import dxf_converter_v2
+from src.core.dxf_converter_v2 import DXFConverterV2
+
+
+@pytest.fixture
+def always_parallel(monkeypatch):
+    """Usa el pool de procesos aunque el dibujo sea chico"""
+    monkeypatch.setattr(dxf_converter_v2, '_PARALLEL_MIN_SEGMENTS', 0)
+
+
+@pytest.mark.parametrize('config', [
+    {'streaming': True},
+    {'streaming': True, 'dxf_format': 'bin'},
+    {'streaming': True, 'flatten_tolerance': 0.01, 'arc_tolerance': 0.01, 'simplify_tolerance': 0.01},
+    {'streaming': True, 'nesting_layers': True, 'repeat_blocks': True}
+])
+def test_parallel_streaming_is_byte_identical(config, grid_svg, always_parallel):
+    svg = grid_svg(6)
+    success, serial, message = DXFConverterV2(workers=1, **config).convert_bytes(svg)
+    assert success, message
+    success, parallel, message = DXFConverterV2(workers=3, **config).convert_bytes(svg)
+    assert success, message
+    assert parallel == serial
+
+
+def test_parallel_document_has_same_entities(grid_svg, always_parallel, read_dxf):
+    """El documento ezdxf lleva fecha y handles propios: se comparan las entidades"""
+    def entities(data):
+        return [
+            (
+                entity.dxftype(),
+                str(entity.dxfattribs(drop={'handle', 'owner'})),
+                list(entity.get_points()) if entity.dxftype() == 'LWPOLYLINE' else None
+            )
+            for entity in read_dxf(data).modelspace()
+        ]
+
+    svg = grid_svg(6)
+    success, serial, message = DXFConverterV2(workers=1, use_splines=False).convert_bytes(svg)
+    assert success, message
+    success, parallel, message = DXFConverterV2(workers=3, use_splines=False).convert_bytes(svg)
+    assert success, message
+    assert entities(parallel) == entities(serial)
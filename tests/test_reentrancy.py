@@ -0,0 +1,57 @@
+"""
+Pruebas de convertidores compartidos entre hilos y de los setters obsoletos
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+
+
+def test_shared_converter_across_threads(grid_svg):
+    """Dos hilos convierten dibujos distintos a salidas distintas con el mismo convertidor"""
+    converter = DXFConverterV2(
+        streaming=True, flatten_tolerance=0.01, arc_tolerance=0.01,
+        remove_duplicates=True, nesting_layers=True
+    )
+    # Alturas y límites distintos: la inversión de Y es estado de cada llamada
+    small = grid_svg(2, columns=3)
+    large = grid_svg(5).replace('viewBox="-10 -10', 'viewBox="-40 25')
+
+    def to_bytes():
+        return converter.convert_bytes(small)
+
+    def to_stream():
+        output = io.StringIO()
+        success, message = converter.convert(large, output)
+        return success, output.getvalue().encode('ascii'), message
+
+    expected = [to_bytes(), to_stream()]
+    assert expected[0][1] != expected[1][1]
+
+    barrier = threading.Barrier(2)
+
+    def repeat(convert):
+        barrier.wait()
+        return [convert() for _ in range(10)]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(repeat, [to_bytes, to_stream]))
+
+    for runs, reference in zip(results, expected):
+        assert all(run == reference for run in runs)
+
+
+def test_deprecated_setters_update_config():
+    converter = DXFConverterV2()
+    with pytest.deprecated_call():
+        converter.set_subdivisions(500)
+    with pytest.deprecated_call():
+        converter.set_use_splines(False)
+
+    config = converter.get_config()
+    assert config['bezier_subdivisions'] == 100
+    assert config['use_splines'] is False
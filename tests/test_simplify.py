@@ -0,0 +1,92 @@
+"""
+Pruebas de la simplificación Ramer–Douglas–Peucker de polilíneas, anillos y tramos con bulges
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.simplify import simplify_polyline, simplify_ring, simplify_with_bulges
+
+
+def _distance_to_segments(points, polyline):
+    """Distancia de cada punto al tramo más cercano de una polilínea"""
+    starts, ends = polyline[:-1], polyline[1:]
+    direction = ends - starts
+    length = np.maximum((direction ** 2).sum(axis=1), 1e-300)
+    t = np.clip(((points[:, None] - starts) * direction).sum(axis=2) / length, 0.0, 1.0)
+    closest = starts + t[..., None] * direction
+    return np.hypot(*(points[:, None] - closest).transpose(2, 0, 1)).min(axis=1)
+
+
+def _noisy_ring(count, radius, noise, seed):
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * np.pi, count, endpoint=False)
+    radii = radius + rng.uniform(-noise, noise, count)
+    return np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+
+
+def test_polyline_keeps_ends_and_corners():
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 20, 201)
+    points = np.column_stack([x, np.where(x < 10, 0.0, x - 10) + rng.uniform(-0.01, 0.01, len(x))])
+
+    simplified = simplify_polyline(points, 0.05)
+    np.testing.assert_array_equal(simplified[[0, -1]], points[[0, -1]])
+    assert len(simplified) < 10
+    assert np.abs(simplified[:, 0] - 10).min() < 0.2
+    assert _distance_to_segments(points, simplified).max() <= 0.05
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('tolerance', [0.01, 0.5, 100.0])
+def test_ring_stays_closed_with_three_vertices(seed, tolerance):
+    ring = _noisy_ring(300, 10.0, 0.05, seed)
+    simplified = simplify_ring(ring, tolerance)
+
+    assert 3 <= len(simplified) <= len(ring)
+    np.testing.assert_array_equal(simplified[0], ring[0])
+    # Los vértices conservados son del anillo, en el mismo orden
+    indices = [int(np.flatnonzero((ring == vertex).all(axis=1))[0]) for vertex in simplified]
+    assert indices == sorted(indices)
+
+    if tolerance < 10:
+        loop = np.vstack([simplified, simplified[:1]])
+        assert _distance_to_segments(ring, loop).max() <= tolerance
+
+
+def test_degenerate_ring_is_returned_unchanged():
+    points = np.zeros((5, 2))
+    np.testing.assert_array_equal(simplify_ring(points, 1.0), points)
+
+
+@pytest.mark.parametrize('closed', [False, True])
+def test_bulges_keep_arc_endpoints(closed):
+    """Los extremos de cada arco quedan con su bulge y los tramos rectos se simplifican"""
+    straight = np.column_stack([np.linspace(0, 10, 11), np.zeros(11)])
+    vertices = np.vstack([straight, [[10, 10]], np.column_stack([np.linspace(5, 0, 6), np.full(6, 10)])])
+    bulges = np.zeros(len(vertices))
+    bulges[10] = 1.0    # semicírculo de (10, 0) a (10, 10)
+    bulges[13] = -0.3   # arco de (4, 10) a (3, 10)
+
+    simplified, kept_bulges = simplify_with_bulges(vertices, bulges, 0.01, closed)
+
+    for index in (10, 11, 13, 14):
+        position = np.flatnonzero((simplified == vertices[index]).all(axis=1))
+        assert len(position) == 1
+        assert kept_bulges[position[0]] == bulges[index]
+    assert np.count_nonzero(kept_bulges) == 2
+    np.testing.assert_array_equal(simplified[0], vertices[0])
+    assert len(simplified) < len(vertices)
+
+
+def test_converter_reports_fewer_vertices(read_dxf):
+    ring = _noisy_ring(400, 40.0, 0.02, 1) + 50
+    d = 'M' + ' L'.join(f'{x} {y}' for x, y in ring) + ' Z'
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><path d="{d}"/></svg>'
+
+    success, data, message = DXFConverterV2(simplify_tolerance=0.1).convert_bytes(svg)
+    assert success, message
+    assert 'vértices: 400 →' in message
+    (polyline,) = read_dxf(data).modelspace()
+    assert polyline.closed and 3 <= len(polyline) < 100
@@ -0,0 +1,42 @@
+"""
+Pruebas de la escritura en tandas: el DXF no depende del tamaño de las tandas
+"""
+
+import pytest
+
+from src.core import dxf_converter_v2
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.svg_parser import parse_svg
+
+
+@pytest.mark.parametrize('config', [
+    {'streaming': True},
+    {'streaming': True, 'flatten_tolerance': 0.01, 'arc_tolerance': 0.01},
+    {'streaming': True, 'dxf_format': 'bin', 'nesting_layers': True}
+])
+def test_batches_do_not_change_output(config, grid_svg, monkeypatch):
+    svg = grid_svg(4)
+    success, whole, message = DXFConverterV2(**config).convert_bytes(svg)
+    assert success, message
+
+    # Tandas de unos pocos grupos: el aplanado se hace por partes
+    monkeypatch.setattr(dxf_converter_v2, '_BATCH_SEGMENTS', 7)
+    monkeypatch.setattr(dxf_converter_v2, '_BATCH_GROUPS', 3)
+    success, batched, message = DXFConverterV2(**config).convert_bytes(svg)
+    assert success, message
+    assert batched == whole
+
+
+def test_batch_ranges_are_bounded(grid_svg, monkeypatch):
+    monkeypatch.setattr(dxf_converter_v2, '_BATCH_SEGMENTS', 10)
+    monkeypatch.setattr(dxf_converter_v2, '_BATCH_GROUPS', 3)
+    converter = DXFConverterV2()
+    path_groups = converter._optimize_paths(parse_svg(grid_svg(2)))
+    sizes = path_groups.sizes()
+
+    ranges = converter._batch_ranges(path_groups)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(path_groups)
+    for (start, end), (following, _) in zip(ranges, ranges[1:] + [(len(path_groups), None)]):
+        assert end == following
+        assert end - start <= 3
+        assert end - start == 1 or sizes[start:end].sum() <= 10
@@ -0,0 +1,32 @@
+"""
+Pruebas del optimizador SVG: cabecera y geometría del SVG optimizado
+"""
+
+import numpy as np
+import pytest
+
+from src.core.svg_optimizer import SVGOptimizer
+from src.core.svg_parser import geometry_bounds, parse_svg
+
+
+@pytest.mark.parametrize('size, width, height', [
+    ('', None, None),
+    ('width="200" height="100" ', 200.0, 100.0),
+    ('width="200" ', 200.0, None)
+])
+def test_view_box_is_kept(size, width, height):
+    """El viewBox del original se conserva, con o sin width y height"""
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg" {size}viewBox="10 10 100 50"><path d="M20 20 L90 50"/></svg>'
+    optimized, _ = SVGOptimizer().optimize(svg)
+    assert 'viewBox="10 10 100 50"' in optimized
+
+    geometry = parse_svg(optimized)
+    assert geometry.view_box == (10.0, 10.0, 100.0, 50.0)
+    assert (geometry.width, geometry.height) == (width, height)
+    np.testing.assert_allclose(geometry_bounds(geometry), [[20, 20], [90, 50]])
+
+
+def test_view_box_from_size():
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" width="120" height="80.5"><path d="M0 0 L10 10"/></svg>'
+    optimized, _ = SVGOptimizer().optimize(svg)
+    assert parse_svg(optimized).view_box == (0.0, 0.0, 120.0, 80.5)
@@ -0,0 +1,135 @@
+"""
+Pruebas del parser SVG: transformaciones, límites y su paso al DXF
+"""
+
+import numpy as np
+import pytest
+from ezdxf import bbox
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.svg_parser import geometry_bounds, parse_svg
+from src.core.svg_transform import apply_transform, parse_transform
+
+
+# Triángulo con <g> anidados (traslación, escala y rotación), un arco rotado y una cúbica
+NESTED_SVG = '''<svg xmlns="http://www.w3.org/2000/svg">
+<g transform="translate(10 20) scale(2)">
+  <path d="M0 0 L10 0 L10 5 Z"/>
+  <g transform="rotate(90)"><path d="M0 0 A5 5 0 0 1 10 0"/></g>
+</g>
+<path transform="matrix(1 0 0 1 50 50)" d="M0 0 C0 10 10 10 10 0"/>
+</svg>'''
+
+# Formas básicas bajo <g> anidados: rect rotado con esquinas redondeadas y círculo escalado
+SHAPES_SVG = '''<svg xmlns="http://www.w3.org/2000/svg">
+<g transform="translate(20 10)">
+  <rect x="0" y="0" width="40" height="20" rx="4" transform="rotate(30)"/>
+  <g transform="scale(1.5 0.5)"><circle cx="40" cy="60" r="10"/></g>
+</g>
+</svg>'''
+
+
+def test_transform_list_applies_right_to_left():
+    """'A B' aplica primero B: translate(10) scale(2) lleva (1, 1) a (12, 2)"""
+    matrix = parse_transform('translate(10) scale(2)')
+    assert apply_transform(np.array([[1.0, 1.0]]), matrix).tolist() == [[12.0, 2.0]]
+
+
+def test_rotate_about_center():
+    matrix = parse_transform('rotate(90 10 10)')
+    np.testing.assert_allclose(apply_transform(np.array([[20.0, 10.0]]), matrix), [[10.0, 20.0]], atol=1e-12)
+
+
+def test_nested_transform_bounds():
+    """Los límites son exactos: extremos del arco rotado y de la cúbica, no sus puntos de control"""
+    geometry = parse_svg(NESTED_SVG)
+    assert geometry.num_paths == 3
+    np.testing.assert_allclose(geometry_bounds(geometry), [[10.0, 20.0], [60.0, 57.5]], atol=1e-9)
+
+
+@pytest.mark.parametrize('shape, seg_types, closed, bounds', [
+    ('<rect x="10" y="20" width="30" height="10"/>', [0, 0, 0, 0], True, [[10, 20], [40, 30]]),
+    ('<rect x="10" y="20" width="30" height="10" rx="2"/>', [0, 3] * 4, True, [[10, 20], [40, 30]]),
+    ('<rect width="30" height="10" ry="8"/>', [0, 3, 3, 0, 3, 3], True, [[0, 0], [30, 10]]),
+    ('<circle cx="50" cy="40" r="5"/>', [3, 3], True, [[45, 35], [55, 45]]),
+    ('<ellipse cx="50" cy="40" rx="8" ry="3"/>', [3, 3], True, [[42, 37], [58, 43]]),
+    ('<line x1="1" y1="2" x2="7" y2="-4"/>', [0], False, [[1, -4], [7, 2]]),
+    ('<polyline points="0,0 10,0 10,10 3"/>', [0, 0], False, [[0, 0], [10, 10]]),
+    ('<polygon points="0 0 10 0 5 8"/>', [0, 0, 0], True, [[0, 0], [10, 8]]),
+])
+def test_basic_shapes(shape, seg_types, closed, bounds):
+    geometry = parse_svg(f'<svg xmlns="http://www.w3.org/2000/svg">{shape}</svg>')
+    assert geometry.num_paths == 1
+    assert geometry.seg_types.tolist() == seg_types
+    assert geometry.closed.tolist() == [closed]
+    np.testing.assert_allclose(geometry_bounds(geometry), bounds, atol=1e-9)
+
+
+def test_basic_shapes_apply_transforms_and_use():
+    """Las formas siguen la pila de transformaciones y se reutilizan desde <defs>"""
+    svg = '''<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+    <defs><circle id="dot" r="1" fill="red"/></defs>
+    <g transform="translate(100 0) scale(2)">
+      <rect width="10" height="5" transform="rotate(90)"/>
+      <use xlink:href="#dot" x="3" y="4"/>
+    </g>
+    <rect width="0" height="5"/><circle r="-1"/><polyline points="1 1"/>
+    </svg>'''
+    geometry = parse_svg(svg)
+    assert geometry.num_paths == 2
+    assert geometry.element_fills == [None, 'red']
+
+    rect = geometry.points[geometry.path_range(0)[0]:geometry.path_range(0)[1]]
+    np.testing.assert_allclose(rect[:, 0], [[100, 0], [100, 20], [90, 20], [90, 0]], atol=1e-9)
+    np.testing.assert_allclose(geometry.arc_params[:, :2], [[2, 2], [2, 2]])
+    np.testing.assert_allclose(geometry.points[geometry.arc_index, 0], [[108, 8], [104, 8]], atol=1e-9)
+
+
+@pytest.mark.parametrize('svg', [NESTED_SVG, SHAPES_SVG], ids=['paths', 'shapes'])
+@pytest.mark.parametrize('config', [
+    {},
+    {'streaming': True, 'flatten_tolerance': 0.001},
+    {'use_splines': False, 'flatten_tolerance': 0.001, 'arc_tolerance': 0.001}
+])
+def test_bounds_round_trip_to_dxf(config, svg, read_dxf):
+    """La extensión del DXF es la caja del SVG con Y invertido (y' = alto + y_min - y)"""
+    geometry = parse_svg(svg)
+    (x_min, y_min), (x_max, y_max) = geometry_bounds(geometry)
+
+    success, data, message = DXFConverterV2(**config).convert_bytes(svg)
+    assert success, message
+    extents = bbox.extents(read_dxf(data).modelspace())
+
+    height = y_max - y_min
+    np.testing.assert_allclose([extents.extmin.x, extents.extmin.y], [x_min, 0.0], atol=2e-3)
+    np.testing.assert_allclose([extents.extmax.x, extents.extmax.y], [x_max, height], atol=2e-3)
+
+
+def test_shape_bounds_follow_transforms():
+    """Caja exacta del rect rotado (esquinas redondeadas) y de la elipse que deja el círculo escalado"""
+    geometry = parse_svg(SHAPES_SVG)
+    assert geometry.num_paths == 2
+
+    angle = np.radians(30)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    corners = np.array([[4, 4], [36, 4], [36, 16], [4, 16]]) @ rotation.T
+    rect_min = corners.min(axis=0) - 4 + [20, 10]
+    rect_max = corners.max(axis=0) + 4 + [20, 10]
+    ellipse_min = np.array([20 + 1.5 * 30, 10 + 0.5 * 50])
+    ellipse_max = np.array([20 + 1.5 * 50, 10 + 0.5 * 70])
+
+    np.testing.assert_allclose(
+        geometry_bounds(geometry),
+        [np.minimum(rect_min, ellipse_min), np.maximum(rect_max, ellipse_max)],
+        atol=1e-9
+    )
+
+
+def test_view_box_sets_y_inversion(read_dxf):
+    """Con viewBox la inversión usa su alto, no la caja de la geometría"""
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><path d="M10 10 L20 30"/></svg>'
+    success, data, message = DXFConverterV2().convert_bytes(svg)
+    assert success, message
+    (line,) = read_dxf(data).modelspace()
+    assert line.dxftype() == 'LINE'
+    assert sorted([line.dxf.start.vec2, line.dxf.end.vec2]) == [(10.0, 90.0), (20.0, 70.0)]
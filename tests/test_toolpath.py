@@ -0,0 +1,92 @@
+"""
+Pruebas del ordenamiento del recorrido de corte: menos recorrido en vacío y agujeros antes que su contorno
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+from src.core.toolpath import ToolpathOptimizer
+
+
+def _square(x, y, size):
+    return np.array([[x, y], [x + size, y], [x + size, y + size], [x, y + size]], dtype=float)
+
+
+def _scattered_paths(seed, count=120):
+    """Cuadrados cerrados y segmentos abiertos desordenados sobre una hoja de 1000 x 1000"""
+    rng = np.random.default_rng(seed)
+    paths = []
+    for x, y in rng.uniform(0, 1000, (count, 2)):
+        if rng.random() < 0.5:
+            paths.append({'points': _square(x, y, 5), 'closed': True})
+        else:
+            paths.append({'points': np.array([[x, y], [x + 8, y + 3]]), 'closed': False})
+    return paths
+
+
+def _order_travel(paths, order, origin=(0.0, 0.0)):
+    """Recorrido en vacío de un orden (ver ToolpathOptimizer.optimize)"""
+    position = np.asarray(origin, dtype=float)
+    total = 0.0
+    for index, entry, reverse in order:
+        points = paths[index]['points']
+        if paths[index]['closed']:
+            start = end = points[entry]
+        else:
+            start, end = (points[-1], points[0]) if reverse else (points[0], points[-1])
+        total += np.hypot(*(start - position))
+        position = end
+    return total
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_ordering_does_not_increase_travel(seed):
+    paths = _scattered_paths(seed)
+    order, report = ToolpathOptimizer(time_budget=0.2).optimize(paths)
+
+    assert sorted(index for index, _, _ in order) == list(range(len(paths)))
+    travel = _order_travel(paths, order)
+    assert travel == pytest.approx(report['travel_after'])
+    assert travel <= report['travel_before']
+    identity = [(index, 0, False) for index in range(len(paths))]
+    assert report['travel_before'] == pytest.approx(_order_travel(paths, identity))
+    # Un orden desordenado sobre la hoja se acorta mucho
+    assert travel < 0.5 * report['travel_before']
+
+
+def test_inner_first_cuts_holes_before_their_contour():
+    """Pieza con agujero, pieza dentro del agujero y una cadena dentro de la pieza"""
+    paths = [
+        {'points': _square(0, 0, 100), 'closed': True},
+        {'points': _square(20, 20, 40), 'closed': True},
+        {'points': _square(30, 30, 10), 'closed': True},
+        {'points': np.array([[70.0, 70.0], [90.0, 90.0]]), 'closed': False},
+        {'points': _square(200, 0, 10), 'closed': True}
+    ]
+    parents = {1: 0, 2: 1, 3: 0}
+
+    order, _ = ToolpathOptimizer(time_budget=0.2, inner_first=True, origin=(0.0, 0.0)).optimize(paths)
+    position = {index: rank for rank, (index, _, _) in enumerate(order)}
+    for child, parent in parents.items():
+        assert position[child] < position[parent]
+
+
+def test_converter_writes_holes_first(read_dxf):
+    """En el DXF los contornos interiores salen antes que el exterior, y todos en sentido antihorario"""
+    svg = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 300 300">
+    <path d="M0 0 H200 V200 H0 Z M20 20 V60 H60 V20 Z M120 120 H160 V160 H120 Z"/>
+    <path d="M250 250 H280 V280 H250 Z"/>
+    </svg>'''
+    converter = DXFConverterV2(order_toolpath=True, toolpath_time=0.2, loop_direction='ccw')
+    success, data, message = converter.convert_bytes(svg)
+    assert success, message
+    assert 'recorrido en vacío' in message
+
+    polylines = [np.array(list(entity.get_points('xy'))) for entity in read_dxf(data).modelspace()]
+    areas = [0.5 * np.sum(p[:, 0] * np.roll(p[:, 1], -1) - np.roll(p[:, 0], -1) * p[:, 1]) for p in polylines]
+    assert all(area > 0 for area in areas)
+
+    outer = int(np.argmax(areas))
+    holes = [rank for rank, p in enumerate(polylines) if p[:, 0].max() <= 160]
+    assert len(holes) == 2 and max(holes) < outer
@@ -0,0 +1,84 @@
+"""
+Pruebas de las unidades de salida y del redondeo a la grilla de coordenadas
+"""
+
+import ezdxf
+import numpy as np
+import pytest
+
+from src.core.dxf_converter_v2 import DXFConverterV2
+
+
+# Zigzag de vértices a menos de media unidad entre sí: a grilla 1 colapsan
+ZIGZAG_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="40" height="40">'
+    '<path d="M0 0 L10 0 L10.2 0.1 L10.4 -0.1 L10.1 0.2 L20 0 L20 10 L19.9 10.2 L0.2 10 L0.1 0.1 Z"/>'
+    '<path d="M0 20 L10 20 L10.3 20.2 L10.3 30"/>'
+    '</svg>'
+)
+
+
+def _polylines(doc):
+    """Vértices y cierre de cada polilínea (LWPOLYLINE del documento o POLYLINE de streaming)"""
+    polylines = []
+    for entity in doc.modelspace().query('LWPOLYLINE POLYLINE'):
+        if entity.dxftype() == 'LWPOLYLINE':
+            polylines.append((np.array([point[:2] for point in entity.get_points()]), entity.closed))
+        else:
+            polylines.append((np.array([(point.x, point.y) for point in entity.points()]), entity.is_closed))
+    return polylines
+
+
+@pytest.mark.parametrize('config', [{}, {'streaming': True}, {'streaming': True, 'dxf_format': 'bin'}])
+def test_grid_removes_collapsed_vertices(config, read_dxf, tmp_path):
+    converter = DXFConverterV2(use_splines=False, coordinate_grid=1.0, **config)
+    success, data, message = converter.convert_bytes(ZIGZAG_SVG)
+    assert success, message
+    if config.get('dxf_format') == 'bin':
+        path = tmp_path / 'grid.dxf'
+        path.write_bytes(data)
+        doc = ezdxf.readfile(path)
+    else:
+        doc = read_dxf(data)
+
+    polylines = _polylines(doc)
+    assert [len(points) for points, _ in polylines] == [5, 3]
+    for points, closed in polylines:
+        assert np.array_equal(points, np.rint(points))
+        # Sin segmentos de largo cero, tampoco en el cierre
+        loop = np.vstack([points, points[:1]]) if closed else points
+        assert np.hypot(*np.diff(loop, axis=0).T).min() > 0
+
+
+def test_grid_coordinates_are_short_multiples(grid_svg, read_dxf):
+    step = 0.005
+    success, data, message = DXFConverterV2(use_splines=False, coordinate_grid=step).convert_bytes(grid_svg(2))
+    assert success, message
+
+    points = np.vstack([points for points, _ in _polylines(read_dxf(data))])
+    np.testing.assert_allclose(points / step, np.rint(points / step), atol=1e-6)
+    # Las coordenadas se escriben con los decimales de la grilla, no con el error de punto flotante
+    lines = data.decode('ascii').split('\n')
+    coordinates = [lines[index + 1] for index, code in enumerate(lines[:-1]) if code.strip() in ('10', '20')]
+    assert max(len(coordinate.split('.')[-1]) for coordinate in coordinates if '.' in coordinate) <= 3
+
+
+@pytest.mark.parametrize('units, dpi, insunits, scale', [
+    (None, 96.0, 0, 1.0),
+    ('mm', 96.0, 4, 25.4 / 96),
+    ('in', 72.0, 1, 1 / 72)
+])
+def test_units_scale_and_header(units, dpi, insunits, scale, read_dxf):
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100" viewBox="0 0 200 100">'
+        '<path d="M10 10 L190 10 L190 90 L10 90 Z"/></svg>'
+    )
+    success, data, message = DXFConverterV2(units=units, dpi=dpi).convert_bytes(svg)
+    assert success, message
+
+    doc = read_dxf(data)
+    assert doc.header.get('$INSUNITS', 0) == insunits
+    (points, closed), = _polylines(doc)
+    assert closed
+    np.testing.assert_allclose(points.min(axis=0), [10 * scale, 10 * scale])
+    np.testing.assert_allclose(points.max(axis=0), [190 * scale, 90 * scale])